@@ -1,14 +1,33 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from module.json_response import FastJSONResponse
 from module.postgresql_connection_pool import postgresql_pool
+from module.response_cache import response_cache
 from module.financial_report import Financial_report
+from module.company_index import company_index
+from module.statement_registry import statement_registry
 from typing import Optional, List
 import re
+import json
+import base64
 from decimal import Decimal
 
 router = APIRouter()
 
 class AdvancedSearch:
+    # 預先計算排名表，由 data_process/load/refresh_sector_rankings.py 維護
+    RANKING_STORE_TABLE = 'Sector_Financial_Rankings'
+
+    # 產業清單 (下拉選單用)
+    SECTOR_LIST_QUERY = "SELECT sector_name FROM Sectors ORDER BY sector_name ASC;"
+
+    # stock_ranking 的 statement_type 對應財報表
+    STATEMENT_TABLE_MAP = {
+        'cash_flow': 'Cash_Flow_Statements',
+        'income_statement': 'Income_Statements',
+        'balance_sheet': 'Balance_Sheets'
+    }
+
     # 支援的排行榜類型
     SUPPORTED_RANKINGS = {
         # 現金流量表
@@ -247,18 +266,6 @@ class AdvancedSearch:
         """驗證限制數量"""
         return 1 <= limit <= 1000
 
-    @staticmethod
-    def decimal_to_float(obj):
-        """將 Decimal 轉換為 float"""
-        if isinstance(obj, dict):
-            return {k: AdvancedSearch.decimal_to_float(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [AdvancedSearch.decimal_to_float(i) for i in obj]
-        elif isinstance(obj, Decimal):
-            return float(obj)
-        else:
-            return obj
-    
     @staticmethod
     def _validate_report_type_for_ranking(table_name: str, report_type: str) -> bool:
         """
@@ -284,9 +291,616 @@ class AdvancedSearch:
         # Income_Statements 支援 quarterly 和 accumulated
         if table_name == 'Income_Statements' and report_type not in ['quarterly', 'accumulated']:
             return False
-        
+
         return True
 
+    @staticmethod
+    def get_rankings_for_table(table_name: str) -> dict:
+        """取得指定資料表的所有排行榜指標 (保持 SUPPORTED_RANKINGS 的順序)"""
+        return {
+            k: v for k, v in AdvancedSearch.SUPPORTED_RANKINGS.items() if v['table'] == table_name
+        }
+
+    @staticmethod
+    def build_stock_ranking_query(table_name: str, fields: List[str]) -> str:
+        """
+        產生單一股票在產業內所有指標排名的查詢語句
+
+        先取出同國家、同產業、同期間的資料切片，再對每個指標各開一個視窗函數，
+        一次查詢即可取得所有指標的數值、排名與總筆數。
+        每個指標以 PARTITION BY (欄位 IS NULL) 排除空值，
+        排名與總筆數都只計算該指標有值的公司。
+
+        參數順序: $1 country_name, $2 sector_name, $3 year, $4 report_type, $5 quarter, $6 company_id
+
+        回傳欄位: {field}, {field}_rank, {field}_total_count
+        """
+        allowed_fields = {v['field'] for v in AdvancedSearch.get_rankings_for_table(table_name).values()}
+        if not fields or not set(fields) <= allowed_fields:
+            raise ValueError(f"不支援的排行榜欄位：{table_name} {fields}")
+
+        slice_columns = ",\n                    ".join(f"fr.{field}" for field in fields)
+        ranked_columns = ",\n                    ".join(
+            f"{field},\n"
+            f"                    CASE WHEN {field} IS NULL THEN NULL ELSE ROW_NUMBER() OVER "
+            f"(PARTITION BY ({field} IS NULL) ORDER BY {field} DESC, company_id) END AS {field}_rank,\n"
+            f"                    COUNT({field}) OVER () AS {field}_total_count"
+            for field in fields
+        )
+        return f"""
+            WITH SectorSlice AS (
+                SELECT
+                    fr.company_id,
+                    {slice_columns}
+                FROM {table_name} AS fr
+                INNER JOIN Companies AS c ON fr.company_id = c.company_id
+                INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+                INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+                WHERE ct.country_name = $1
+                AND s.sector_name = $2
+                AND fr.year = $3
+                AND fr.report_type = $4
+                AND fr.quarter = $5
+            ), RankedData AS (
+                SELECT
+                    company_id,
+                    {ranked_columns}
+                FROM SectorSlice
+            )
+            SELECT *
+            FROM RankedData
+            WHERE company_id = $6
+        """
+
+    @staticmethod
+    def encode_ranking_cursor(value, company_id: int, rank: int) -> str:
+        """
+        將排行榜最後一筆的 (數值, company_id, 排名) 編碼為不透明的分頁游標
+        數值使用查詢回傳的 cursor_value (numeric 的文字表示，保留完整精度)，
+        解碼為 Decimal 後以 $n::numeric 與資料庫的數值精確比較
+        """
+        payload = json.dumps({
+            "v": None if value is None else str(value),
+            "id": company_id,
+            "r": rank
+        }, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_ranking_cursor(cursor: str) -> tuple:
+        """
+        解析分頁游標，回傳 (數值, company_id, 排名)
+        游標格式不正確時拋出 ValueError
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+            value = None if payload["v"] is None else Decimal(payload["v"])
+            company_id = payload["id"]
+            rank = payload["r"]
+        except (ValueError, TypeError, KeyError, ArithmeticError, UnicodeError):
+            raise ValueError("分頁游標格式不正確")
+        if not isinstance(company_id, int) or not isinstance(rank, int) or rank < 1:
+            raise ValueError("分頁游標格式不正確")
+        if value is not None and not value.is_finite():
+            raise ValueError("分頁游標格式不正確")
+        return value, company_id, rank
+
+    @staticmethod
+    def build_ranking_query(
+        table_name: str,
+        field_name: str,
+        year: int,
+        db_report_type: str,
+        quarter: Optional[int],
+        sector_name: Optional[str],
+        page_size: int,
+        offset: int = 0,
+        after: Optional[tuple] = None,
+        include_total_count: bool = False
+    ) -> tuple:
+        """
+        產生即時排序的排行榜查詢語句與參數
+
+        排序為 (數值 DESC NULLS LAST, company_id)，提供 after=(數值, company_id, 排名) 時
+        改以 seek 條件取得該筆之後的資料 (keyset 分頁)，排名由游標中的排名接續計算。
+        cursor_value 為數值的文字表示 (numeric 原始精度)，供游標使用，避免轉為 float 後 seek 比較失準。
+        include_total_count=True 時以 COUNT(*) OVER () 在同一個查詢回傳總筆數 (total_count)，
+        seek 模式下游標之前的筆數即為游標排名，加回後即為總筆數。
+
+        Returns:
+            (query, params)
+        """
+        where_conditions = ["fr.year = $1", "fr.report_type = $2"]
+        params = [year, db_report_type]
+        param_index = 3
+
+        # 添加季度條件
+        if quarter is not None:
+            where_conditions.append(f"fr.quarter = ${param_index}")
+            params.append(quarter)
+            param_index += 1
+
+        # 添加產業條件
+        if sector_name:
+            where_conditions.append(f"s.sector_name = ${param_index}")
+            params.append(sector_name)
+            param_index += 1
+
+        rank_expression = f"ROW_NUMBER() OVER (ORDER BY fr.{field_name} DESC NULLS LAST, fr.company_id)"
+        total_count_expression = "COUNT(*) OVER ()"
+        # 添加 seek 條件 (keyset 分頁)
+        if after is not None:
+            after_value, after_company_id, after_rank = after
+            if after_value is None:
+                where_conditions.append(
+                    f"(fr.{field_name} IS NULL AND fr.company_id > ${param_index})"
+                )
+                params.append(after_company_id)
+                param_index += 1
+            else:
+                where_conditions.append(
+                    f"(fr.{field_name} < ${param_index}::numeric"
+                    f" OR (fr.{field_name} = ${param_index}::numeric AND fr.company_id > ${param_index + 1})"
+                    f" OR fr.{field_name} IS NULL)"
+                )
+                params.extend([after_value, after_company_id])
+                param_index += 2
+            rank_expression = f"{rank_expression} + ${param_index}"
+            total_count_expression = f"{total_count_expression} + ${param_index}"
+            params.append(after_rank)
+            param_index += 1
+
+        total_count_column = f",\n                {total_count_expression} as total_count" if include_total_count else ""
+        query = f"""
+            SELECT
+                c.company_id,
+                c.stock_symbol,
+                c.company_name,
+                s.sector_name,
+                ct.country_name,
+                fr.{field_name},
+                fr.{field_name}::text AS cursor_value,
+                fr.year,
+                fr.quarter,
+                fr.report_type,
+                {rank_expression} as rank{total_count_column}
+            FROM {table_name} AS fr
+            INNER JOIN Companies AS c ON fr.company_id = c.company_id
+            INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+            INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+            WHERE {' AND '.join(where_conditions)}
+            ORDER BY fr.{field_name} DESC NULLS LAST, fr.company_id
+            LIMIT ${param_index} OFFSET ${param_index + 1};
+        """
+        params.extend([page_size, offset])
+        return query, params
+
+    @staticmethod
+    def build_ranking_lookup_query(
+        table_name: str,
+        field_name: str,
+        year: int,
+        db_report_type: str,
+        quarter: int,
+        sector_name: Optional[str],
+        page_size: int,
+        offset: int = 0,
+        after: Optional[tuple] = None,
+        include_total_count: bool = False
+    ) -> tuple:
+        """
+        產生從預先計算排名表 (Sector_Financial_Rankings) 分頁讀取排行榜的查詢語句與參數
+
+        指定產業時依 global_sector_rank 讀取，否則依 global_rank 讀取，不需在請求時排序。
+        兩者皆不分國家，與 build_ranking_query 即時計算的範圍相同。
+        提供 after=(數值, company_id, 排名) 時，以游標中 company_id 的排名做 seek (keyset 分頁)。
+        include_total_count=True 時同 build_ranking_query 回傳 total_count。
+
+        Returns:
+            (query, params)
+        """
+        rank_column = "global_sector_rank" if sector_name else "global_rank"
+        partition_conditions = [
+            "table_name = $1",
+            "field_name = $2",
+            "year = $3",
+            "report_type = $4",
+            "quarter = $5"
+        ]
+        where_conditions = [f"r.{condition}" for condition in partition_conditions]
+        params = [table_name, field_name, year, db_report_type, quarter]
+        param_index = 6
+        if sector_name:
+            where_conditions.append(f"s.sector_name = ${param_index}")
+            params.append(sector_name)
+            param_index += 1
+        total_count_expression = "COUNT(*) OVER ()"
+        # 添加 seek 條件 (keyset 分頁)，以主鍵取得游標所在公司的排名
+        if after is not None:
+            where_conditions.append(f"""r.{rank_column} > (
+                SELECT {rank_column} FROM {AdvancedSearch.RANKING_STORE_TABLE}
+                WHERE {' AND '.join(partition_conditions)} AND company_id = ${param_index}
+            )""")
+            params.append(after[1])
+            param_index += 1
+            if include_total_count:
+                total_count_expression = f"{total_count_expression} + ${param_index}"
+                params.append(after[2])
+                param_index += 1
+        total_count_column = f",\n                {total_count_expression} AS total_count" if include_total_count else ""
+        query = f"""
+            SELECT
+                c.company_id,
+                c.stock_symbol,
+                c.company_name,
+                s.sector_name,
+                ct.country_name,
+                r.value AS {field_name},
+                r.value::text AS cursor_value,
+                r.year,
+                r.quarter,
+                r.report_type,
+                r.{rank_column} AS rank{total_count_column}
+            FROM {AdvancedSearch.RANKING_STORE_TABLE} AS r
+            INNER JOIN Companies AS c ON r.company_id = c.company_id
+            INNER JOIN Sectors AS s ON r.sector_id = s.sector_id
+            INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+            WHERE {' AND '.join(where_conditions)}
+            ORDER BY r.{rank_column}
+            LIMIT ${param_index} OFFSET ${param_index + 1};
+        """
+        params.extend([page_size, offset])
+        return query, params
+
+    @staticmethod
+    def build_ranking_store_exists_query() -> str:
+        """
+        預先計算排名表是否已有指定期間的排名，排名表讀取結果為空時用於判斷是否退回即時計算
+
+        參數順序: $1 table_name, $2 field_name, $3 year, $4 report_type, $5 quarter
+        """
+        return f"""
+            SELECT EXISTS (
+                SELECT 1 FROM {AdvancedSearch.RANKING_STORE_TABLE}
+                WHERE table_name = $1
+                AND field_name = $2
+                AND year = $3
+                AND report_type = $4
+                AND quarter = $5
+            )
+        """
+
+    @staticmethod
+    def get_stock_ranking_lookup_query() -> str:
+        """
+        從預先計算排名表讀取單一股票在指定期間所有指標的產業排名
+
+        參數順序: $1 company_id, $2 table_name, $3 year, $4 report_type, $5 quarter
+        """
+        return f"""
+            SELECT
+                field_name,
+                value,
+                sector_rank AS rank,
+                sector_total_count AS total_count
+            FROM {AdvancedSearch.RANKING_STORE_TABLE}
+            WHERE company_id = $1
+            AND table_name = $2
+            AND year = $3
+            AND report_type = $4
+            AND quarter = $5
+        """
+
+    @staticmethod
+    def resolve_stock_ranking_period(statement_type: str, report_type: str, year: int, quarter: Optional[int]) -> tuple:
+        """
+        依財報表類型規則驗證 stock_ranking 的期間參數，參數不符時拋出 HTTPException(400)
+
+        Returns:
+            (db_report_type, quarter)
+        """
+        # 驗證 statement_type
+        valid_statement_types = ["cash_flow", "income_statement", "balance_sheet"]
+        if statement_type not in valid_statement_types:
+            raise HTTPException(
+                status_code=400,
+                detail=f"statement_type 必須為 {valid_statement_types} 之一"
+            )
+        # 驗證 report_type
+        valid_report_types = ["annual", "accumulated", "quarterly"]
+        if report_type not in valid_report_types:
+            raise HTTPException(
+                status_code=400,
+                detail="不支援的財報期間，必須是 'annual'、'accumulated' 或 'quarterly'"
+            )
+        db_report_type = AdvancedSearch.convert_report_period(report_type)
+        # 根據 statement_type 檢查 report_type/quarter 規則
+        if statement_type == "cash_flow":
+            if report_type == "annual":
+                db_report_type = "accumulated"
+                quarter = 4
+            elif report_type == "accumulated":
+                db_report_type = "accumulated"
+                if year == 2025:
+                    if quarter != 1:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="2025 年現金流量表累計只支援第一季 (quarter=1)"
+                        )
+                    quarter = 1
+                else:
+                    if quarter not in [1, 2, 3]:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="現金流量表累計只支援第一~三季 (quarter=1,2,3)"
+                        )
+            else:
+                raise HTTPException(
+                    status_code=400,
+                    detail="現金流量表只支援年報(annual)或累計(accumulated)"
+                )
+        elif statement_type == "income_statement":
+            if report_type == "annual":
+                db_report_type = "accumulated"
+                quarter = 4
+            elif report_type == "accumulated":
+                db_report_type = "accumulated"
+                if year == 2025:
+                    if quarter != 1:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="2025 年損益表累計只支援第一季 (quarter=1)"
+                        )
+                    quarter = 1
+                else:
+                    if quarter not in [1, 2, 3]:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="損益表累計只支援第一~三季 (quarter=1,2,3)"
+                        )
+            elif report_type == "quarterly":
+                db_report_type = "quarterly"
+                if year == 2025:
+                    if quarter != 1:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="2025 年損益表季報只支援第一季 (quarter=1)"
+                        )
+                    quarter = 1
+                else:
+                    if quarter not in [1, 2, 3, 4]:
+                        raise HTTPException(
+                            status_code=400,
+                            detail="損益表季報只支援第一~四季 (quarter=1,2,3,4)"
+                        )
+            else:
+                raise HTTPException(
+                    status_code=400,
+                    detail="損益表只支援年報(annual)、累計(accumulated)或季報(quarterly)"
+                )
+        elif statement_type == "balance_sheet":
+            if report_type != "quarterly":
+                raise HTTPException(
+                    status_code=400,
+                    detail="資產負債表只支援季報(quarterly)"
+                )
+            db_report_type = "quarterly"
+            if year == 2025:
+                if quarter != 1:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="2025 年資產負債表只支援第一季 (quarter=1)"
+                    )
+                quarter = 1
+            else:
+                if quarter not in [1, 2, 3, 4]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="資產負債表只支援第一~四季 (quarter=1,2,3,4)"
+                    )
+        return db_report_type, quarter
+
+    @staticmethod
+    async def fetch_stock_rankings(
+        conn,
+        company_id: int,
+        country_name: str,
+        sector_name: str,
+        statement_type: str,
+        year: int,
+        db_report_type: str,
+        quarter: int
+    ) -> dict:
+        """
+        查詢單一公司在指定財報表所有指標的產業排名
+        優先讀取預先計算排名表，尚未建立時以單一查詢即時計算
+        """
+        # 只查詢該 statement_type 對應的指標
+        table_name = AdvancedSearch.STATEMENT_TABLE_MAP[statement_type]
+        # 過濾指標
+        filtered_rankings = AdvancedSearch.get_rankings_for_table(table_name)
+        fields = [v['field'] for v in filtered_rankings.values()]
+        # 優先從預先計算排名表讀取: {field: (value, rank, total_count)}
+        ranking_rows = await statement_registry.fetch(
+            conn,
+            AdvancedSearch.get_stock_ranking_lookup_query(),
+            company_id,
+            table_name,
+            year,
+            db_report_type,
+            quarter
+        )
+        if ranking_rows:
+            metrics = {
+                row['field_name']: (row['value'], row['rank'], row['total_count'])
+                for row in ranking_rows
+            }
+        else:
+            # 排名表尚未建立此期間資料時，一次查詢即時計算所有指標的排名、數值與總筆數
+            ranking_query = AdvancedSearch.build_stock_ranking_query(table_name, fields)
+            ranking_row = await statement_registry.fetchrow(
+                conn,
+                ranking_query,
+                country_name,
+                sector_name,
+                year,
+                db_report_type,
+                quarter,
+                company_id
+            )
+            metrics = {
+                field: (ranking_row[field], ranking_row[f"{field}_rank"], ranking_row[f"{field}_total_count"])
+                for field in fields
+            } if ranking_row else {}
+        results = {}
+        for ranking_key, ranking_config in filtered_rankings.items():
+            field_name = ranking_config['field']
+            value, rank, total_count = metrics.get(field_name, (None, None, 0))
+            if value is not None:
+                results[ranking_key] = {
+                    'description': ranking_config['description'],
+                    'value': float(value),
+                    'rank': rank,
+                    'total_count': total_count,
+                    'table': table_name,
+                    'field': field_name
+                }
+            else:
+                results[ranking_key] = {
+                    'description': ranking_config['description'],
+                    'value': None,
+                    'rank': None,
+                    'total_count': 0,
+                    'table': table_name,
+                    'field': field_name,
+                    'note': '該指標在此期間無資料'
+                }
+        return results
+
+    @staticmethod
+    def build_stock_ranking_data(
+        stock_symbol: str,
+        country_name: str,
+        sector_name: str,
+        year: int,
+        report_type: str,
+        quarter: Optional[int],
+        statement_type: str,
+        results: dict
+    ) -> dict:
+        """
+        組合 stock_ranking 回傳的 data 內容
+        """
+        response_data = {
+            'stock_info': {
+                'stock_symbol': stock_symbol,
+                'country': country_name,
+                'sector': sector_name
+            },
+            'query_params': {
+                'year': year,
+                'report_type': report_type,
+                'quarter': quarter,
+                'statement_type': statement_type
+            },
+            'rankings': results,
+            'summary': {
+                'total_metrics': len(results),
+                'metrics_with_rank': len([r for r in results.values() if r['rank'] is not None]),
+                'metrics_without_data': len([r for r in results.values() if r['rank' ] is None])
+            }
+        }
+        return response_data
+
+    @staticmethod
+    def build_count_query(
+        table_name: str,
+        year: int,
+        db_report_type: str,
+        quarter: Optional[int],
+        sector_name: Optional[str]
+    ) -> tuple:
+        """
+        產生排行榜總筆數的查詢語句與參數
+
+        Returns:
+            (query, params)
+        """
+        where_conditions = ["fr.year = $1", "fr.report_type = $2"]
+        params = [year, db_report_type]
+        param_index = 3
+        # 添加季度條件
+        if quarter is not None:
+            where_conditions.append(f"fr.quarter = ${param_index}")
+            params.append(quarter)
+            param_index += 1
+        # 添加產業條件
+        if sector_name:
+            where_conditions.append(f"s.sector_name = ${param_index}")
+            params.append(sector_name)
+            param_index += 1
+        query = f"""
+            SELECT COUNT(*) as total_count
+            FROM {table_name} AS fr
+            INNER JOIN Companies AS c ON fr.company_id = c.company_id
+            INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+            INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+            WHERE {' AND '.join(where_conditions)};
+        """
+        return query, params
+
+    @staticmethod
+    def register_statements(registry=statement_registry):
+        """
+        將所有 (資料表, 欄位, 條件形狀) 組合的語句登錄到 statement registry
+
+        以代表值呼叫各 builder 取得語句，語句內容只與條件形狀有關，與代表值無關。
+        第一頁排名表讀取與個股排名為 eager，連線建立時即 prepare；
+        即時計算、游標分頁與總筆數等較少用的形狀在第一次使用時 prepare。
+        """
+        cursor_shapes = [None, (None, 1, 1), (Decimal(0), 1, 1)]
+        for ranking_config in AdvancedSearch.SUPPORTED_RANKINGS.values():
+            table_name = ranking_config['table']
+            field_name = ranking_config['field']
+            for sector_name in [None, "sector"]:
+                for include_total_count in [False, True]:
+                    for after in cursor_shapes[:2]:
+                        query, _ = AdvancedSearch.build_ranking_lookup_query(
+                            table_name, field_name, 2024, "quarterly", 1,
+                            sector_name, 15, 0, after, include_total_count
+                        )
+                        key = ("ranking_lookup", table_name, field_name, bool(sector_name),
+                               after is not None, include_total_count)
+                        registry.register(key, query, eager=after is None and not include_total_count)
+                    for quarter in [None, 1]:
+                        for after in cursor_shapes:
+                            query, _ = AdvancedSearch.build_ranking_query(
+                                table_name, field_name, 2024, "quarterly", quarter,
+                                sector_name, 15, 0, after, include_total_count
+                            )
+                            after_shape = None if after is None else ("null" if after[0] is None else "value")
+                            key = ("ranking", table_name, field_name, quarter is not None,
+                                   bool(sector_name), after_shape, include_total_count)
+                            registry.register(key, query)
+        for table_name in AdvancedSearch.STATEMENT_TABLE_MAP.values():
+            fields = [v['field'] for v in AdvancedSearch.get_rankings_for_table(table_name).values()]
+            registry.register(
+                ("stock_ranking", table_name),
+                AdvancedSearch.build_stock_ranking_query(table_name, fields),
+                eager=True
+            )
+            for quarter in [None, 1]:
+                for sector_name in [None, "sector"]:
+                    query, _ = AdvancedSearch.build_count_query(table_name, 2024, "quarterly", quarter, sector_name)
+                    registry.register(("count", table_name, quarter is not None, bool(sector_name)), query)
+        registry.register(("stock_ranking_lookup",), AdvancedSearch.get_stock_ranking_lookup_query(), eager=True)
+        registry.register(("ranking_store_exists",), AdvancedSearch.build_ranking_store_exists_query())
+        registry.register(("sector_list",), AdvancedSearch.SECTOR_LIST_QUERY)
+
+
+AdvancedSearch.register_statements()
+
 
 @router.get("/api/advanced_search/ranking")
 async def get_financial_ranking(
@@ -296,7 +910,10 @@ async def get_financial_ranking(
     sector_name: Optional[str] = Query(None, description="產業名稱 (可選)"),
     quarter: Optional[int] = Query(None, description="季度 (1-4, 可選)"),
     limit: int = Query(500, description="回傳筆數限制 (1-1000)", ge=1, le=1000),
-    page: int = Query(1, description="頁碼 (從1開始)", ge=1)
+    page: int = Query(1, description="頁碼 (從1開始)", ge=1),
+    use_cursor: bool = Query(False, description="啟用游標分頁 (回傳 next_cursor)"),
+    cursor: Optional[str] = Query(None, description="分頁游標 (上一頁回傳的 next_cursor)", max_length=200),
+    include_total: bool = Query(False, description="同時回傳符合條件的總筆數 (metadata.total_count)")
 ):
     """
     進階搜尋 API - 財務排行榜
@@ -321,6 +938,9 @@ async def get_financial_ranking(
     分頁說明:
     - 每頁固定回傳15筆資料
     - 前端可透過 page 參數控制頁碼
+    - 游標分頁: 傳入 use_cursor=true 取得第一頁與 next_cursor，
+      之後以 cursor=next_cursor 取得下一頁 (忽略 page)，深頁查詢成本與第一頁相同
+    - include_total=true 時在同一個查詢回傳總筆數，不需另外呼叫 /count
     """
     # 驗證排行榜類型
     if not AdvancedSearch.validate_ranking_type(ranking_type):
@@ -460,62 +1080,87 @@ async def get_financial_ranking(
         )
     # 固定每頁筆數為15
     page_size = 15
-    # 計算分頁偏移量
-    offset = (page - 1) * page_size
+    # 游標分頁模式 (keyset)：以上一頁最後一筆做 seek，不需 OFFSET
+    cursor_mode = use_cursor or cursor is not None
+    after = None
+    if cursor is not None:
+        try:
+            after = AdvancedSearch.decode_ranking_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if cursor_mode:
+        offset = 0
+        # 多取一筆判斷是否還有下一頁
+        fetch_size = page_size + 1
+    else:
+        # 計算分頁偏移量
+        offset = (page - 1) * page_size
+        fetch_size = page_size
+
+    # 快取 key 使用解析後的 db_report_type / quarter (例如 annual 不論傳入的 quarter 皆為 Q4)；
+    # report_type 會原樣回傳在 metadata 中，仍列入 key，不同的 report_type 不共用快取
+    cache_key = response_cache.make_key(
+        "ranking",
+        ranking_type=ranking_type, year=year, report_type=report_type,
+        db_report_type=db_report_type, quarter=quarter, sector_name=sector_name,
+        limit=limit, page=None if cursor_mode else page, cursor_mode=cursor_mode, cursor=cursor,
+        include_total=include_total
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return FastJSONResponse(status_code=200, content=cached)
 
     try:
         # 獲取排行榜配置
         field_name = ranking_config['field']
-        
+
         # 使用 asyncpg 的非同步連線池獲取連線
-        async with postgresql_pool.get_connection() as conn:
-            # 構建查詢條件
-            where_conditions = ["fr.year = $1", "fr.report_type = $2"]
-            params = [year, db_report_type]
-            param_index = 3
-            
-            # 添加季度條件
+        async with postgresql_pool.get_read_connection() as conn:
+            results = []
+            use_store = False
+            # 優先從預先計算排名表依排名讀取 (排名表只有單季資料，未指定季度時即時計算)
             if quarter is not None:
-                where_conditions.append(f"fr.quarter = ${param_index}")
-                params.append(quarter)
-                param_index += 1
-            
-            # 添加產業條件
-            if sector_name:
-                where_conditions.append(f"s.sector_name = ${param_index}")
-                params.append(sector_name)
-                param_index += 1
-            
-            # 構建完整的查詢語句 (使用分頁)
-            query = f"""
-                SELECT 
-                    c.stock_symbol,
-                    c.company_name,
-                    s.sector_name,
-                    ct.country_name,
-                    fr.{field_name},
-                    fr.year,
-                    fr.quarter,
-                    fr.report_type,
-                    ROW_NUMBER() OVER (ORDER BY fr.{field_name} DESC NULLS LAST) as rank
-                FROM {table_name} AS fr
-                INNER JOIN Companies AS c ON fr.company_id = c.company_id
-                INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
-                INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
-                WHERE {' AND '.join(where_conditions)}
-                ORDER BY fr.{field_name} DESC NULLS LAST
-                LIMIT ${param_index} OFFSET ${param_index + 1};
-            """
-            params.extend([page_size, offset])
-            
-            results = await conn.fetch(query, *params)
-            
-            # 將 asyncpg.Record 物件轉換為字典列表
-            formatted_results = [dict(record) for record in results]
-            formatted_results = AdvancedSearch.decimal_to_float(formatted_results)
+                lookup_query, lookup_params = AdvancedSearch.build_ranking_lookup_query(
+                    table_name, field_name, year, db_report_type, quarter,
+                    sector_name, fetch_size, offset, after, include_total
+                )
+                results = await statement_registry.fetch(conn, lookup_query, *lookup_params)
+                # 結果為空可能是最後一頁之後或產業沒有資料，只有排名表尚未建立此期間資料時才即時計算
+                use_store = bool(results) or await statement_registry.fetchval(
+                    conn, AdvancedSearch.build_ranking_store_exists_query(),
+                    table_name, field_name, year, db_report_type, quarter
+                )
+
+            if not use_store:
+                query, params = AdvancedSearch.build_ranking_query(
+                    table_name, field_name, year, db_report_type, quarter,
+                    sector_name, fetch_size, offset, after, include_total
+                )
+                results = await statement_registry.fetch(conn, query, *params)
+
+            total_count = results[0]['total_count'] if include_total and results else None
+
+            next_cursor = None
+            if cursor_mode:
+                has_more = len(results) > page_size
+                results = results[:page_size]
+                last = results[-1] if results else None
+                if has_more and last['rank'] < limit:
+                    next_cursor = AdvancedSearch.encode_ranking_cursor(
+                        last['cursor_value'], last['company_id'], last['rank']
+                    )
+
+            # 將 asyncpg.Record 物件轉換為字典列表 (company_id、cursor_value 僅供游標使用，total_count 移至 metadata)
+            formatted_results = []
+            for record in results:
+                row = dict(record)
+                row.pop('company_id', None)
+                row.pop('total_count', None)
+                row.pop('cursor_value', None)
+                formatted_results.append(row)
 
             if not formatted_results:
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=404, 
                     content={
                         "message": "未找到相關排行榜資料",
@@ -527,27 +1172,34 @@ async def get_financial_ranking(
                     }
                 )
 
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "data": formatted_results,
-                    "metadata": {
-                        "ranking_type": ranking_type,
-                        "description": ranking_config['description'],
-                        "year": year,
-                        "report_type": report_type,
-                        "db_report_type": db_report_type,
-                        "sector_name": sector_name,
-                        "quarter": quarter,
-                        "limit": limit,
-                        "page": page,
-                        "page_size": page_size,
-                        "current_page_count": len(formatted_results),
-                        "has_next_page": len(formatted_results) == page_size and (page * page_size) < limit
-                    },
-                    "status": "ok"
-                }
-            )
+            metadata = {
+                "ranking_type": ranking_type,
+                "description": ranking_config['description'],
+                "year": year,
+                "report_type": report_type,
+                "db_report_type": db_report_type,
+                "sector_name": sector_name,
+                "quarter": quarter,
+                "limit": limit,
+                "page": page,
+                "page_size": page_size,
+                "current_page_count": len(formatted_results),
+                "has_next_page": len(formatted_results) == page_size and (page * page_size) < limit
+            }
+            if cursor_mode:
+                metadata["page"] = None
+                metadata["has_next_page"] = next_cursor is not None
+                metadata["next_cursor"] = next_cursor
+            if include_total:
+                metadata["total_count"] = total_count
+
+            content = {
+                "data": formatted_results,
+                "metadata": metadata,
+                "status": "ok"
+            }
+            response_cache.set(cache_key, content)
+            return FastJSONResponse(status_code=200, content=content)
 
     except Exception as e:
         # 捕捉其他未預期的資料庫錯誤
@@ -555,10 +1207,9 @@ async def get_financial_ranking(
         raise HTTPException(status_code=500, detail="內部伺服器錯誤")
 
 
-@router.get("/api/advanced_search/supported_rankings")
-async def get_supported_rankings():
+def build_supported_rankings():
     """
-    獲取支援的排行榜類型列表，依照三種財報表分類
+    依照三種財報表分類支援的排行榜類型
     """
     # 分類 mapping
     table_to_statement_type = {
@@ -580,13 +1231,38 @@ async def get_supported_rankings():
                 'field': value['field'],
                 'table': value['table']
             })
-    return JSONResponse(
-        status_code=200,
-        content={
-            "data": result,
-            "status": "ok"
-        }
-    )
+    return result
+
+
+REPORT_TYPE_RULES = {
+    'cash_flow': {
+        'supported_periods': ['annual'],
+        'quarter_rule': '自動使用第4季',
+        'description': '現金流量表只支援年度財報'
+    },
+    'income_statement': {
+        'supported_periods': ['quarterly', 'annual'],
+        'quarter_rule': 'quarterly需指定季度(1-4), annual自動使用第4季',
+        'description': '損益表支援單季和年度財報'
+    },
+    'balance_sheet': {
+        'supported_periods': ['quarterly'],
+        'quarter_rule': '必須指定季度(1-4)',
+        'description': '資產負債表只支援單季財報'
+    }
+}
+
+# 靜態設定在啟動時序列化一次，請求時直接回傳 bytes
+SUPPORTED_RANKINGS_BODY = FastJSONResponse(content={"data": build_supported_rankings(), "status": "ok"}).body
+REPORT_TYPE_RULES_BODY = FastJSONResponse(content={"data": REPORT_TYPE_RULES, "status": "ok"}).body
+
+
+@router.get("/api/advanced_search/supported_rankings")
+async def get_supported_rankings():
+    """
+    獲取支援的排行榜類型列表，依照三種財報表分類
+    """
+    return Response(content=SUPPORTED_RANKINGS_BODY, status_code=200, media_type="application/json")
 
 
 @router.get("/api/advanced_search/report_type_rules")
@@ -594,30 +1270,7 @@ async def get_report_type_rules():
     """
     獲取財報類型與期間的對應規則，依照 statement_type 分類
     """
-    rules = {
-        'cash_flow': {
-            'supported_periods': ['annual'],
-            'quarter_rule': '自動使用第4季',
-            'description': '現金流量表只支援年度財報'
-        },
-        'income_statement': {
-            'supported_periods': ['quarterly', 'annual'],
-            'quarter_rule': 'quarterly需指定季度(1-4), annual自動使用第4季',
-            'description': '損益表支援單季和年度財報'
-        },
-        'balance_sheet': {
-            'supported_periods': ['quarterly'],
-            'quarter_rule': '必須指定季度(1-4)',
-            'description': '資產負債表只支援單季財報'
-        }
-    }
-    return JSONResponse(
-        status_code=200,
-        content={
-            "data": rules,
-            "status": "ok"
-        }
-    )
+    return Response(content=REPORT_TYPE_RULES_BODY, status_code=200, media_type="application/json")
 
 
 @router.get("/api/advanced_search/count")
@@ -710,53 +1363,37 @@ async def get_ranking_count(
             detail="產業名稱格式不正確，只能包含中英文、數字和空格"
         )
 
+    cache_key = response_cache.make_key(
+        "count",
+        ranking_type=ranking_type, year=year, report_type=report_type,
+        quarter=quarter, sector_name=sector_name
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return FastJSONResponse(status_code=200, content=cached)
+
     try:
         # 使用 asyncpg 的非同步連線池獲取連線
-        async with postgresql_pool.get_connection() as conn:
-            # 構建查詢條件
-            where_conditions = ["fr.year = $1", "fr.report_type = $2"]
-            params = [year, db_report_type]
-            param_index = 3
-            
-            # 添加季度條件
-            if quarter is not None:
-                where_conditions.append(f"fr.quarter = ${param_index}")
-                params.append(quarter)
-                param_index += 1
-            
-            # 添加產業條件
-            if sector_name:
-                where_conditions.append(f"s.sector_name = ${param_index}")
-                params.append(sector_name)
-                param_index += 1
-            
-            # 構建計數查詢語句
-            count_query = f"""
-                SELECT COUNT(*) as total_count
-                FROM {table_name} AS fr
-                INNER JOIN Companies AS c ON fr.company_id = c.company_id
-                INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
-                INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
-                WHERE {' AND '.join(where_conditions)};
-            """
-            
-            result = await conn.fetchrow(count_query, *params)
+        async with postgresql_pool.get_read_connection() as conn:
+            count_query, params = AdvancedSearch.build_count_query(
+                table_name, year, db_report_type, quarter, sector_name
+            )
+            result = await statement_registry.fetchrow(conn, count_query, *params)
             total_count = result['total_count'] if result else 0
 
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "data": {
-                        "total_count": total_count,
-                        "ranking_type": ranking_type,
-                        "year": year,
-                        "report_type": report_type,
-                        "sector_name": sector_name,
-                        "quarter": quarter
-                    },
-                    "status": "ok"
-                }
-            )
+            content = {
+                "data": {
+                    "total_count": total_count,
+                    "ranking_type": ranking_type,
+                    "year": year,
+                    "report_type": report_type,
+                    "sector_name": sector_name,
+                    "quarter": quarter
+                },
+                "status": "ok"
+            }
+            response_cache.set(cache_key, content)
+            return FastJSONResponse(status_code=200, content=content)
 
     except Exception as e:
         # 捕捉其他未預期的資料庫錯誤
@@ -797,224 +1434,35 @@ async def get_stock_ranking(
             status_code=400,
             detail="年份格式不正確，必須在 1900-2025 之間"
         )
-    # 驗證 statement_type
-    valid_statement_types = ["cash_flow", "income_statement", "balance_sheet"]
-    if statement_type not in valid_statement_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"statement_type 必須為 {valid_statement_types} 之一"
-        )
-    # 驗證 report_type
-    valid_report_types = ["annual", "accumulated", "quarterly"]
-    if report_type not in valid_report_types:
-        raise HTTPException(
-            status_code=400,
-            detail="不支援的財報期間，必須是 'annual'、'accumulated' 或 'quarterly'"
-        )
-    db_report_type = AdvancedSearch.convert_report_period(report_type)
-    # 根據 statement_type 檢查 report_type/quarter 規則
-    if statement_type == "cash_flow":
-        if report_type == "annual":
-            db_report_type = "accumulated"
-            quarter = 4
-        elif report_type == "accumulated":
-            db_report_type = "accumulated"
-            if year == 2025:
-                if quarter != 1:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="2025 年現金流量表累計只支援第一季 (quarter=1)"
-                    )
-                quarter = 1
-            else:
-                if quarter not in [1, 2, 3]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="現金流量表累計只支援第一~三季 (quarter=1,2,3)"
-                    )
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="現金流量表只支援年報(annual)或累計(accumulated)"
-            )
-    elif statement_type == "income_statement":
-        if report_type == "annual":
-            db_report_type = "accumulated"
-            quarter = 4
-        elif report_type == "accumulated":
-            db_report_type = "accumulated"
-            if year == 2025:
-                if quarter != 1:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="2025 年損益表累計只支援第一季 (quarter=1)"
-                    )
-                quarter = 1
-            else:
-                if quarter not in [1, 2, 3]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="損益表累計只支援第一~三季 (quarter=1,2,3)"
-                    )
-        elif report_type == "quarterly":
-            db_report_type = "quarterly"
-            if year == 2025:
-                if quarter != 1:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="2025 年損益表季報只支援第一季 (quarter=1)"
-                    )
-                quarter = 1
-            else:
-                if quarter not in [1, 2, 3, 4]:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="損益表季報只支援第一~四季 (quarter=1,2,3,4)"
-                    )
-        else:
+    db_report_type, quarter = AdvancedSearch.resolve_stock_ranking_period(statement_type, report_type, year, quarter)
+    try:
+        # 公司所在國家與產業由記憶體中的公司索引提供
+        stock_info = await company_index.resolve_symbol(stock_symbol)
+        # 沒有國家或產業的公司無法計算產業排名
+        if not stock_info or not stock_info['country_name'] or not stock_info['sector_name']:
             raise HTTPException(
-                status_code=400,
-                detail="損益表只支援年報(annual)、累計(accumulated)或季報(quarterly)"
+                status_code=404,
+                detail=f"未找到股票代碼 {stock_symbol} 的資料"
             )
-    elif statement_type == "balance_sheet":
-        if report_type != "quarterly":
-            raise HTTPException(
-                status_code=400,
-                detail="資產負債表只支援季報(quarterly)"
+        country_name = stock_info['country_name']
+        sector_name = stock_info['sector_name']
+        company_id = stock_info['company_id']
+        async with postgresql_pool.get_read_connection() as conn:
+            results = await AdvancedSearch.fetch_stock_rankings(
+                conn, company_id, country_name, sector_name,
+                statement_type, year, db_report_type, quarter
             )
-        db_report_type = "quarterly"
-        if year == 2025:
-            if quarter != 1:
-                raise HTTPException(
-                    status_code=400,
-                    detail="2025 年資產負債表只支援第一季 (quarter=1)"
-                )
-            quarter = 1
-        else:
-            if quarter not in [1, 2, 3, 4]:
-                raise HTTPException(
-                    status_code=400,
-                    detail="資產負債表只支援第一~四季 (quarter=1,2,3,4)"
-                )
-    try:
-        async with postgresql_pool.get_connection() as conn:
-            stock_info_query = """
-                SELECT 
-                    c.stock_symbol,
-                    ct.country_name,
-                    s.sector_name,
-                    c.company_id
-                FROM Companies AS c
-                INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
-                INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
-                WHERE c.stock_symbol = $1
-            """
-            stock_info = await conn.fetchrow(stock_info_query, stock_symbol)
-            if not stock_info:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"未找到股票代碼 {stock_symbol} 的資料"
-                )
-            country_name = stock_info['country_name']
-            sector_name = stock_info['sector_name']
-            company_id = stock_info['company_id']
-            # 只查詢該 statement_type 對應的指標
-            table_map = {
-                "cash_flow": "Cash_Flow_Statements",
-                "income_statement": "Income_Statements",
-                "balance_sheet": "Balance_Sheets"
-            }
-            table_name = table_map[statement_type]
-            # 過濾指標
-            filtered_rankings = {
-                k: v for k, v in AdvancedSearch.SUPPORTED_RANKINGS.items() if v['table'] == table_name
-            }
-            results = {}
-            for ranking_key, ranking_config in filtered_rankings.items():
-                field_name = ranking_config['field']
-                ranking_query = f"""
-                    WITH RankedData AS (
-                        SELECT 
-                            c.stock_symbol,
-                            c.company_id,
-                            fr.{field_name},
-                            ROW_NUMBER() OVER (
-                                ORDER BY fr.{field_name} DESC NULLS LAST
-                            ) as rank,
-                            COUNT(*) OVER () as total_count
-                        FROM {table_name} AS fr
-                        INNER JOIN Companies AS c ON fr.company_id = c.company_id
-                        INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
-                        INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
-                        WHERE ct.country_name = $1 
-                        AND s.sector_name = $2 
-                        AND fr.year = $3 
-                        AND fr.report_type = $4 
-                        AND fr.quarter = $5
-                        AND fr.{field_name} IS NOT NULL
-                    )
-                    SELECT 
-                        stock_symbol,
-                        {field_name} as value,
-                        rank,
-                        total_count
-                    FROM RankedData
-                    WHERE company_id = $6
-                """
-                ranking_result = await conn.fetchrow(
-                    ranking_query, 
-                    country_name, 
-                    sector_name, 
-                    year, 
-                    db_report_type, 
-                    quarter, 
-                    company_id
-                )
-                if ranking_result:
-                    results[ranking_key] = {
-                        'description': ranking_config['description'],
-                        'value': float(ranking_result['value']) if ranking_result['value'] is not None else None,
-                        'rank': ranking_result['rank'],
-                        'total_count': ranking_result['total_count'],
-                        'table': table_name,
-                        'field': field_name
-                    }
-                else:
-                    results[ranking_key] = {
-                        'description': ranking_config['description'],
-                        'value': None,
-                        'rank': None,
-                        'total_count': 0,
-                        'table': table_name,
-                        'field': field_name,
-                        'note': '該指標在此期間無資料'
-                    }
-            response_data = {
-                'stock_info': {
-                    'stock_symbol': stock_symbol,
-                    'country': country_name,
-                    'sector': sector_name
-                },
-                'query_params': {
-                    'year': year,
-                    'report_type': report_type,
-                    'quarter': quarter,
-                    'statement_type': statement_type
-                },
-                'rankings': results,
-                'summary': {
-                    'total_metrics': len(results),
-                    'metrics_with_rank': len([r for r in results.values() if r['rank'] is not None]),
-                    'metrics_without_data': len([r for r in results.values() if r['rank' ] is None])
-                }
+        response_data = AdvancedSearch.build_stock_ranking_data(
+            stock_symbol, country_name, sector_name,
+            year, report_type, quarter, statement_type, results
+        )
+        return FastJSONResponse(
+            status_code=200,
+            content={
+                "data": response_data,
+                "status": "ok"
             }
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "data": response_data,
-                    "status": "ok"
-                }
-            )
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -1027,11 +1475,17 @@ async def get_sector_list():
     """
     取得所有產業名稱清單，供前端下拉選單使用
     """
+    cache_key = response_cache.make_key("sector_list")
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return FastJSONResponse(status_code=200, content=cached)
     try:
-        async with postgresql_pool.get_connection() as conn:
-            rows = await conn.fetch("SELECT sector_name FROM Sectors ORDER BY sector_name ASC;")
+        async with postgresql_pool.get_read_connection() as conn:
+            rows = await statement_registry.fetch(conn, AdvancedSearch.SECTOR_LIST_QUERY)
             sector_list = [row['sector_name'] for row in rows]
-            return JSONResponse(status_code=200, content={"data": sector_list, "status": "ok"})
+            content = {"data": sector_list, "status": "ok"}
+            response_cache.set(cache_key, content)
+            return FastJSONResponse(status_code=200, content=content)
     except Exception as e:
         print(f"查詢產業清單時發生錯誤: {e}")
         raise HTTPException(status_code=500, detail="取得產業清單失敗")
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from fastapi.responses import JSONResponse
+from module.json_response import FastJSONResponse
 from bson import ObjectId
 from module.mongodb_connection_pool import mongodb_pool
+from module.news import News
+from module.search_tokens import SearchTokens
 
 router = APIRouter()
 
@@ -16,25 +18,24 @@ async def get_ai_news(
     is_summary: Optional[bool] = None,
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
-    page: int = 1
+    page: int = 1,
+    before: Optional[str] = Query(None, description="游標分頁：上一頁回傳的 next_cursor (<publishAt>,<_id>)，指定時忽略 page", max_length=100)
 ):
+    """
+    - page: 以 skip 分頁 (相容舊版)，深頁成本隨頁數增加
+    - before: 以上一頁最後一筆做 seek，每頁成本固定；回應中的 next_cursor 即下一頁的 before
+    """
     limit = 15
-    skip = (page - 1) * limit
 
-    # 組查詢條件
-    query = {}
+    # 組查詢條件，關鍵字與產業以預先切詞的 search_tokens / industry_tokens 索引取候選
+    conditions = []
 
     if keyword:
-        query["$or"] = [
-            {"summary": {"$regex": keyword, "$options": "i"}},
-            {"important_news": {"$regex": keyword, "$options": "i"}},
-            {"potential_stocks_and_industries": {"$regex": keyword, "$options": "i"}},
-            {"source_news.title": {"$regex": keyword, "$options": "i"}}
-        ]
+        conditions.append(SearchTokens.keyword_filter(keyword, "search_tokens", SearchTokens.AI_NEWS_KEYWORD_FIELDS))
     if industry:
-        query["industry_list"] = {
-            "$elemMatch": {"$regex": industry, "$options": "i"}
-        }
+        conditions.append(SearchTokens.industry_filter(industry))
+
+    query = {"$and": conditions} if conditions else {}
 
     if is_summary is not None:
         query["is_summary"] = is_summary
@@ -45,16 +46,26 @@ async def get_ai_news(
             "$lte": end_time
         }
 
-    # 查詢 + 排序 + 分頁
-    results = list(
-        collection.find(query)
-        .sort("publishAt", -1)
+    skip = (page - 1) * limit
+    if before is not None:
+        try:
+            query = News.apply_before(query, News.decode_cursor(before))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        skip = 0
+
+    # 查詢 + 排序 + 分頁 (多取一筆判斷是否還有下一頁)
+    results = await mongodb_pool.to_list(
+        collection.find(query, {"search_tokens": 0, "industry_tokens": 0})
+        .sort(News.SORT)
         .skip(skip)
-        .limit(limit)
+        .limit(limit + 1)
     )
+    has_next = len(results) > limit
+    next_cursor = News.next_cursor(results, limit)
+    results = results[:limit]
 
-    # 處理 ObjectId
-    for r in results:
-        r["_id"] = str(r["_id"])
-
-    return JSONResponse(content={"nextPage":page + 1 if len(results) == limit else None,"page": page, "data": results}) 
\ No newline at end of file
+    # ObjectId 由 FastJSONResponse 編碼為字串，不需逐筆轉換
+    if before is not None:
+        return FastJSONResponse(content={"nextPage": None, "page": None, "next_cursor": next_cursor, "data": results})
+    return FastJSONResponse(content={"nextPage":page + 1 if has_next else None,"page": page, "next_cursor": next_cursor, "data": results})
@@ -1,11 +1,57 @@
 from fastapi import APIRouter,HTTPException,Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from module.json_response import FastJSONResponse, dumps
 from module.postgresql_connection_pool import postgresql_pool
 from module.financial_report import Financial_report
+from module.company_index import company_index
+from module.statement_registry import statement_registry
 
 
 router = APIRouter()
 
+# 串流模式每次從 cursor 預取、並合併成一個 chunk 送出的筆數
+STREAM_BATCH_SIZE = 100
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json"
+}
+
+
+async def stream_report_rows(query: str, params: list, stream_format: str):
+    """
+    以 asyncpg cursor 逐批讀取財報並編碼送出，記憶體用量與資料年數無關
+    - ndjson: 每列一個 JSON 物件
+    - json: 與一般模式相同的 {"data": [...], "status": "ok"}，以 chunked 方式送出
+    連線在產生器內取得，確保串流結束或用戶端中斷時一定會釋放
+    """
+    first = True
+    if stream_format == "json":
+        yield b'{"data":['
+    try:
+        async with postgresql_pool.get_read_connection() as conn:
+            # cursor 必須在交易中使用
+            async with conn.transaction():
+                buffer = []
+                async for record in conn.cursor(query, *params, prefetch=STREAM_BATCH_SIZE):
+                    if stream_format == "ndjson":
+                        buffer.append(dumps(record) + b"\n")
+                    else:
+                        buffer.append(dumps(record) if first else b"," + dumps(record))
+                    first = False
+                    if len(buffer) >= STREAM_BATCH_SIZE:
+                        yield b"".join(buffer)
+                        buffer = []
+                if buffer:
+                    yield b"".join(buffer)
+    except Exception as e:
+        # 回應標頭已送出，無法再改變狀態碼，只能中止串流
+        print(f"財報串流查詢錯誤: {e}")
+        raise
+    if stream_format == "json":
+        yield b'],"status":"ok"}'
+
 
 @router.get("/api/financial_report")
 async def get_financial_report(
@@ -13,7 +59,23 @@ async def get_financial_report(
     country: str = Query(..., description="國家代碼 (tw, us, hk, jp, cn)", min_length=2),
     report_type: str = Query(...,  description="財報種類 (balance_sheets,income_statements,cash_flow)", ),
     report_period: str = Query(..., description="財報期間 (quarterly, accumulated)"),    
+    fields: Optional[str] = Query(None, description="只回傳指定欄位，逗號分隔 (例如 revenue,net_income)", max_length=1000),
+    columns: Optional[str] = Query(None, description="同 fields (舊名稱)，與 fields 同時指定時必須相同", max_length=1000),
+    from_year: Optional[int] = Query(None, description="起始年度 (含)", ge=1900, le=2100),
+    to_year: Optional[int] = Query(None, description="結束年度 (含)", ge=1900, le=2100),
+    stream: bool = Query(False, description="串流回傳，適合完整歷史資料"),
+    stream_format: str = Query("ndjson", description="串流格式 (ndjson, json)")
 ):
+    """
+    查詢某公司所有年份的財報
+
+    - fields (或 columns): 只選取指定欄位 (固定包含 year, quarter, report_type, original_currency)
+    - from_year / to_year: 只查詢指定年度區間
+    - stream=true: 以 cursor 分批讀取並串流回傳，首位元組時間與記憶體用量不隨資料量增加
+      - ndjson: 每列一個 JSON 物件 (application/x-ndjson)
+      - json: 與一般模式相同格式，以 chunked 方式送出
+      - 公司不存在時回傳 404；公司存在但無資料時回傳空結果
+    """
     # 驗證股票代碼
     if not Financial_report.validate_stock_symbol(stock_symbol):
         raise HTTPException(
@@ -54,31 +116,54 @@ async def get_financial_report(
         country_name = Financial_report.get_country_name(country)
     except HTTPException as e:
         raise e
-    
 
+    # 驗證串流格式
+    if stream and stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支援的串流格式：{stream_format}。支援的格式：{', '.join(STREAM_MEDIA_TYPES.keys())}"
+        )
+
+    # 驗證年度區間
+    if from_year is not None and to_year is not None and from_year > to_year:
+        raise HTTPException(
+            status_code=400,
+            detail="起始年度不可大於結束年度"
+        )
+
+    # 解析欄位投影 (columns 為 fields 的舊名稱，同時指定且不同時無法判斷以何者為準)
+    if fields is not None and columns is not None and fields != columns:
+        raise HTTPException(
+            status_code=400,
+            detail="fields 與 columns 不可同時指定不同的值"
+        )
+    requested_fields = fields if fields is not None else columns
+    selected_columns = Financial_report.parse_columns(table_name, requested_fields) if requested_fields else None
     try:
+        # 由公司索引取得 company_id，財報查詢不需再 JOIN Companies / Countrys
+        company = await company_index.resolve(stock_symbol, country_name)
+        if not company:
+            return FastJSONResponse(status_code=404, content={"message": "未找到相關財報資料"})
+        # 查詢該財報類別指定年度區間 (未指定時為所有年份) 的資料
+        query, params = Financial_report.build_report_query(
+            table_name, company['company_id'], report_period,
+            selected_columns, from_year, to_year
+        )
+        if stream:
+            return StreamingResponse(
+                stream_report_rows(query, params, stream_format),
+                media_type=STREAM_MEDIA_TYPES[stream_format]
+            )
+
         # 使用 asyncpg 的非同步連線池獲取連線
-        async with postgresql_pool.get_connection() as conn:
-            # 只有一種查詢模式：查詢該財報類別所有年份的所有資料
-            query = f"""
-                SELECT fr.*, c.stock_symbol, ct.country_name
-                FROM {table_name} AS fr
-                INNER JOIN Companies AS c ON fr.company_id = c.company_id
-                INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
-                WHERE c.stock_symbol = $1 AND ct.country_name = $2 AND fr.report_type = $3
-                ORDER BY fr.year DESC, fr.quarter DESC;
-            """
-            params = [stock_symbol, country_name, report_period]
-            results = await conn.fetch(query, *params)
-            
-            # 將 asyncpg.Record 物件轉換為字典列表
-            formatted_results = [dict(record) for record in results]
-            formatted_results = Financial_report.decimal_to_float(formatted_results)
-
-            if not formatted_results:
-                return JSONResponse(status_code=404, content={"message": "未找到相關財報資料"})
-
-            return JSONResponse(status_code=200,content={"data":formatted_results,"status":"ok"})
+        async with postgresql_pool.get_read_connection() as conn:
+            results = await statement_registry.fetch(conn, query, *params)
+
+            if not results:
+                return FastJSONResponse(status_code=404, content={"message": "未找到相關財報資料"})
+
+            # asyncpg.Record 直接交給 FastJSONResponse 編碼 (numeric 已由連線池的 codec 解碼為 float)
+            return FastJSONResponse(status_code=200,content={"data":results,"status":"ok"})
 
     except HTTPException as e:
         raise e
@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+from module.json_response import FastJSONResponse
+from module.postgresql_connection_pool import postgresql_pool
+from module.mongodb_connection_pool import mongodb_pool
+import os
+
+router = APIRouter()
+
+
+@router.get("/health/live", include_in_schema=False)
+async def liveness():
+    """
+    行程存活即回傳 200，不檢查資料庫 (資料庫中斷時不應重啟容器)
+    """
+    return FastJSONResponse(status_code=200, content={"status": "ok", "pid": os.getpid()})
+
+
+@router.get("/health/ready", include_in_schema=False)
+async def readiness():
+    """
+    PostgreSQL 連線池與 MongoDB 連線都已建立時才回傳 200，否則 503
+    啟動時預熱失敗的連線池在此重試，資料庫恢復後自動轉為 ready
+    """
+    checks = {}
+    try:
+        await postgresql_pool.initialize_pool()
+        checks["postgresql"] = True
+    except Exception as e:
+        print(f"readiness: PostgreSQL 連線池尚未就緒: {e}")
+        checks["postgresql"] = False
+    if not mongodb_pool.ready:
+        try:
+            await mongodb_pool.warm()
+        except Exception as e:
+            print(f"readiness: MongoDB 尚未就緒: {e}")
+    checks["mongodb"] = mongodb_pool.ready
+
+    ready = all(checks.values())
+    content = {"status": "ok" if ready else "unavailable", "pid": os.getpid(), "checks": checks}
+    return FastJSONResponse(status_code=200 if ready else 503, content=content)
@@ -0,0 +1,165 @@
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import PlainTextResponse
+from module.json_response import FastJSONResponse
+from module.response_cache import response_cache
+from module.data_version import data_version
+from module.company_index import company_index
+from module.statement_registry import statement_registry
+from module.password_hasher import password_hasher
+from module.jwt import token_cache
+from module.request_metrics import request_metrics, prometheus_histogram
+from module.slow_query_log import slow_query_log
+from module.postgresql_connection_pool import postgresql_pool
+from typing import Optional
+from dotenv import load_dotenv
+import hmac
+import os
+import time
+
+load_dotenv()
+
+router = APIRouter()
+
+# 資料載入腳本與 API 共用的內部金鑰，未設定時內部 API 一律拒絕
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+
+def verify_internal_token(token: Optional[str]):
+    if not INTERNAL_API_TOKEN or not token or not hmac.compare_digest(token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=403, detail="無權限存取內部 API")
+
+
+@router.post("/internal/cache/invalidate", include_in_schema=False)
+async def invalidate_cache(
+    namespace: Optional[str] = None,
+    x_internal_token: Optional[str] = Header(None)
+):
+    """
+    清除 API 回應快取，供資料載入腳本在寫入新財報後呼叫
+    同時重新讀取 Data_Versions (通常已由 LISTEN 收到)，讀取失敗時只在此 worker 內改變 ETag
+    """
+    verify_internal_token(x_internal_token)
+    removed = response_cache.invalidate(namespace)
+    try:
+        await data_version.refresh()
+    except Exception as e:
+        print(f"資料版本讀取失敗，改為本機遞增: {e}")
+        data_version.bump()
+    print(f"已清除 API 回應快取 {removed} 筆 (namespace={namespace})")
+    return FastJSONResponse(status_code=200, content={"data": {"removed": removed}, "status": "ok"})
+
+
+@router.get("/internal/cache/stats", include_in_schema=False)
+async def get_cache_stats(x_internal_token: Optional[str] = Header(None)):
+    """
+    取得 API 回應快取命中統計
+    """
+    verify_internal_token(x_internal_token)
+    return FastJSONResponse(status_code=200, content={"data": response_cache.stats(), "status": "ok"})
+
+
+@router.get("/internal/company_index/stats", include_in_schema=False)
+async def get_company_index_stats(x_internal_token: Optional[str] = Header(None)):
+    """
+    取得公司索引大小與重建耗時
+    """
+    verify_internal_token(x_internal_token)
+    return FastJSONResponse(status_code=200, content={"data": company_index.stats(), "status": "ok"})
+
+
+@router.post("/internal/company_index/refresh", include_in_schema=False)
+async def refresh_company_index(x_internal_token: Optional[str] = Header(None)):
+    """
+    立即重建公司索引，供新增公司的資料載入腳本呼叫
+    """
+    verify_internal_token(x_internal_token)
+    try:
+        await company_index.refresh()
+    except Exception as e:
+        print(f"公司索引重建失敗: {e}")
+        raise HTTPException(status_code=500, detail="公司索引重建失敗")
+    return FastJSONResponse(status_code=200, content={"data": company_index.stats(), "status": "ok"})
+
+
+@router.get("/internal/statements/stats", include_in_schema=False)
+async def get_statement_stats(x_internal_token: Optional[str] = Header(None)):
+    """
+    取得 prepared statement 命中統計與連線建立時的 prepare 耗時
+    """
+    verify_internal_token(x_internal_token)
+    return FastJSONResponse(status_code=200, content={"data": statement_registry.stats(), "status": "ok"})
+
+
+@router.get("/internal/slow_queries", include_in_schema=False)
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order: str = Query("max"),
+    x_internal_token: Optional[str] = Header(None)
+):
+    """
+    取得此 worker 最慢的語句種類 (依 max / avg / total 排序) 與最近的慢查詢 (含參數與抽樣的 EXPLAIN)
+    """
+    verify_internal_token(x_internal_token)
+    try:
+        top = slow_query_log.top(limit, order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    content = {
+        "data": {
+            "pid": os.getpid(),
+            "stats": slow_query_log.stats(),
+            "top": top,
+            "recent": slow_query_log.recent(limit)
+        },
+        "status": "ok"
+    }
+    return FastJSONResponse(status_code=200, content=content)
+
+
+@router.get("/internal/metrics", include_in_schema=False)
+async def get_metrics(x_internal_token: Optional[str] = Header(None)):
+    """
+    取得此 worker 的連線池、查詢耗時與快取指標
+    每個 uvicorn worker 各自回報，以 pid 區分
+    """
+    verify_internal_token(x_internal_token)
+    content = {
+        "data": {
+            "pid": os.getpid(),
+            "timestamp": time.time(),
+            "postgresql_pool": postgresql_pool.stats(),
+            "queries": statement_registry.query_stats(),
+            "statements": statement_registry.stats(),
+            "company_index": company_index.stats(),
+            "response_cache": response_cache.stats(),
+            "data_version": data_version.stats(),
+            "password_hasher": password_hasher.stats(),
+            "auth": token_cache.stats(),
+            "requests": request_metrics.stats()
+        },
+        "status": "ok"
+    }
+    return FastJSONResponse(status_code=200, content=content)
+
+
+@router.get("/internal/metrics/prometheus", include_in_schema=False)
+async def get_prometheus_metrics(x_internal_token: Optional[str] = Header(None)):
+    """
+    以 Prometheus text format 輸出各路由耗時、回應大小、狀態碼與連線池 / SQL 耗時
+    每個 uvicorn worker 各自回報，以 pid label 區分
+    """
+    verify_internal_token(x_internal_token)
+    pid = os.getpid()
+    lines = request_metrics.render_prometheus(pid)
+    lines += [
+        "# HELP db_pool_acquire_seconds Time waiting for a primary PostgreSQL connection.",
+        "# TYPE db_pool_acquire_seconds histogram"
+    ]
+    lines += prometheus_histogram("db_pool_acquire_seconds", {"pid": pid}, postgresql_pool.acquire_wait, 0.001)
+    lines += [
+        "# HELP db_statement_duration_seconds Query time by registered statement kind.",
+        "# TYPE db_statement_duration_seconds histogram"
+    ]
+    for label, timing in sorted(statement_registry.query_timings.items()):
+        lines += prometheus_histogram("db_statement_duration_seconds", {"pid": pid, "statement": label}, timing, 0.001)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
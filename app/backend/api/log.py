@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from module.json_response import FastJSONResponse
 from module.mongodb_connection_pool import mongodb_pool
 from datetime import datetime, timedelta
 
@@ -10,7 +10,7 @@ router = APIRouter()
 collection = mongodb_pool.get_collection("log")
 
 @router.get("/api/log/ai_headline_news_error")
-def get_ai_headline_news_error(
+async def get_ai_headline_news_error(
     date_ts: int = Query(..., description="指定某天的 timestamp（UNIX 秒）"),
     skip: int = Query(0, ge=0, description="跳過前幾筆資料"),
     limit: int = Query(20, ge=1, le=100, description="一次回傳筆數（最多100）"),
@@ -27,13 +27,10 @@ def get_ai_headline_news_error(
             }
         ).skip(skip).limit(limit).sort("timestamp", sort_order)
 
-        results = list(cursor)
+        results = await mongodb_pool.to_list(cursor)
 
-        # ObjectId 轉為字串
-        for r in results:
-            r["_id"] = str(r["_id"])
-
-        return results
+        # ObjectId 由 FastJSONResponse 編碼為字串，不需逐筆轉換
+        return FastJSONResponse(content=results)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"伺服器錯誤：{str(e)}")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query
+from module.json_response import FastJSONResponse
 from bson import ObjectId
 from typing import Optional
 from module.mongodb_connection_pool import mongodb_pool
+from module.news import News
+from module.search_tokens import SearchTokens
 
 router = APIRouter()
 
@@ -16,28 +18,34 @@ async def get_single_news(object_id: str):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ObjectId")
 
-    result = collection.find_one({"_id": obj_id},{"url": 1, "_id": 0})
+    result = await mongodb_pool.run(collection.find_one, {"_id": obj_id}, {"url": 1, "_id": 0})
     
     if not result:
         raise HTTPException(status_code=404, detail="News not found")
 
-    return JSONResponse(content={"data": result})
+    return FastJSONResponse(content={"data": result})
 
 @router.get("/api/news")
 async def get_news(
     keyword: Optional[str] = None,
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
-    page: int = 1
+    page: int = 1,
+    before: Optional[str] = Query(None, description="游標分頁：上一頁回傳的 next_cursor (<publishAt>,<_id>)，指定時忽略 page", max_length=100)
 ):
+    """
+    - page: 以 skip 分頁 (相容舊版)，深頁成本隨頁數增加
+    - before: 以上一頁最後一筆做 seek，每頁成本固定；回應中的 next_cursor 即下一頁的 before
+    """
     limit = 20
-    skip = (page - 1) * limit
 
     # Group query conditions
     query = {}
 
-    if keyword:
-        query["$text"] = {"$search": keyword}
+    # 預設的 $text 索引不會切中文詞，改用寫入時預先切好的 search_tokens (multikey 索引)
+    # 與 $text 相同，以空白分隔的多個詞任一出現即符合
+    if keyword and keyword.strip():
+        query.update(SearchTokens.terms_filter(keyword, "search_tokens", SearchTokens.NEWS_KEYWORD_FIELDS))
 
     if start_time is not None and end_time is not None:
         query["publishAt"] = {
@@ -45,20 +53,33 @@ async def get_news(
             "$lte": end_time
         }
 
+    skip = (page - 1) * limit
+    if before is not None:
+        try:
+            query = News.apply_before(query, News.decode_cursor(before))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        skip = 0
+
     # Use projection to ensure that only the required columns are returned to improve performance
-    projection = {"_id": 0, "news_id": 0, "summary": 0, "keyword": 0, "market": 0, "type": 0, "stock": 0}
-    results = list(
+    # _id 只用於產生 next_cursor，回傳前移除
+    projection = {"news_id": 0, "summary": 0, "keyword": 0, "market": 0, "type": 0, "stock": 0, "search_tokens": 0}
+    results = await mongodb_pool.to_list(
         collection.find(query, projection)
-        .sort("publishAt", -1)
+        .sort(News.SORT)
         .skip(skip)
         .limit(limit+1)
     )
 
     has_next = len(results) > limit
+    next_cursor = News.next_cursor(results, limit)
     results = results[:limit]
 
     for r in results:
+        r.pop("_id", None)
         if r.get("content") is not None: 
             r["content"] = r["content"][:150] # Truncated to 150 characters
 
-    return JSONResponse(content={"nextPage":page + 1 if has_next else None,"page": page, "data": results})
\ No newline at end of file
+    if before is not None:
+        return FastJSONResponse(content={"nextPage": None, "page": None, "next_cursor": next_cursor, "data": results})
+    return FastJSONResponse(content={"nextPage":page + 1 if has_next else None,"page": page, "next_cursor": next_cursor, "data": results})
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from module.json_response import FastJSONResponse
 from typing import Optional
 from module.postgresql_connection_pool import postgresql_pool
 from module.stock import Stock
+from module.financial_report import Financial_report
+from module.company_index import company_index
+from module.statement_registry import statement_registry
+from api.advanced_search import AdvancedSearch
+import asyncio
 
 router = APIRouter()
 
@@ -35,20 +40,154 @@ async def get_stock_info(
         raise e
 
     try:
-        async with postgresql_pool.get_connection() as conn:
-            query = Stock.get_stock_info_query()
-            result_record = await conn.fetchrow(query, stock_symbol, country_name)
-            if not result_record:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"找不到股票代碼 {stock_symbol} 在 {country_name} 的資料"
+        # 公司資料由記憶體中的公司索引提供，不需查詢資料庫
+        company = await company_index.resolve(stock_symbol, country_name)
+        if not company:
+            raise HTTPException(
+                status_code=404,
+                detail=f"找不到股票代碼 {stock_symbol} 在 {country_name} 的資料"
+            )
+        stock_info = Stock.format_stock_data(company)
+        return FastJSONResponse(content={"data": stock_info})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"查詢資料時發生錯誤：{str(e)}"
+        )
+
+
+# bundle 的財報種類對應 stock_ranking 的 statement_type
+BUNDLE_RANKING_STATEMENT_MAP = {
+    'balance_sheets': 'balance_sheet',
+    'income_statements': 'income_statement',
+    'cash_flow': 'cash_flow'
+}
+
+
+def parse_bundle_list(value: str, allowed: list, name: str) -> list:
+    """解析逗號分隔的清單參數，去除重複並保留順序，含不支援的值時拋出 HTTPException(400)"""
+    items = list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+    if not items:
+        raise HTTPException(status_code=400, detail=f"{name} 不可為空")
+    invalid = [item for item in items if item not in allowed]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name} 不支援：{', '.join(invalid)}，可用值為 {allowed}"
+        )
+    return items
+
+
+@router.get("/api/stock/{stock_symbol}/{country}/bundle")
+async def get_stock_bundle(
+    stock_symbol: str,
+    country: str,
+    statements: str = Query("balance_sheets,income_statements,cash_flow", description="財報種類，逗號分隔"),
+    report_periods: str = Query("quarterly,accumulated", description="財報期間，逗號分隔 (quarterly, accumulated)"),
+    from_year: Optional[int] = Query(None, ge=1900, le=2100, description="財報起始年度 (含)"),
+    to_year: Optional[int] = Query(None, ge=1900, le=2100, description="財報結束年度 (含)"),
+    ranking_year: Optional[int] = Query(None, description="排名年份，未指定時不查詢排名"),
+    ranking_report_type: str = Query("quarterly", description="排名財報期間 (quarterly, annual, accumulated)"),
+    ranking_quarter: Optional[int] = Query(None, description="排名季度 (1-4, 可選)")
+):
+    """
+    個股頁面一次取得所需資料：公司資訊、指定財報與產業內排名
+
+    公司只解析一次，之後各財報與排名查詢各自向連線池取得連線併發執行。
+    某財報表的排名期間參數不適用時 (例如 balance_sheet 不支援 annual)，
+    只在該表的排名位置回傳 error，不影響其他資料。
+    """
+    if not Stock.validate_stock_symbol(stock_symbol):
+        raise HTTPException(
+            status_code=400,
+            detail="股票代碼格式不正確，只能包含英文字母和數字"
+        )
+    if not Stock.validate_country_code(country):
+        raise HTTPException(
+            status_code=400,
+            detail="國家代碼格式不正確，只能包含英文字母"
+        )
+    country_name = Stock.get_country_name(country)
+    statement_list = parse_bundle_list(statements, list(Financial_report.REPORT_TABLE_MAP), "statements")
+    period_list = parse_bundle_list(report_periods, ["quarterly", "accumulated"], "report_periods")
+    if from_year is not None and to_year is not None and from_year > to_year:
+        raise HTTPException(status_code=400, detail="from_year 不可大於 to_year")
+    if ranking_year is not None and not AdvancedSearch.validate_year(ranking_year):
+        raise HTTPException(
+            status_code=400,
+            detail="年份格式不正確，必須在 1900-2025 之間"
+        )
+
+    try:
+        company = await company_index.resolve(stock_symbol, country_name)
+        if not company:
+            raise HTTPException(
+                status_code=404,
+                detail=f"找不到股票代碼 {stock_symbol} 在 {country_name} 的資料"
+            )
+        company_id = company['company_id']
+        sector_name = company['sector_name']
+
+        async def fetch_report(statement: str, period: str):
+            table_name = Financial_report.REPORT_TABLE_MAP[statement]
+            query, params = Financial_report.build_report_query(
+                table_name, company_id, period,
+                Financial_report.STATEMENT_COLUMNS[table_name], from_year, to_year
+            )
+            async with postgresql_pool.get_read_connection() as conn:
+                return await statement_registry.fetch(conn, query, *params)
+
+        async def fetch_ranking(statement_type: str):
+            try:
+                db_report_type, quarter = AdvancedSearch.resolve_stock_ranking_period(
+                    statement_type, ranking_report_type, ranking_year, ranking_quarter
                 )
-            stock_info = Stock.format_stock_data(result_record)
-            return JSONResponse(content={"data": stock_info})
+            except HTTPException as e:
+                return {"error": e.detail}
+            # 與 stock_ranking 相同，沒有產業的公司無法計算產業排名
+            if not sector_name:
+                return {"error": f"股票代碼 {stock_symbol} 沒有產業資料，無法計算產業排名"}
+            async with postgresql_pool.get_read_connection() as conn:
+                results = await AdvancedSearch.fetch_stock_rankings(
+                    conn, company_id, country_name, sector_name,
+                    statement_type, ranking_year, db_report_type, quarter
+                )
+            return AdvancedSearch.build_stock_ranking_data(
+                stock_symbol, country_name, sector_name,
+                ranking_year, ranking_report_type, quarter, statement_type, results
+            )
+
+        report_keys = [(statement, period) for statement in statement_list for period in period_list]
+        ranking_keys = []
+        if ranking_year is not None:
+            ranking_keys = [BUNDLE_RANKING_STATEMENT_MAP[statement] for statement in statement_list]
+        results = await asyncio.gather(
+            *(fetch_report(statement, period) for statement, period in report_keys),
+            *(fetch_ranking(statement_type) for statement_type in ranking_keys)
+        )
+
+        financial_reports = {statement: {} for statement in statement_list}
+        for (statement, period), rows in zip(report_keys, results):
+            financial_reports[statement][period] = rows
+        rankings = dict(zip(ranking_keys, results[len(report_keys):]))
+
+        return FastJSONResponse(
+            content={
+                "data": {
+                    "stock_info": Stock.format_stock_data(company),
+                    "financial_reports": financial_reports,
+                    "rankings": rankings
+                },
+                "status": "ok"
+            }
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
+        print(f"查詢個股 bundle 時發生錯誤: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"查詢資料時發生錯誤：{str(e)}"
-        ) 
\ No newline at end of file
+        )
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException,Cookie
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends
+from module.json_response import FastJSONResponse
 from pydantic import BaseModel
 from module.user import login_check
-from module.jwt import JWT_token_make,decode_jwt
+from module.jwt import JWT_token_make, get_current_user
 from fastapi.security import OAuth2PasswordBearer
 
 
@@ -27,7 +27,7 @@ async def login_process(request: User):
         token = JWT_token_make(user_id,name,email,role,status)
         if token is not False:
             response_data = {"status": True, "message": "Login successful"}
-            response = JSONResponse(status_code=200, content=response_data) 
+            response = FastJSONResponse(status_code=200, content=response_data) 
             response.set_cookie(
                 key="access_token",
                 value=token,
@@ -39,27 +39,20 @@ async def login_process(request: User):
             return response
         else:
             response = {"status":False, "message": "Token程序伺服器運作錯誤"}
-            return JSONResponse(status_code=500, content=response)
+            return FastJSONResponse(status_code=500, content=response)
     except HTTPException as e:
         raise e
     except Exception as e:
         # Catch all other unexpected errors to prevent the server from crashing
         response = {"error": True, "message": str(e)}
-        return JSONResponse(content=response, status_code=500)
+        return FastJSONResponse(content=response, status_code=500)
 
     
 """Get the currently logged in member information"""    
 
 @router.get("/api/user/auth")
-async def get_user_info(access_token: str = Cookie(None)):
+async def get_user_info(payload: dict = Depends(get_current_user)):
     try:
-        if not access_token:
-            raise HTTPException(status_code=401, detail="Missing token")
-
-        payload = decode_jwt(access_token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
         response = {
             "data": {
                 "id": payload.get("user_id"),
@@ -69,19 +62,19 @@ async def get_user_info(access_token: str = Cookie(None)):
                 "status": payload.get("status")
             }
         }
-        return JSONResponse(content=response, status_code=200)
+        return FastJSONResponse(content=response, status_code=200)
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        return JSONResponse(content={"error": True, "message": str(e)}, status_code=500)
+        return FastJSONResponse(content={"error": True, "message": str(e)}, status_code=500)
 
 
 "Logout API: Deleting HttpOnly Cookies"
    
 @router.post("/api/user/logout")
 async def logout():
-    response = JSONResponse(
+    response = FastJSONResponse(
         content={"status": True, "message": "Logout successful"}
     )
     response.delete_cookie(
@@ -1,12 +1,70 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from contextlib import asynccontextmanager
 import os
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
-from api import log, ai_news, news, stock, financial_report, advanced_search, user
-
-app = FastAPI()
+from module.json_response import FastJSONResponse
+from module.compression import CompressionMiddleware
+from module.request_metrics import RequestTimingMiddleware
+from module.conditional_get import ConditionalGetMiddleware
+from module.static_assets import StaticAssets, VersionedStaticFiles
+from module.company_index import company_index
+from module.data_version import data_version
+from module.response_cache import response_cache
+from module.postgresql_connection_pool import postgresql_pool
+from module.password_hasher import password_hasher
+from module.statement_registry import statement_registry
+from module.slow_query_log import slow_query_log
+from module.mongodb_connection_pool import mongodb_pool
+from api import log, ai_news, news, stock, financial_report, advanced_search, user, internal, health
+
+
+async def refresh_company_index():
+    try:
+        await company_index.refresh()
+    except Exception as e:
+        print(f"公司索引重建失敗: {e}")
+
+
+def on_data_version_change(dataset, version):
+    # 載入腳本遞增 Data_Versions 後立即清除回應快取，不需等 TTL 過期；公司資料變動時重建公司索引
+    # 副本可能尚未套用新資料，先讓讀取走主庫，避免重新填入的快取與新的 ETag 對應到舊資料
+    postgresql_pool.pin_reads_to_primary()
+    removed = response_cache.invalidate()
+    print(f"資料版本變動 ({dataset}={version})，已清除 API 回應快取 {removed} 筆")
+    if dataset == "Companies":
+        asyncio.create_task(refresh_company_index())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 啟動時預先建立 PostgreSQL 連線池 (min_size 條連線並 prepare 常用語句)，第一個請求不需等待建立連線
+    try:
+        await postgresql_pool.initialize_pool()
+    except Exception as e:
+        print(f"PostgreSQL 連線池預熱失敗，將於第一次查詢時重試: {e}")
+    # 建立 MongoDB 連線 (MongoClient 在 import 時不連線)，失敗時由 /health/ready 重試
+    try:
+        await mongodb_pool.warm()
+    except Exception as e:
+        print(f"MongoDB 連線預熱失敗，將於 readiness 檢查時重試: {e}")
+    # 每個登錄語句的耗時交給慢查詢記錄
+    statement_registry.add_listener(slow_query_log.observe)
+    # 載入公司索引並開始背景定期重建
+    await company_index.start()
+    # 讀取資料版本並 LISTEN 載入腳本的通知
+    data_version.add_listener(on_data_version_change)
+    await data_version.start()
+    yield
+    await data_version.stop()
+    await company_index.stop()
+    await postgresql_pool.close_all()
+    password_hasher.close()
+    mongodb_pool.close()
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +73,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 財報、排行榜 API 以資料版本產生 ETag，資料未更新時回傳 304
+app.add_middleware(ConditionalGetMiddleware)
+# 壓縮 JSON / HTML / CSS / JS 回應 (304 等無內容回應不處理)
+app.add_middleware(CompressionMiddleware)
+# 最外層：記錄每個路由的耗時、回應大小 (壓縮後) 與 db_acquire / db_query / serialize 各階段耗時
+app.add_middleware(RequestTimingMiddleware)
 
 # Dynamically obtain the root directory (that is, the app/ folder)
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,45 +89,48 @@ CSS_DIR = BASE_DIR / "frontend" / "css"
 JS_DIR = BASE_DIR / "frontend" / "js"
 IMG_DIR = BASE_DIR / "frontend" / "img"
 
+# HTML 中的靜態檔網址加上內容 hash (?v=)，帶 hash 的請求可長期快取
+static_assets = StaticAssets({"css": CSS_DIR, "js": JS_DIR, "img": IMG_DIR})
+
 # 掛載靜態檔案目錄
-app.mount("/css", StaticFiles(directory=str(CSS_DIR), html=True), name="css")
-app.mount("/js", StaticFiles(directory=str(JS_DIR), html=True), name="js")
-app.mount("/img", StaticFiles(directory=str(IMG_DIR), html=True), name="img")
+app.mount("/css", VersionedStaticFiles(directory=str(CSS_DIR), html=True, assets=static_assets), name="css")
+app.mount("/js", VersionedStaticFiles(directory=str(JS_DIR), html=True, assets=static_assets), name="js")
+app.mount("/img", VersionedStaticFiles(directory=str(IMG_DIR), html=True, assets=static_assets), name="img")
 
 # 回傳 HTML 頁面
 @app.get("/", include_in_schema=False)
 async def index(request: Request):
-    return FileResponse(HTML_DIR / "index.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "index.html")
 
 @app.get("/home", include_in_schema=False)
 async def home(request: Request):
-    return FileResponse(HTML_DIR / "index.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "index.html")
 
 
 @app.get("/news", include_in_schema=False)
 async def news_page(request: Request):
-    return FileResponse(HTML_DIR / "news.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "news.html")
 
 
 @app.get("/stock/{symbol}/{country}", include_in_schema=False)
 async def stock_page(request: Request, symbol: str, country: str):
-    return FileResponse(HTML_DIR / "stock.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "stock.html")
 
 @app.get("/insight", include_in_schema=False)
 async def home(request: Request):
-    return FileResponse(HTML_DIR / "insight.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "insight.html")
 
 @app.get("/advanced_search", include_in_schema=False)
 async def advanced_search_page(request: Request):
-    return FileResponse(HTML_DIR / "advanced_search.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "advanced_search.html")
 
 @app.get("/info", include_in_schema=False)
 async def info_page(request: Request):
-    return FileResponse(HTML_DIR / "info.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "info.html")
 
 @app.get("/login", include_in_schema=False)
 async def info_page(request: Request):
-    return FileResponse(HTML_DIR / "login.html", media_type="text/html")
+    return static_assets.html_response(request, HTML_DIR / "login.html")
 
 # 加入 API router
 app.include_router(log.router)
@@ -72,4 +139,6 @@ app.include_router(news.router)
 app.include_router(stock.router)
 app.include_router(financial_report.router)
 app.include_router(advanced_search.router)
-app.include_router(user.router)
\ No newline at end of file
+app.include_router(user.router)
+app.include_router(internal.router)
+app.include_router(health.router)
\ No newline at end of file
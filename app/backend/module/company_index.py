@@ -0,0 +1,217 @@
+import asyncio
+import os
+import time
+from module.postgresql_connection_pool import postgresql_pool
+
+
+class CompanyIndex:
+    """
+    行程內的公司識別索引：(stock_symbol, country_name) → 公司資料 (含 company_id、sector_name)
+
+    公司只有約兩千家，整份放在記憶體中，路由不需每次 JOIN Companies / Countrys / Sectors。
+    - 啟動時載入，之後每 refresh_interval 秒在背景整批重建
+    - 索引中找不到時 (例如兩次重建之間新增的公司) 以單筆查詢補上
+    - 單筆查詢也找不到的代碼在 miss_ttl 秒內直接回傳 None，不重複查詢資料庫 (重建時清除)
+    - stats() 回報索引大小與重建耗時
+    """
+
+    LOAD_QUERY = """
+        SELECT
+            c.*,
+            s.sector_name,
+            co.country_name
+        FROM Companies AS c
+        LEFT JOIN Sectors AS s ON c.sector_id = s.sector_id
+        LEFT JOIN Countrys AS co ON c.country_id = co.country_id
+    """
+
+    # 不存在代碼的快取上限，超過時移除最早加入的項目，避免大量無效代碼占用記憶體
+    MISS_CACHE_SIZE = 10000
+
+    def __init__(self, refresh_interval=300, miss_ttl=60, clock=time.monotonic):
+        self.refresh_interval = refresh_interval
+        self.miss_ttl = miss_ttl
+        self._clock = clock
+        self._by_key = {}
+        self._by_symbol = {}
+        # 查詢條件 → 到期時間
+        self._missing = {}
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.cached_misses = 0
+        self.refresh_count = 0
+        self.refresh_failures = 0
+        self.last_refresh_ms = None
+        self.max_refresh_ms = None
+        self.last_refreshed_at = None
+
+    def load(self, records):
+        """
+        以查詢結果重建索引，整批替換，讀取端不會看到重建到一半的內容
+        """
+        by_key = {}
+        by_symbol = {}
+        for record in records:
+            company = dict(record)
+            by_key[(company['stock_symbol'], company['country_name'])] = company
+            by_symbol.setdefault(company['stock_symbol'], []).append(company)
+        self._by_key, self._by_symbol = by_key, by_symbol
+        self._missing = {}
+        self.loaded = True
+
+    def _add(self, company):
+        """
+        加入單筆查詢取得的公司；同一家公司已在索引中時 (例如同時有兩個請求查詢) 取代而非重複加入
+        """
+        self._by_key[(company['stock_symbol'], company['country_name'])] = company
+        others = [
+            existing for existing in self._by_symbol.get(company['stock_symbol'], [])
+            if existing['company_id'] != company['company_id']
+        ]
+        self._by_symbol[company['stock_symbol']] = others + [company]
+
+    def _is_missing(self, miss_key) -> bool:
+        expires_at = self._missing.get(miss_key)
+        if expires_at is None:
+            return False
+        if self._clock() >= expires_at:
+            self._missing.pop(miss_key, None)
+            return False
+        return True
+
+    def _remember_missing(self, miss_key):
+        if self.miss_ttl <= 0:
+            return
+        self._missing.pop(miss_key, None)
+        if len(self._missing) >= self.MISS_CACHE_SIZE:
+            self._missing.pop(next(iter(self._missing)))
+        self._missing[miss_key] = self._clock() + self.miss_ttl
+
+    async def refresh(self):
+        """
+        從資料庫重新載入所有公司
+
+        Returns:
+            int: 索引中的公司數
+        """
+        start = time.perf_counter()
+        try:
+            async with postgresql_pool.get_read_connection() as conn:
+                records = await conn.fetch(self.LOAD_QUERY)
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        self.load(records)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.last_refresh_ms = elapsed_ms
+        self.max_refresh_ms = max(self.max_refresh_ms or 0, elapsed_ms)
+        self.refresh_count += 1
+        self.last_refreshed_at = time.time()
+        return len(self._by_key)
+
+    async def _ensure_loaded(self):
+        # 啟動時載入失敗 (例如資料庫尚未就緒) 時，由第一個請求觸發載入
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.refresh()
+
+    async def _lookup(self, condition, *params):
+        miss_key = (condition, *params)
+        if self._is_missing(miss_key):
+            self.cached_misses += 1
+            return None
+        async with postgresql_pool.get_read_connection() as conn:
+            record = await conn.fetchrow(f"{self.LOAD_QUERY} WHERE {condition}", *params)
+        if record is None:
+            self._remember_missing(miss_key)
+            return None
+        company = dict(record)
+        self._add(company)
+        return company
+
+    async def resolve(self, stock_symbol, country_name):
+        """
+        以股票代碼與國家名稱取得公司資料，找不到時回傳 None
+        回傳的 dict 為索引內共用的物件，呼叫端不可修改
+        """
+        await self._ensure_loaded()
+        company = self._by_key.get((stock_symbol, country_name))
+        if company is not None:
+            self.hits += 1
+            return company
+        self.misses += 1
+        return await self._lookup("c.stock_symbol = $1 AND co.country_name = $2", stock_symbol, country_name)
+
+    async def resolve_symbol(self, stock_symbol):
+        """
+        只以股票代碼取得公司資料 (stock_ranking 不帶國家)，找不到時回傳 None
+        """
+        await self._ensure_loaded()
+        companies = self._by_symbol.get(stock_symbol)
+        if companies:
+            self.hits += 1
+            return companies[0]
+        self.misses += 1
+        return await self._lookup("c.stock_symbol = $1", stock_symbol)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # 保留舊索引，下一輪再重試
+                print(f"公司索引重建失敗: {e}")
+
+    async def start(self):
+        """
+        啟動時載入索引並開始背景定期重建，載入失敗不阻止服務啟動
+        """
+        try:
+            size = await self.refresh()
+            print(f"公司索引已載入 {size} 家公司 ({self.last_refresh_ms:.1f} ms)")
+        except Exception as e:
+            print(f"公司索引載入失敗，將於第一次查詢時重試: {e}")
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._by_key),
+            "symbols": len(self._by_symbol),
+            "loaded": self.loaded,
+            "refresh_interval": self.refresh_interval,
+            "refresh_count": self.refresh_count,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_ms": self.last_refresh_ms,
+            "max_refresh_ms": self.max_refresh_ms,
+            "last_refreshed_at": self.last_refreshed_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            # 在 miss_ttl 內再次查詢不存在的代碼、未查詢資料庫的次數
+            "cached_misses": self.cached_misses,
+            "missing_cached": len(self._missing),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# 全域索引，於 main.py 啟動時載入，重建間隔與不存在代碼的快取時間 (秒) 可由環境變數調整
+company_index = CompanyIndex(
+    refresh_interval=int(os.getenv('COMPANY_INDEX_REFRESH_INTERVAL', '300')),
+    miss_ttl=float(os.getenv('COMPANY_INDEX_MISS_TTL', '60'))
+)
@@ -0,0 +1,165 @@
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    # 未安裝 brotli 時只提供 gzip
+    brotli = None
+
+
+# 超過此大小 (bytes) 的回應才壓縮，小回應壓縮後節省有限且多花 CPU
+COMPRESSION_MINIMUM_SIZE = int(os.getenv('COMPRESSION_MINIMUM_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml"
+)
+
+
+class GzipCompressor:
+    def __init__(self, level):
+        # wbits=31 產生含 gzip 標頭的輸出
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # 串流回應每個 chunk 都 flush，用戶端可以立即解壓已收到的資料
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    依 Accept-Encoding 以 brotli (已安裝時優先) 或 gzip 壓縮回應
+
+    - 只壓縮文字類型 (JSON、HTML、CSS、JS 等) 且大小超過 minimum_size 的回應
+    - 已有 Content-Encoding 的回應不重複壓縮
+    - 串流回應 (財報 stream=true) 逐 chunk 壓縮並 flush，不會等整個回應結束才送出
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_MINIMUM_SIZE,
+                 gzip_level=COMPRESSION_GZIP_LEVEL, brotli_quality=COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    @staticmethod
+    def choose_encoding(accept_encoding: str):
+        """
+        解析 Accept-Encoding，回傳 "br"、"gzip" 或 None (q=0 表示不接受)
+        """
+        accepted = set()
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            q = params.strip()
+            if q.startswith("q="):
+                try:
+                    if float(q[2:]) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def create_compressor(self, encoding: str):
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+
+class CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message = None
+        self.started = False
+        self.compressor = None
+
+    @staticmethod
+    def should_compress(headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 等第一個 body 才能決定是否壓縮
+            self.initial_message = message
+            return
+        if message_type != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(scope=self.initial_message)
+            if not self.should_compress(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+                await self._send(self.initial_message)
+                await self._send(message)
+                return
+            self.compressor = self.middleware.create_compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.initial_message)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            # 串流回應長度未知，改用 chunked 傳送
+            del headers["Content-Length"]
+            await self._send(self.initial_message)
+
+        if self.compressor is None:
+            await self._send(message)
+            return
+        body = self.compressor.compress(body) + (self.compressor.flush() if more_body else self.compressor.finish())
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
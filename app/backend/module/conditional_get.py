@@ -0,0 +1,110 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from starlette.datastructures import Headers, MutableHeaders
+from module.data_version import data_version, FINANCIAL_DATASETS, SECTOR_LIST_DATASETS
+
+
+def source_build_id() -> str:
+    """
+    後端程式碼 (main.py、api/、module/) 內容的 hash，未設定 BUILD_ID 時作為部署版本識別
+    """
+    backend = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha1()
+    for path in sorted([backend / "main.py", *backend.glob("api/*.py"), *backend.glob("module/*.py")]):
+        try:
+            digest.update(path.relative_to(backend).as_posix().encode() + b"\0" + path.read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()[:12]
+
+
+# 部署版本識別 (例如映像檔 tag 或 git commit，見 Dockerfile 的 BUILD_ID)，加入 ETag：
+# 新版本改變回應格式時，瀏覽器以舊的 ETag 驗證不會得到 304 而沿用舊內容
+BUILD_ID = os.getenv('BUILD_ID') or source_build_id()
+
+
+# 回應內容只由資料版本與請求網址決定的 API：(路徑 regex, 相依的資料集)
+CONDITIONAL_ROUTES = [
+    (re.compile(r"^/api/financial_report$"), FINANCIAL_DATASETS),
+    (re.compile(r"^/api/advanced_search/(ranking|count|stock_ranking)$"), FINANCIAL_DATASETS),
+    (re.compile(r"^/api/sector/list$"), SECTOR_LIST_DATASETS),
+    (re.compile(r"^/api/stock/[^/]+/[^/]+/bundle$"), FINANCIAL_DATASETS)
+]
+
+
+class ConditionalGetMiddleware:
+    """
+    以資料版本戳記產生 ETag，支援 If-None-Match 條件請求
+
+    - ETag = hash(部署版本, 資料版本, 路徑, 查詢字串)，同一版本且資料未變動時同一網址的 ETag 不變
+    - If-None-Match 相符時直接回傳 304，不執行 handler、不查詢資料庫
+    - 只在 200 回應加上 ETag，404 等錯誤回應不快取
+    - Cache-Control: no-cache 讓瀏覽器每次都帶 ETag 回來驗證，資料更新後立即生效
+    """
+
+    def __init__(self, app, routes=CONDITIONAL_ROUTES, versions=data_version, build_id=BUILD_ID):
+        self.app = app
+        self.routes = routes
+        self.versions = versions
+        self.build_id = build_id
+        self.not_modified = 0
+
+    def datasets_for(self, path: str):
+        for pattern, datasets in self.routes:
+            if pattern.match(path):
+                return datasets
+        return None
+
+    def make_etag(self, datasets, path: str, query_string: bytes) -> str:
+        digest = hashlib.sha1()
+        digest.update(self.build_id.encode() + b"\0")
+        digest.update(self.versions.stamp(datasets).encode())
+        digest.update(b"\0" + path.encode() + b"?" + query_string)
+        # 內容會經過壓縮等轉換，使用 weak ETag
+        return f'W/"{digest.hexdigest()[:20]}"'
+
+    @staticmethod
+    def etag_matches(if_none_match: str, etag: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        # weak comparison：忽略 W/ 前綴
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == opaque:
+                return True
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        datasets = self.datasets_for(scope["path"])
+        if datasets is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = self.make_etag(datasets, scope["path"], scope.get("query_string", b""))
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and self.etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["ETag"] = etag
+                headers.setdefault("Cache-Control", "no-cache")
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import time
+from module.postgresql_connection_pool import postgresql_pool
+
+
+# 定期重新讀取 Data_Versions 的間隔 (秒)：LISTEN 連線中斷期間漏掉的通知在下一輪補上
+DATA_VERSION_CHECK_INTERVAL = float(os.getenv('DATA_VERSION_CHECK_INTERVAL', '60'))
+
+# 財報、排行榜 API 相依的資料集 (Data_Versions.dataset)
+FINANCIAL_DATASETS = ("Balance_Sheets", "Income_Statements", "Cash_Flow_Statements", "Companies")
+# 產業清單 API 另外相依 Sectors (data_process/load/insert_sectors.py 新增產業時遞增)
+SECTOR_LIST_DATASETS = FINANCIAL_DATASETS + ("Sectors",)
+
+
+class DataVersion:
+    """
+    資料版本戳記，用於產生 ETag (見 module/conditional_get.py) 與清除回應快取
+
+    版本記錄在 PostgreSQL 的 Data_Versions 表，由 data_process/load 的載入腳本在每次載入後
+    以 bump_data_version() 遞增並 NOTIFY data_version。
+    - 啟動時整批載入，之後以 LISTEN 即時接收變動，所有 worker 的版本 (ETag) 一致
+    - 版本變動時呼叫 add_listener() 註冊的 callback (例如清除回應快取)
+    - 每 check_interval 秒重新讀取一次並檢查 LISTEN 連線，連線中斷時重新建立
+    - 無法連線資料庫時以 worker 啟動時間為前綴，重啟後不會與重啟前發出的 ETag 相同
+    """
+
+    CHANNEL = "data_version"
+    LOAD_QUERY = "SELECT dataset, version FROM Data_Versions"
+
+    def __init__(self, clock=time.time, check_interval=DATA_VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._epoch = int(clock() * 1000)
+        self._versions = {}
+        self._local = 0
+        self._callbacks = []
+        self._conn = None
+        self._task = None
+        self.loaded = False
+        self.changes = 0
+        self.notifications = 0
+        self.refresh_failures = 0
+        self.listen_failures = 0
+        self.last_changed_at = None
+
+    def get(self, dataset: str) -> str:
+        version = str(self._versions.get(dataset, 0))
+        if self.loaded and not self._local:
+            return version
+        return f"{self._epoch}.{self._local}.{version}"
+
+    def stamp(self, datasets) -> str:
+        """
+        多個資料集合併的版本戳記，任一資料集變動時結果不同
+        """
+        return ";".join(f"{dataset}={self.get(dataset)}" for dataset in datasets)
+
+    def add_listener(self, callback):
+        """
+        註冊版本變動時的 callback(dataset, version)，在事件迴圈中同步呼叫
+        同一個 callback 只註冊一次 (lifespan 重複執行時不會重複呼叫)
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def apply(self, dataset: str, version: int) -> bool:
+        """
+        套用資料庫中的版本，版本較新時通知 listener
+
+        Returns:
+            bool: 版本是否變動
+        """
+        if version <= self._versions.get(dataset, 0):
+            return False
+        self._versions[dataset] = version
+        self.changes += 1
+        self.last_changed_at = time.time()
+        self._notify(dataset, version)
+        return True
+
+    def bump(self):
+        """
+        無法讀取資料庫版本時的替代方案：只在此 worker 內改變所有戳記
+        """
+        self._local += 1
+        self._notify(None, None)
+
+    def _notify(self, dataset, version):
+        for callback in self._callbacks:
+            try:
+                callback(dataset, version)
+            except Exception as e:
+                print(f"資料版本 callback 執行失敗 ({dataset}={version}): {e}")
+
+    async def refresh(self):
+        """
+        從 Data_Versions 重新讀取所有資料集的版本
+
+        第一次載入只記錄目前的版本，不視為資料變動、不通知 listener；
+        若是啟動時載入失敗、之後才由背景工作補上，期間可能漏掉變動，以 callback(None, None) 通知一次
+
+        Returns:
+            int: 版本有變動的資料集數
+        """
+        try:
+            async with postgresql_pool.get_connection() as conn:
+                records = await conn.fetch(self.LOAD_QUERY)
+        except Exception:
+            self.refresh_failures += 1
+            raise
+        if self.loaded:
+            return sum(self.apply(record['dataset'], record['version']) for record in records)
+        for record in records:
+            # LISTEN 在載入前已開始，保留載入前收到的較新版本
+            self._versions[record['dataset']] = max(self._versions.get(record['dataset'], 0), record['version'])
+        self.loaded = True
+        if self._task is not None:
+            self._notify(None, None)
+        return 0
+
+    def _on_notify(self, connection, pid, channel, payload):
+        # payload 格式: "<dataset>:<version>" (見 database_schema.sql 的 bump_data_version)
+        self.notifications += 1
+        dataset, _, version = payload.rpartition(":")
+        try:
+            self.apply(dataset, int(version))
+        except ValueError:
+            print(f"無法解析資料版本通知: {payload}")
+
+    async def _listen(self):
+        # NOTIFY 只在主庫送出，使用主庫連線池中的一條連線長期 LISTEN
+        conn = await postgresql_pool.acquire_dedicated()
+        try:
+            await conn.add_listener(self.CHANNEL, self._on_notify)
+        except Exception:
+            await postgresql_pool.release_dedicated(conn)
+            raise
+        self._conn = conn
+
+    async def _release_listener(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if not conn.is_closed():
+                await conn.remove_listener(self.CHANNEL, self._on_notify)
+            await postgresql_pool.release_dedicated(conn)
+        except Exception as e:
+            print(f"釋放資料版本 LISTEN 連線失敗: {e}")
+
+    async def _ensure_listening(self):
+        if self._conn is not None and not self._conn.is_closed():
+            return
+        await self._release_listener()
+        try:
+            await self._listen()
+        except Exception as e:
+            self.listen_failures += 1
+            print(f"資料版本 LISTEN 失敗，以定期讀取取代: {e}")
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self._ensure_listening()
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"資料版本讀取失敗: {e}")
+
+    async def start(self):
+        """
+        啟動時載入版本並開始 LISTEN，失敗不阻止服務啟動 (由背景工作重試)
+        """
+        await self._ensure_listening()
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"資料版本載入失敗，將於背景重試: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # 須在連線池關閉前歸還 LISTEN 連線
+        await self._release_listener()
+
+    def stats(self):
+        return {
+            "loaded": self.loaded,
+            "listening": self._conn is not None and not self._conn.is_closed(),
+            "versions": dict(self._versions),
+            "local_bumps": self._local,
+            "changes": self.changes,
+            "notifications": self.notifications,
+            "refresh_failures": self.refresh_failures,
+            "listen_failures": self.listen_failures,
+            "last_changed_at": self.last_changed_at
+        }
+
+
+data_version = DataVersion()
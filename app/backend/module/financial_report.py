@@ -2,9 +2,55 @@ import re
 from fastapi import HTTPException
 from typing import Dict, Any
 from datetime import datetime, date
-from decimal import Decimal
+from module.statement_registry import statement_registry
 
 class Financial_report:
+    # 各財報表可供 columns 投影的數值欄位 (須與 database_schema.sql 一致)
+    STATEMENT_COLUMNS = {
+        'Balance_Sheets': [
+            'cash_and_equivalents', 'cash_and_equivalents_pct',
+            'short_term_investments', 'short_term_investments_pct',
+            'accounts_receivable_and_notes', 'accounts_receivable_and_notes_pct',
+            'inventory', 'inventory_pct',
+            'other_current_assets', 'other_current_assets_pct',
+            'current_assets', 'current_assets_pct',
+            'total_long_term_investments', 'total_long_term_investments_pct',
+            'fixed_assets_total', 'fixed_assets_total_pct',
+            'other_non_current_assets', 'other_non_current_assets_pct',
+            'total_assets', 'total_assets_pct'
+        ],
+        'Income_Statements': [
+            'revenue', 'revenue_pct',
+            'cost_of_revenue', 'cost_of_revenue_pct',
+            'gross_profit', 'gross_profit_pct',
+            'sales_expenses', 'sales_expenses_pct',
+            'administrative_expenses', 'administrative_expenses_pct',
+            'research_and_development_expenses', 'research_and_development_expenses_pct',
+            'operating_expenses', 'operating_expenses_pct',
+            'operating_income', 'operating_income_pct',
+            'pre_tax_income', 'pre_tax_income_pct',
+            'net_income', 'net_income_pct',
+            'net_income_attributable_to_parent', 'net_income_attributable_to_parent_pct',
+            'basic_eps', 'diluted_eps'
+        ],
+        'Cash_Flow_Statements': [
+            'depreciation', 'amortization',
+            'operating_cash_flow', 'investing_cash_flow',
+            'capital_expenditures', 'financing_cash_flow',
+            'dividends_paid', 'free_cash_flow', 'net_change_in_cash'
+        ]
+    }
+
+    # 指定 columns 時固定回傳的識別欄位
+    KEY_COLUMNS = ['year', 'quarter', 'report_type', 'original_currency']
+
+    # API 財報種類對應資料表
+    REPORT_TABLE_MAP = {
+        'balance_sheets': 'Balance_Sheets',
+        'income_statements': 'Income_Statements',
+        'cash_flow': 'Cash_Flow_Statements'
+    }
+
     # 國家代碼對照表
     COUNTRY_CODE_MAP = {
         'tw': 'Taiwan',
@@ -73,13 +119,82 @@ class Financial_report:
         if report_period not in valid_report_periods:
             return False
         return True
+
+    @staticmethod
+    def parse_columns(table_name: str, columns: str) -> list:
+        """
+        解析逗號分隔的 fields (columns) 參數，只允許該財報表的數值欄位
+        """
+        allowed = Financial_report.STATEMENT_COLUMNS[table_name]
+        parsed = []
+        for column in columns.split(','):
+            column = column.strip()
+            if not column or column in parsed:
+                continue
+            if column not in allowed:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"不支援的欄位：{column}。支援的欄位：{', '.join(allowed)}"
+                )
+            parsed.append(column)
+        if not parsed:
+            raise HTTPException(status_code=400, detail="fields 至少需指定一個欄位")
+        return parsed
+
     @staticmethod
-    def decimal_to_float(obj):
-        if isinstance(obj, dict):
-            return {k: Financial_report.decimal_to_float(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [Financial_report.decimal_to_float(i) for i in obj]
-        elif isinstance(obj, Decimal):
-            return float(obj)
+    def build_report_query(
+        table_name: str,
+        company_id: int,
+        report_period: str,
+        columns: list = None,
+        from_year: int = None,
+        to_year: int = None
+    ) -> tuple:
+        """
+        產生查詢某公司財報的語句與參數
+        - company_id 由 company_index 解析，不需再 JOIN Companies / Countrys
+        - 指定 columns 時只選取識別欄位與指定欄位，否則回傳整列
+        - from_year / to_year 條件放在 WHERE 中，可使用 (company_id, year, quarter) 索引
+
+        Returns:
+            (query, params)
+        """
+        if columns:
+            select_list = ", ".join(Financial_report.KEY_COLUMNS + columns)
         else:
-            return obj
\ No newline at end of file
+            select_list = "*"
+        where_conditions = ["company_id = $1", "report_type = $2"]
+        params = [company_id, report_period]
+        if from_year is not None:
+            params.append(from_year)
+            where_conditions.append(f"year >= ${len(params)}")
+        if to_year is not None:
+            params.append(to_year)
+            where_conditions.append(f"year <= ${len(params)}")
+        query = f"""
+            SELECT {select_list}
+            FROM {table_name}
+            WHERE {' AND '.join(where_conditions)}
+            ORDER BY year DESC, quarter DESC;
+        """
+        return query, params
+
+    @staticmethod
+    def register_statements(registry=statement_registry):
+        """
+        將各財報表整列與完整欄位 (bundle) 查詢的所有年度條件組合登錄到 statement registry
+        未指定年度區間的查詢為 eager；任意 fields 投影組合不登錄
+        """
+        for table_name, statement_columns in Financial_report.STATEMENT_COLUMNS.items():
+            for columns in [None, statement_columns]:
+                for from_year in [None, 2000]:
+                    for to_year in [None, 2000]:
+                        query, _ = Financial_report.build_report_query(
+                            table_name, 1, "quarterly", columns, from_year, to_year
+                        )
+                        key = ("financial_report", table_name, columns is not None,
+                               from_year is not None, to_year is not None)
+                        registry.register(key, query, eager=from_year is None and to_year is None)
+
+
+Financial_report.register_statements()
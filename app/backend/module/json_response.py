@@ -0,0 +1,86 @@
+import json
+import math
+import time
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from asyncpg import Record
+from module.request_metrics import record_phase
+
+try:
+    import orjson
+except ImportError:
+    # 未安裝 orjson 時退回標準庫 json，輸出格式相同
+    orjson = None
+
+
+def default_encoder(obj):
+    """
+    處理 JSON 原生不支援的型別
+    asyncpg.Record 與含 ObjectId 的 MongoDB 文件可直接放進 content，不需先複製轉換
+    """
+    if isinstance(obj, Record):
+        return dict(obj)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    """
+    將 NaN / Infinity 轉為 None (與 orjson 輸出 null 相同)
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _finite_default_encoder(obj):
+    return _finite(default_encoder(obj))
+
+
+def _stdlib_dumps(content: Any, default) -> bytes:
+    return json.dumps(
+        content,
+        default=default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    將內容編碼為 JSON bytes，有 orjson 時直接由 C 實作編碼，否則使用標準庫 json
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=default_encoder, option=orjson.OPT_NON_STR_KEYS)
+    try:
+        return _stdlib_dumps(content, default_encoder)
+    except ValueError:
+        # 內容含 NaN / Infinity：orjson 輸出 null，標準庫改為轉成 None 後重新編碼，兩者結果一致
+        return _stdlib_dumps(_finite(content), _finite_default_encoder)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    所有 API 共用的 JSON 回應類別
+    """
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        try:
+            return dumps(content)
+        finally:
+            record_phase("serialize", (time.perf_counter() - start) * 1000)
@@ -1,13 +1,86 @@
 import jwt
 import datetime
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import timezone
 from dotenv import load_dotenv
+from fastapi import Cookie, HTTPException
+from module.metrics import Histogram
 import os
 
 # Load environment variable from .env file
 load_dotenv()
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+# 已驗證 token 快取的項目上限
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+
+class TokenCache:
+    """
+    已驗證 JWT 的 LRU 快取：sha256(token) -> payload，項目在 token 的 exp 到期
+
+    每個頁面載入時都會呼叫 GET /api/user/auth，同一 token 重複驗證簽章與解碼 JSON 並無必要。
+    - 只快取驗證成功的 token，沒有 exp 的 token 不快取
+    - 超過 maxsize 時淘汰最久未使用的項目
+    - verify_time 記錄每次 decode_jwt 的耗時 (ms，含快取查詢)
+    """
+
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, maxsize=JWT_CACHE_SIZE, clock=time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.verify_time = Histogram(self.BUCKETS)
+
+    @staticmethod
+    def make_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        # 回傳複本，呼叫端修改不影響快取內容
+        return dict(payload)
+
+    def set(self, key, payload):
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        self._data[key] = (expires_at, dict(payload))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "verify_time": self.verify_time.snapshot()
+        }
+
+
+token_cache = TokenCache()
 
 
 #Create token
@@ -28,10 +101,28 @@ def JWT_token_make(user_id,name,account,role,status):
 
 # The function of Decode and verify token 
 def decode_jwt(token):
+    start = time.perf_counter()
     try:
+        key = token_cache.make_key(token)
+        decoded_jwt = token_cache.get(key)
+        if decoded_jwt is not None:
+            return decoded_jwt
         decoded_jwt = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
+        token_cache.set(key, decoded_jwt)
         return decoded_jwt
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
-        return None
\ No newline at end of file
+        return None
+    finally:
+        token_cache.verify_time.observe((time.perf_counter() - start) * 1000)
+
+
+# FastAPI dependency：需要登入的路由以 Depends(get_current_user) 取得 token payload
+async def get_current_user(access_token: str = Cookie(None)):
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Missing token")
+    payload = decode_jwt(access_token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
@@ -0,0 +1,64 @@
+import bisect
+
+
+class Histogram:
+    """
+    固定區間的延遲直方圖 (單位 ms)，語意與 Prometheus histogram 相同：
+    每個區間記錄小於等於上界的觀測次數 (累積)，另記總次數與總和。
+    只做整數累加，可在每個請求中呼叫 observe()。
+    """
+
+    DEFAULT_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 最後一格為 +Inf
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative_counts(self):
+        """
+        回傳 [(上界, 累積次數)]，最後一筆上界為 float('inf')
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """
+        以區間上界估計分位數，落在 +Inf 區間時回傳觀測到的最大值
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, total in self.cumulative_counts():
+            if total >= target:
+                return self.max if bound == float('inf') else min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 3),
+            "avg_ms": round(self.sum / self.count, 3) if self.count else None,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float('inf') else str(bound)): total
+                for bound, total in self.cumulative_counts()
+            }
+        }
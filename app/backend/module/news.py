@@ -0,0 +1,55 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class News:
+    # 游標分頁的排序，publishAt 相同時以 _id 決定先後，需有 {publishAt: -1, _id: -1} 索引
+    # (見 data_process/load/create_mongodb_indexes.py)
+    SORT = [("publishAt", -1), ("_id", -1)]
+
+    @staticmethod
+    def encode_cursor(publish_at, object_id) -> str:
+        """
+        以最後一筆的 publishAt 與 _id 產生 before 游標，格式為 "<publishAt>,<_id>"
+        """
+        return f"{publish_at},{object_id}"
+
+    @staticmethod
+    def decode_cursor(before: str) -> tuple:
+        """
+        解析 before 游標，回傳 (publishAt, ObjectId)
+        游標格式不正確時拋出 ValueError
+        """
+        try:
+            publish_at, object_id = before.split(",", 1)
+            return int(publish_at), ObjectId(object_id)
+        except (ValueError, TypeError, InvalidId):
+            raise ValueError("before 游標格式不正確，應為 <publishAt>,<_id>")
+
+    @staticmethod
+    def apply_before(query: dict, before: tuple) -> dict:
+        """
+        加入 seek 條件，只取排序在游標之後 (較舊) 的資料
+        publishAt <= 游標時間讓查詢可直接從索引的該位置開始掃描，不需 skip
+        """
+        publish_at, object_id = before
+        seek = {
+            "publishAt": {"$lte": publish_at},
+            "$or": [
+                {"publishAt": {"$lt": publish_at}},
+                {"_id": {"$lt": object_id}}
+            ]
+        }
+        if not query:
+            return seek
+        return {"$and": [query, seek]}
+
+    @staticmethod
+    def next_cursor(results: list, limit: int):
+        """
+        results 為多取一筆 (limit + 1) 的查詢結果，還有下一頁時回傳下一頁的游標，否則回傳 None
+        """
+        if len(results) <= limit:
+            return None
+        last = results[limit - 1]
+        return News.encode_cursor(last["publishAt"], last["_id"])
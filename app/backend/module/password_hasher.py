@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import bcrypt
+from fastapi import HTTPException
+from module.metrics import Histogram
+from module.response_cache import ResponseCache
+
+
+# bcrypt 專用執行緒數：bcrypt 執行時會釋放 GIL，執行緒數約等於可同時用於登入的 CPU 核心數
+BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', '2'))
+# 等待中的驗證請求上限，超過時直接回傳 503，避免登入尖峰時排隊時間無限增加
+BCRYPT_MAX_QUEUE = int(os.getenv('BCRYPT_MAX_QUEUE', '64'))
+# 新密碼與升級後的 cost factor，既有較低 cost 的 hash 在下次登入成功時重新計算
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# 驗證成功的帳密在此秒數內再次登入時不需重新計算 bcrypt
+VERIFIED_CREDENTIAL_TTL = int(os.getenv('VERIFIED_CREDENTIAL_TTL', '300'))
+VERIFIED_CREDENTIAL_CACHE_SIZE = int(os.getenv('VERIFIED_CREDENTIAL_CACHE_SIZE', '10000'))
+
+
+def _timed(func, *args):
+    # 在執行緒中執行並回傳開始與結束時間，指標統一在事件迴圈中記錄
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started, time.perf_counter()
+
+
+class PasswordHasher:
+    """
+    在專用、大小固定的執行緒池中執行 bcrypt，登入不會阻塞事件迴圈
+
+    - 同時在途 (執行中 + 排隊) 的請求超過 workers + max_queue 時回傳 503
+    - queue_wait / hash_time 記錄排隊與 bcrypt 計算時間 (ms)
+    - 驗證成功的帳密以 HMAC(行程內隨機金鑰, stored_hash + 密碼) 為 key 短暫快取，
+      只快取成功結果，錯誤密碼每次都需完整計算；密碼變更後 stored_hash 不同，舊快取自然失效
+    - 同一組帳密同時多次驗證時只計算一次，其餘請求等待同一結果
+    - needs_upgrade() 判斷 hash 的 cost 是否低於 rounds，由呼叫端在登入成功後重新計算
+    """
+
+    def __init__(self, workers=BCRYPT_WORKERS, max_queue=BCRYPT_MAX_QUEUE, rounds=BCRYPT_ROUNDS,
+                 cache_ttl=VERIFIED_CREDENTIAL_TTL, cache_size=VERIFIED_CREDENTIAL_CACHE_SIZE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._executor = None
+        self._cache_secret = secrets.token_bytes(32)
+        self._verified = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
+        self._inflight = {}
+        self.pending = 0
+        self.max_pending = 0
+        self.rejected = 0
+        self.upgrades = 0
+        self.upgrade_failures = 0
+        self.queue_wait = Histogram()
+        self.hash_time = Histogram()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="登入請求過多，請稍後再試", headers={"Retry-After": "1"})
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._get_executor(), partial(_timed, func, *args))
+        finally:
+            self.pending -= 1
+        self.queue_wait.observe((started - submitted) * 1000)
+        self.hash_time.observe((finished - started) * 1000)
+        return result
+
+    def _credential_key(self, password: str, stored_hash: str) -> bytes:
+        return hmac.new(
+            self._cache_secret,
+            stored_hash.encode('utf-8') + b"\0" + password.encode('utf-8'),
+            hashlib.sha256
+        ).digest()
+
+    async def verify(self, password: str, stored_hash: str) -> bool:
+        key = self._credential_key(password, stored_hash)
+        if self._verified.get(key) is not None:
+            return True
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            verified = await self._run(bcrypt.checkpw, password.encode('utf-8'), stored_hash.encode('utf-8'))
+        except BaseException as e:
+            future.set_exception(e)
+            # 沒有其他等待者時避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(verified)
+        if verified:
+            self._verified.set(key, True)
+        return verified
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(self.rounds)
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+
+    def needs_upgrade(self, stored_hash: str) -> bool:
+        """
+        hash 格式為 $2b$<cost>$<salt+hash>，cost 低於 rounds 時需要升級
+        """
+        try:
+            return int(stored_hash.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "rounds": self.rounds,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "upgrades": self.upgrades,
+            "upgrade_failures": self.upgrade_failures,
+            "queue_wait": self.queue_wait.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+            "verified_cache": self._verified.stats()
+        }
+
+
+password_hasher = PasswordHasher()
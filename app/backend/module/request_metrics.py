@@ -0,0 +1,194 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from module.metrics import Histogram
+
+
+# 請求耗時 (ms)
+REQUEST_BUCKETS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# 各階段耗時 (ms)，序列化通常在 1ms 以下
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# 回應大小 (bytes)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# 靜態檔案 (Mount) 與 404 等沒有對應路由的請求
+OTHER_ROUTE = "<other>"
+
+# 目前請求的各階段累計耗時 {階段: ms}，由 RequestTimingMiddleware 在每個請求開始時設定
+_phases: ContextVar[Optional[dict]] = ContextVar("request_phases", default=None)
+
+
+def record_phase(phase: str, elapsed_ms: float):
+    """
+    將耗時累加到目前請求的指定階段，不在請求中 (例如背景工作) 時忽略
+    連線池 (db_acquire)、statement_registry.observe (db_query，含連線池連線上的所有查詢) 與 FastJSONResponse (serialize) 呼叫
+    """
+    phases = _phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + elapsed_ms
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def prometheus_histogram(name: str, labels: dict, histogram: Histogram, scale=1.0):
+    """
+    將 Histogram 轉為 Prometheus text format 的 _bucket / _sum / _count 行
+    scale 用於單位換算，例如 ms -> 秒 為 0.001
+    """
+    prefix = _labels(labels)
+    separator = "," if prefix else ""
+    lines = []
+    for bound, total in histogram.cumulative_counts():
+        le = "+Inf" if bound == float('inf') else repr(round(bound * scale, 6))
+        lines.append(f'{name}_bucket{{{prefix}{separator}le="{le}"}} {total}')
+    lines.append(f"{name}_sum{{{prefix}}} {round(histogram.sum * scale, 6)}")
+    lines.append(f"{name}_count{{{prefix}}} {histogram.count}")
+    return lines
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(REQUEST_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.phases = {}
+        self.statuses = {}
+
+    def observe(self, status: int, duration_ms: float, size: int, phases: dict):
+        self.latency.observe(duration_ms)
+        self.size.observe(size)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        # 只記錄此請求實際經過的階段，例如快取命中時沒有 db_query
+        for phase, elapsed_ms in phases.items():
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram(PHASE_BUCKETS)
+            histogram.observe(elapsed_ms)
+
+
+class RequestMetrics:
+    """
+    依 (method, 路由樣板) 記錄請求耗時、回應大小、狀態碼與各階段耗時
+
+    路由以樣板 (例如 /api/stock/{symbol}/{country}/bundle) 分組，數量固定，不會因參數值增加。
+    """
+
+    def __init__(self):
+        self._routes = {}
+
+    def observe(self, method: str, route: str, status: int, duration_ms: float, size: int, phases: dict):
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics()
+        metrics.observe(status, duration_ms, size, phases)
+
+    def reset(self):
+        self._routes.clear()
+
+    def stats(self):
+        result = {}
+        for (method, route), metrics in sorted(self._routes.items(), key=lambda item: (item[0][1], item[0][0])):
+            result[f"{method} {route}"] = {
+                "latency": metrics.latency.snapshot(),
+                "phases": {phase: histogram.snapshot() for phase, histogram in sorted(metrics.phases.items())},
+                "statuses": {str(status): count for status, count in sorted(metrics.statuses.items())},
+                "response_bytes": {
+                    "count": metrics.size.count,
+                    "avg": round(metrics.size.sum / metrics.size.count) if metrics.size.count else None,
+                    "max": int(metrics.size.max)
+                }
+            }
+        return result
+
+    def render_prometheus(self, pid=None):
+        """
+        Prometheus text format；每個 uvicorn worker 各自回報，以 pid label 區分
+        """
+        pid = os.getpid() if pid is None else pid
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        items = sorted(self._routes.items())
+        for (method, route), metrics in items:
+            labels = {"pid": pid, "method": method, "route": route}
+            lines.extend(prometheus_histogram("http_request_duration_seconds", labels, metrics.latency, 0.001))
+
+        lines += [
+            "# HELP http_request_phase_duration_seconds Time spent per request in db_acquire, db_query and serialize.",
+            "# TYPE http_request_phase_duration_seconds histogram"
+        ]
+        for (method, route), metrics in items:
+            for phase, histogram in sorted(metrics.phases.items()):
+                labels = {"pid": pid, "method": method, "route": route, "phase": phase}
+                lines.extend(prometheus_histogram("http_request_phase_duration_seconds", labels, histogram, 0.001))
+
+        lines += [
+            "# HELP http_response_size_bytes Response body size by route.",
+            "# TYPE http_response_size_bytes histogram"
+        ]
+        for (method, route), metrics in items:
+            labels = {"pid": pid, "method": method, "route": route}
+            lines.extend(prometheus_histogram("http_response_size_bytes", labels, metrics.size))
+
+        lines += [
+            "# HELP http_requests_total Requests by route and status code.",
+            "# TYPE http_requests_total counter"
+        ]
+        for (method, route), metrics in items:
+            for status, count in sorted(metrics.statuses.items()):
+                labels = {"pid": pid, "method": method, "route": route, "status": status}
+                lines.append(f"http_requests_total{{{_labels(labels)}}} {count}")
+        return lines
+
+
+class RequestTimingMiddleware:
+    """
+    記錄每個請求的耗時、狀態碼與回應大小 (送出的 bytes，位於壓縮之外時為壓縮後大小)
+
+    請求期間以 ContextVar 收集各階段耗時 (見 record_phase)，
+    可區分慢在等待連線池 (db_acquire)、SQL 本身 (db_query) 還是 JSON 序列化 (serialize)。
+    """
+
+    def __init__(self, app, metrics=None):
+        self.app = app
+        self.metrics = metrics if metrics is not None else request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases = {}
+        token = _phases.set(phases)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _phases.reset(token)
+            # 路由比對成功後 FastAPI 會在 scope 放入 route
+            route = getattr(scope.get("route"), "path", None) or OTHER_ROUTE
+            self.metrics.observe(
+                scope["method"], route, status, (time.perf_counter() - start) * 1000, size, phases
+            )
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,92 @@
+import os
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    行程內的 API 回應快取 (TTL + LRU)
+
+    財報資料只有在載入新一季時才會變動，讀取型 API 的回應可以直接重用。
+    - 超過 maxsize 時淘汰最久未使用的項目
+    - 超過 ttl 秒的項目在讀取時視為過期
+    - 資料載入完成後由 invalidate() 清除 (見 api/internal.py)
+    """
+
+    def __init__(self, maxsize=1024, ttl=600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(namespace, **params):
+        """
+        以正規化後的查詢參數產生快取 key，參數順序不影響結果
+        """
+        return (namespace,) + tuple(sorted(params.items()))
+
+    def get(self, key):
+        """
+        取得快取內容，不存在或已過期時回傳 None
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, namespace=None):
+        """
+        清除快取，指定 namespace 時只清除該類 API 的項目
+
+        Returns:
+            int: 清除的項目數
+        """
+        if namespace is None:
+            removed = len(self._data)
+            self._data.clear()
+            return removed
+        keys = [key for key in self._data if key[0] == namespace]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# 全域快取實例，大小與存活時間可由環境變數調整
+response_cache = ResponseCache(
+    maxsize=int(os.getenv('RESPONSE_CACHE_MAXSIZE', '1024')),
+    ttl=int(os.getenv('RESPONSE_CACHE_TTL', '600'))
+)
@@ -0,0 +1,85 @@
+import re
+
+# 寫入端 (lambda_layer/text_utils/search_tokens.py、lambda_function/crawler_news/local_module/search_tokens.py)
+# 使用相同的切詞規則，需保持一致
+# 中文連續字串切成相鄰兩字 (bigram)，英數字以整個單字 (小寫) 為一個 token
+CJK_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+TOKEN_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9A-Za-z]+")
+
+
+class SearchTokens:
+    # AI_news_analysis 中參與關鍵字搜尋的欄位，與寫入端產生 search_tokens 的欄位相同
+    AI_NEWS_KEYWORD_FIELDS = ["summary", "important_news", "potential_stocks_and_industries", "source_news.title"]
+    # news 中參與關鍵字搜尋的欄位，寫入端另加入相關個股的代號與名稱 (stock / market)
+    NEWS_KEYWORD_FIELDS = ["title", "summary", "content", "keyword", "stock", "market.code", "market.name"]
+
+    @staticmethod
+    def tokenize(text) -> list:
+        """
+        將文字切成去重後的 token 列表：中文取 bigram (單一中文字保留原字)，英數字取整個單字並轉小寫
+        """
+        if not isinstance(text, str):
+            return []
+        tokens = []
+        seen = set()
+        for run in TOKEN_PATTERN.findall(text):
+            if CJK_PATTERN.fullmatch(run):
+                grams = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+            else:
+                grams = [run.lower()]
+            for gram in grams:
+                if gram not in seen:
+                    seen.add(gram)
+                    tokens.append(gram)
+        return tokens
+
+    @staticmethod
+    def query_tokens(keyword: str) -> list:
+        """
+        查詢關鍵字中可用於索引的 token，只取中文 bigram，無法以索引查詢時回傳空列表
+
+        - 英數字寫入端以整個單字為 token，查詢的英數字可能只是單字的一部分 (Nvid -> Nvidia、233 -> 2330)，
+          不列入 $all，只由 regex 比對
+        - 只有單一中文字時寫入端不會產生對應的 unigram
+        """
+        runs = CJK_PATTERN.findall(keyword or "")
+        if any(len(run) == 1 for run in runs):
+            return []
+        return SearchTokens.tokenize(" ".join(runs))
+
+    @staticmethod
+    def keyword_filter(keyword: str, token_field: str, fields: list) -> dict:
+        """
+        產生關鍵字查詢條件：
+        - 以 token_field 的 $all 走 multikey 索引取得候選文件
+        - 再以 regex 確認關鍵字確實連續出現在某個欄位 (只對候選文件執行)
+        關鍵字沒有可用的中文 token 時 (例如只有英數字) 退回原本的 regex 全表掃描
+        """
+        pattern = re.escape(keyword)
+        regex_filter = {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in fields]}
+        tokens = SearchTokens.query_tokens(keyword)
+        if not tokens:
+            return regex_filter
+        return {"$and": [{token_field: {"$all": tokens}}, regex_filter]}
+
+    @staticmethod
+    def terms_filter(keyword: str, token_field: str, fields: list) -> dict:
+        """
+        以空白分隔的多個關鍵字，任一詞出現即符合 (與原本 $text 搜尋的行為相同)
+        每個詞各自產生 keyword_filter 條件，不將整串關鍵字當成一個片語比對
+        """
+        terms = list(dict.fromkeys(keyword.split()))
+        if len(terms) <= 1:
+            return SearchTokens.keyword_filter(terms[0] if terms else keyword, token_field, fields)
+        return {"$or": [SearchTokens.keyword_filter(term, token_field, fields) for term in terms]}
+
+    @staticmethod
+    def industry_filter(industry: str) -> dict:
+        """
+        產業條件：以 industry_tokens 索引取候選，再以 regex 比對 industry_list
+        """
+        element_filter = {"industry_list": {"$elemMatch": {"$regex": re.escape(industry), "$options": "i"}}}
+        tokens = SearchTokens.query_tokens(industry)
+        if not tokens:
+            return element_filter
+        return {"$and": [{"industry_tokens": {"$all": tokens}}, element_filter]}
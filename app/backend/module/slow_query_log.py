@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import random
+import time
+from collections import deque
+from module.postgresql_connection_pool import postgresql_pool
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+# 超過此耗時 (ms) 的查詢記錄為慢查詢
+SLOW_QUERY_THRESHOLD_MS = _env_float('SLOW_QUERY_THRESHOLD_MS', 200)
+# 慢查詢中執行 EXPLAIN (ANALYZE, BUFFERS) 的比例，0 為關閉
+SLOW_QUERY_EXPLAIN_RATE = _env_float('SLOW_QUERY_EXPLAIN_RATE', 0)
+# 同一種語句兩次 EXPLAIN 之間的最短間隔 (秒)，避免查詢變慢時重複執行加重資料庫負擔
+SLOW_QUERY_EXPLAIN_COOLDOWN = _env_float('SLOW_QUERY_EXPLAIN_COOLDOWN', 300)
+# EXPLAIN ANALYZE 會實際執行查詢，超過此時間 (ms) 即中止
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(_env_float('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 10000))
+# 保留的最近慢查詢筆數 (ring buffer)
+SLOW_QUERY_LOG_SIZE = int(_env_float('SLOW_QUERY_LOG_SIZE', 200))
+# 統計的語句種類上限，超過後新的種類只計入 dropped_shapes
+SLOW_QUERY_MAX_SHAPES = int(_env_float('SLOW_QUERY_MAX_SHAPES', 2000))
+# 記錄參數時每個參數的最大長度
+PARAM_MAX_LENGTH = 200
+
+
+class QueryShape:
+    def __init__(self, shape, query):
+        self.shape = shape
+        self.query = query
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_count = 0
+        self.errors = 0
+        self.last_slow_params = None
+        self.last_explained_at = None
+
+    def to_dict(self):
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+            "last_slow_params": self.last_slow_params,
+            "query": self.query
+        }
+
+
+class SlowQueryLog:
+    """
+    依語句種類 (shape) 統計查詢耗時，並記錄超過門檻的慢查詢
+
+    advanced_search 依 SUPPORTED_RANKINGS 產生大量不同的語句，以 statement_registry 登錄的 key
+    (例如 ranking:Balance_Sheets:...) 作為 shape，未登錄的語句以正規化後的 SQL hash 區分。
+    - 每次查詢累計該 shape 的次數、平均與最大耗時，top() 依此排序
+    - 超過 threshold_ms 的查詢連同參數記錄到固定大小的 ring buffer 並 print
+    - 依 explain_rate 抽樣，在背景以唯讀交易執行 EXPLAIN (ANALYZE, BUFFERS)，
+      結果附在該筆記錄上，用於找出缺少的索引 (例如 Seq Scan on balance_sheets)
+    """
+
+    EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+    def __init__(self, threshold_ms=SLOW_QUERY_THRESHOLD_MS, explain_rate=SLOW_QUERY_EXPLAIN_RATE,
+                 explain_cooldown=SLOW_QUERY_EXPLAIN_COOLDOWN, explain_timeout_ms=SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+                 size=SLOW_QUERY_LOG_SIZE, max_shapes=SLOW_QUERY_MAX_SHAPES,
+                 pool=postgresql_pool, sample=random.random, clock=time.time):
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        self.explain_cooldown = explain_cooldown
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_shapes = max_shapes
+        self._pool = pool
+        self._sample = sample
+        self._clock = clock
+        self._shapes = {}
+        self._entries = deque(maxlen=size)
+        self._explaining = None
+        self.slow_queries = 0
+        self.dropped_shapes = 0
+        self.explains = 0
+        self.explain_failures = 0
+
+    @staticmethod
+    def shape_for(key, query: str) -> str:
+        if key is not None:
+            return ":".join(str(part) for part in key)
+        normalized = " ".join(query.split())
+        return "unregistered:" + hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def format_params(args):
+        params = []
+        for value in args:
+            text = repr(value)
+            params.append(text if len(text) <= PARAM_MAX_LENGTH else text[:PARAM_MAX_LENGTH] + "...")
+        return params
+
+    def observe(self, key, query, args, elapsed_ms, error=None):
+        """
+        statement_registry 的查詢 callback (見 main.py 的 lifespan)，包含連線池連線上未登錄的查詢
+        """
+        shape_name = self.shape_for(key, query)
+        shape = self._shapes.get(shape_name)
+        if shape is None:
+            if len(self._shapes) >= self.max_shapes:
+                self.dropped_shapes += 1
+                return
+            shape = self._shapes[shape_name] = QueryShape(shape_name, " ".join(query.split()))
+        shape.count += 1
+        shape.total_ms += elapsed_ms
+        if elapsed_ms > shape.max_ms:
+            shape.max_ms = elapsed_ms
+        if error is not None:
+            shape.errors += 1
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        params = self.format_params(args)
+        shape.slow_count += 1
+        shape.last_slow_params = params
+        self.slow_queries += 1
+        entry = {
+            "timestamp": self._clock(),
+            "shape": shape_name,
+            "duration_ms": round(elapsed_ms, 3),
+            "params": params,
+            "error": type(error).__name__ if error is not None else None,
+            "explain": None
+        }
+        self._entries.append(entry)
+        print(f"慢查詢 {elapsed_ms:.1f}ms [{shape_name}] params={params}")
+        if self._should_explain(shape, query):
+            shape.last_explained_at = self._clock()
+            # 以空的 context 執行，EXPLAIN 的連線與查詢時間不計入目前請求的 db_acquire / db_query
+            self._explaining = asyncio.get_running_loop().create_task(
+                self._explain(entry, query, args), context=contextvars.Context()
+            )
+
+    def _should_explain(self, shape, query: str) -> bool:
+        if self.explain_rate <= 0:
+            return False
+        # 同時只執行一個 EXPLAIN
+        if self._explaining is not None and not self._explaining.done():
+            return False
+        if shape.last_explained_at is not None and self._clock() - shape.last_explained_at < self.explain_cooldown:
+            return False
+        # EXPLAIN ANALYZE 會實際執行語句，只處理查詢
+        if not query.lstrip().upper().startswith(("SELECT", "WITH")):
+            return False
+        return self._sample() < self.explain_rate
+
+    async def _explain(self, entry, query, args):
+        try:
+            async with self._pool.get_read_connection() as conn:
+                # EXPLAIN 本身不計入查詢統計
+                conn = getattr(conn, 'untimed', conn)
+                async with conn.transaction(readonly=True):
+                    await conn.execute(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    plan = await conn.fetchval(self.EXPLAIN_PREFIX + query, *args)
+            # FORMAT JSON 的結果為 json 字串
+            entry["explain"] = json.loads(plan) if isinstance(plan, str) else plan
+            self.explains += 1
+        except Exception as e:
+            self.explain_failures += 1
+            entry["explain"] = {"error": str(e)}
+            print(f"慢查詢 EXPLAIN 失敗 [{entry['shape']}]: {e}")
+
+    def top(self, limit=20, order="max"):
+        """
+        依 max (最大耗時)、avg (平均耗時) 或 total (累計耗時) 排序的前 limit 種語句
+        """
+        sort_keys = {
+            "max": lambda shape: shape.max_ms,
+            "avg": lambda shape: shape.total_ms / shape.count,
+            "total": lambda shape: shape.total_ms
+        }
+        if order not in sort_keys:
+            raise ValueError(f"order 必須為 {', '.join(sort_keys)}")
+        shapes = sorted(self._shapes.values(), key=sort_keys[order], reverse=True)
+        return [shape.to_dict() for shape in shapes[:limit]]
+
+    def recent(self, limit=50):
+        """
+        最近的慢查詢 (新到舊)
+        """
+        return list(reversed(self._entries))[:limit]
+
+    def reset(self):
+        self._shapes.clear()
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_rate": self.explain_rate,
+            "shapes": len(self._shapes),
+            "dropped_shapes": self.dropped_shapes,
+            "slow_queries": self.slow_queries,
+            "buffered": len(self._entries),
+            "explains": self.explains,
+            "explain_failures": self.explain_failures
+        }
+
+
+slow_query_log = SlowQueryLog()
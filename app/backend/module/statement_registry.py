@@ -0,0 +1,180 @@
+import os
+import time
+import weakref
+import asyncpg
+from module.metrics import Histogram
+from module.request_metrics import record_phase
+
+
+class StatementRegistry:
+    """
+    預先建立的 SQL 語句登錄表
+
+    排行榜與財報查詢必須以字串組合表名與欄位名，但組合是有限的 (表 × 欄位 × 條件形狀)。
+    各模組在匯入時以 key 登錄所有組合的語句，查詢時依語句找到對應的 key：
+    - eager 語句在連線池建立每條連線時 (init) 預先 prepare
+    - 其他已登錄的語句在該連線第一次使用時 prepare，之後同一條連線直接重用
+    - 未登錄的語句 (例如任意欄位投影) 照常交給 conn.fetch
+    prepare 後的語句不受 asyncpg statement cache 大小限制，不會因排行榜種類多而被擠出快取。
+    """
+
+    def __init__(self, prepare_on_init=True):
+        self.prepare_on_init = prepare_on_init
+        self._queries = {}
+        self._keys = {}
+        self._eager = []
+        # 原始連線 → {語句: PreparedStatement}，連線關閉後自動移除
+        self._prepared = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.unregistered = 0
+        self.prepare_failures = 0
+        self.connections_prepared = 0
+        self.prepared_on_init = 0
+        self.last_init_ms = None
+        self.total_init_ms = 0.0
+        # 依語句種類 (key 的第一個元素) 記錄查詢耗時
+        self.query_timings = {}
+        self._listeners = []
+
+    def register(self, key, query, eager=False):
+        """
+        登錄語句，相同 key 重複登錄時以最後一次為準
+        """
+        self._queries[key] = query
+        self._keys[query] = key
+        if eager and key not in self._eager:
+            self._eager.append(key)
+
+    def query(self, key):
+        return self._queries[key]
+
+    def key_for(self, query):
+        return self._keys.get(query)
+
+    def add_listener(self, callback):
+        """
+        註冊每次查詢完成後的 callback(key, query, args, elapsed_ms, error)，例如慢查詢記錄
+        key 為登錄時的 key (未登錄語句為 None)，error 為查詢拋出的例外 (成功時為 None)
+        同一個 callback 只註冊一次 (lifespan 重複執行時不會重複記錄)
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def __len__(self):
+        return len(self._queries)
+
+    @staticmethod
+    def _raw_connection(conn):
+        # 連線池回傳的是 PoolConnectionProxy，prepare 後的語句屬於其背後的實際連線
+        return getattr(conn, '_con', conn)
+
+    async def prepare_connection(self, conn):
+        """
+        在新連線上 prepare 所有 eager 語句，供連線池 init 使用
+        單一語句失敗 (例如資料表尚未建立) 時略過，不影響連線建立
+        """
+        if not self.prepare_on_init or not self._eager:
+            return
+        start = time.perf_counter()
+        prepared = self._prepared.setdefault(self._raw_connection(conn), {})
+        for key in self._eager:
+            query = self._queries[key]
+            try:
+                prepared[query] = await conn.prepare(query)
+                self.prepared_on_init += 1
+            except asyncpg.PostgresError as e:
+                self.prepare_failures += 1
+                print(f"預先 prepare 語句失敗 {key}: {e}")
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.last_init_ms = elapsed_ms
+        self.total_init_ms += elapsed_ms
+        self.connections_prepared += 1
+
+    async def _statement(self, conn, query):
+        prepared = self._prepared.setdefault(self._raw_connection(conn), {})
+        statement = prepared.get(query)
+        if statement is not None:
+            self.hits += 1
+            return statement
+        self.misses += 1
+        statement = await conn.prepare(query)
+        prepared[query] = statement
+        return statement
+
+    def observe(self, query, args, elapsed_ms, error=None):
+        """
+        記錄一次查詢的耗時：依語句種類累計、計入目前請求的 db_query，並呼叫 listener
+        除了此登錄表的查詢，連線池回傳的連線 (見 TimedConnection) 上的查詢也經由此處記錄
+        """
+        key = self._keys.get(query)
+        label = key[0] if key is not None else "unregistered"
+        timing = self.query_timings.get(label)
+        if timing is None:
+            timing = self.query_timings[label] = Histogram()
+        timing.observe(elapsed_ms)
+        record_phase("db_query", elapsed_ms)
+        for callback in self._listeners:
+            try:
+                callback(key, query, args, elapsed_ms, error)
+            except Exception as e:
+                print(f"查詢 callback 執行失敗: {e}")
+
+    async def _run(self, conn, method, query, args):
+        # 連線池回傳的連線會自行計時，改用原本的連線執行，避免同一次查詢記錄兩次
+        conn = getattr(conn, 'untimed', conn)
+        key = self._keys.get(query)
+        start = time.perf_counter()
+        error = None
+        try:
+            if key is None:
+                self.unregistered += 1
+                return await getattr(conn, method)(query, *args)
+            statement = await self._statement(conn, query)
+            try:
+                return await getattr(statement, method)(*args)
+            except (asyncpg.exceptions.InvalidCachedStatementError, asyncpg.exceptions.OutdatedSchemaCacheError):
+                # 資料表結構變更後舊的 prepared statement 失效，重新 prepare 一次
+                self._prepared[self._raw_connection(conn)].pop(query, None)
+                statement = await self._statement(conn, query)
+                return await getattr(statement, method)(*args)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.observe(query, args, (time.perf_counter() - start) * 1000, error)
+
+    async def fetch(self, conn, query, *args):
+        return await self._run(conn, 'fetch', query, args)
+
+    async def fetchrow(self, conn, query, *args):
+        return await self._run(conn, 'fetchrow', query, args)
+
+    async def fetchval(self, conn, query, *args):
+        return await self._run(conn, 'fetchval', query, args)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "registered": len(self._queries),
+            "eager": len(self._eager),
+            "prepare_on_init": self.prepare_on_init,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "unregistered": self.unregistered,
+            "prepare_failures": self.prepare_failures,
+            "connections_prepared": self.connections_prepared,
+            "prepared_on_init": self.prepared_on_init,
+            "last_init_ms": self.last_init_ms,
+            "avg_init_ms": round(self.total_init_ms / self.connections_prepared, 3) if self.connections_prepared else None
+        }
+
+    def query_stats(self):
+        return {label: timing.snapshot() for label, timing in sorted(self.query_timings.items())}
+
+
+# 全域登錄表，PREPARED_STATEMENTS_ON_INIT=0 時只在第一次使用時 prepare
+statement_registry = StatementRegistry(
+    prepare_on_init=os.getenv('PREPARED_STATEMENTS_ON_INIT', '1') != '0'
+)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.datastructures import QueryParams
+
+
+# 帶有正確內容 hash (?v=) 的靜態檔可被瀏覽器長期快取，內容變動時網址隨之改變
+STATIC_ASSET_MAX_AGE = int(os.getenv('STATIC_ASSET_MAX_AGE', str(365 * 24 * 3600)))
+
+# HTML 中引用的本站靜態檔 (href="/css/x.css"、src="../js/x.js" 等)
+ASSET_REFERENCE = re.compile(r'(?P<attr>href|src)="(?:\.\.)?/(?P<mount>css|js|img)/(?P<name>[^"?#]+)"')
+
+
+class StaticAssets:
+    """
+    靜態檔內容 hash 與 HTML 改寫
+
+    - asset_hash(): 檔案內容的 hash，以 (路徑, mtime, 大小) 快取，檔案更新後自動重算
+    - render_html(): 將 HTML 中的靜態檔網址加上 ?v=<hash>
+    - html_response(): 回傳改寫後的 HTML，以內容 hash 作為 ETag 支援 304
+    """
+
+    def __init__(self, directories: dict):
+        # {"css": Path, "js": Path, "img": Path}
+        self.directories = {mount: Path(directory) for mount, directory in directories.items()}
+        self._hashes = {}
+        self._html = {}
+
+    def asset_hash(self, path: Path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(str(path))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+        self._hashes[str(path)] = (key, digest)
+        return digest
+
+    def versioned_url(self, mount: str, name: str):
+        directory = self.directories.get(mount)
+        digest = self.asset_hash(directory / name) if directory is not None else None
+        if digest is None:
+            return f"/{mount}/{name}"
+        return f"/{mount}/{name}?v={digest}"
+
+    def render_html(self, path: Path):
+        """
+        回傳 (HTML bytes, ETag)，HTML 或其引用的靜態檔變動時重新產生
+        """
+        stat = path.stat()
+        cached = self._html.get(str(path))
+        if cached is not None and cached[0] == stat.st_mtime_ns:
+            html, etag, assets = cached[1], cached[2], cached[3]
+            # 引用的靜態檔內容變動時，HTML 中的 ?v= 也要更新
+            if all(self.versioned_url(mount, name) == url for mount, name, url in assets):
+                return html, etag
+
+        assets = []
+
+        def replace(match):
+            url = self.versioned_url(match.group("mount"), match.group("name"))
+            assets.append((match.group("mount"), match.group("name"), url))
+            return f'{match.group("attr")}="{url}"'
+
+        html = ASSET_REFERENCE.sub(replace, path.read_text(encoding="utf-8")).encode("utf-8")
+        etag = f'"{hashlib.sha256(html).hexdigest()[:20]}"'
+        self._html[str(path)] = (stat.st_mtime_ns, html, etag, assets)
+        return html, etag
+
+    def html_response(self, request, path: Path) -> Response:
+        html, etag = self.render_html(path)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=html, media_type="text/html", headers=headers)
+
+
+class VersionedStaticFiles(StaticFiles):
+    """
+    網址帶有與目前內容相符的 ?v=<hash> 時回傳長期快取 (immutable)，
+    否則回傳 no-cache，由瀏覽器以 ETag / Last-Modified 重新驗證
+    """
+
+    def __init__(self, *args, assets: StaticAssets, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        version = QueryParams(scope.get("query_string", b"")).get("v")
+        if version is not None and version == self.assets.asset_hash(Path(full_path)):
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_ASSET_MAX_AGE}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
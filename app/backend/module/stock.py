@@ -99,20 +99,3 @@ class Stock:
                 stock_info[field] = None
 
         return stock_info
-
-    @staticmethod
-    def get_stock_info_query() -> str:
-        """
-        獲取股票基本資訊查詢 SQL
-        使用 asyncpg 兼容的 $N 佔位符
-        """
-        return """
-            SELECT 
-                c.*,
-                s.sector_name,
-                co.country_name
-            FROM Companies AS c
-            LEFT JOIN Sectors AS s ON c.sector_id = s.sector_id
-            LEFT JOIN Countrys AS co ON c.country_id = co.country_id
-            WHERE c.stock_symbol = $1 AND co.country_name = $2
-        """ 
\ No newline at end of file
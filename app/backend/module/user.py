@@ -1,29 +1,57 @@
+import asyncio
 from fastapi import HTTPException
-import bcrypt
-import asyncpg 
+import asyncpg
 from module.postgresql_connection_pool import postgresql_pool
+from module.password_hasher import password_hasher
+
+# 背景升級 hash 的 task，保留參照避免尚未完成就被回收
+_upgrade_tasks = set()
+
+
+async def upgrade_password_hash(user_id: int, user_password: str, old_hash: str):
+    """
+    以目前的 cost factor 重新計算密碼 hash
+    只在 hash 未被變更時更新，避免覆蓋同時進行的密碼修改
+    """
+    try:
+        new_hash = await password_hasher.hash(user_password)
+        async with postgresql_pool.get_connection() as conn:
+            await conn.execute(
+                "UPDATE users SET password_hash = $1 WHERE id = $2 AND password_hash = $3",
+                new_hash, user_id, old_hash
+            )
+        password_hasher.upgrades += 1
+    except Exception as e:
+        password_hasher.upgrade_failures += 1
+        print(f"密碼 hash 升級失敗 (user_id={user_id}): {e}")
+
 
 async def login_check(user_email: str, user_password: str):
     try:
+        # 登入固定走主庫，剛註冊或剛被核准的帳號不受副本延遲影響
         async with postgresql_pool.get_connection() as conn:
             record = await conn.fetchrow("SELECT id, username, email, password_hash, role, status FROM users WHERE email = $1", user_email)
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail="Database error")
 
-            if not record:
-                raise HTTPException(status_code=401, detail="Invalid email")
+    if not record:
+        raise HTTPException(status_code=401, detail="Invalid email")
 
-            stored_hash = record['password_hash']
-            status = record['status']
-            stored_hash_bytes = stored_hash.encode('utf-8')
-            check = bcrypt.checkpw(user_password.encode('utf-8'), stored_hash_bytes)
+    stored_hash = record['password_hash']
+    status = record['status']
+    # bcrypt 在專用執行緒池計算，且不佔用資料庫連線
+    check = await password_hasher.verify(user_password, stored_hash)
 
-            if not check:
-                raise HTTPException(status_code=401, detail="Invalid password")
+    if not check:
+        raise HTTPException(status_code=401, detail="Invalid password")
 
-            if status != 'active':
-                raise HTTPException(status_code=403, detail="Account is not active. Please wait for admin approval.")
+    if status != 'active':
+        raise HTTPException(status_code=403, detail="Account is not active. Please wait for admin approval.")
 
-            return record
+    if password_hasher.needs_upgrade(stored_hash):
+        task = asyncio.create_task(upgrade_password_hash(record['id'], user_password, stored_hash))
+        _upgrade_tasks.add(task)
+        task.add_done_callback(_upgrade_tasks.discard)
 
-    except asyncpg.exceptions.PostgresError as e:
-        raise HTTPException(status_code=500, detail="Database error")
+    return record
 
@@ -0,0 +1,52 @@
+"""
+正式環境啟動入口：依容器可用的 CPU 核心數啟動多個 uvicorn worker 行程
+
+    python backend/server.py
+
+- 每個 worker 是獨立行程，各自在 main.py 的 lifespan 建立 PostgreSQL / MongoDB 連線，關閉時釋放
+- WEB_CONCURRENCY 可覆寫 worker 數；PostgreSQL 連線總數 = 節點數 × worker 數 × PostgreSQL_POOL_MAX_SIZE
+- 負載平衡器 / Swarm healthcheck 使用 /health/ready，連線池建立完成前回傳 503
+"""
+import math
+import os
+import uvicorn
+
+
+def available_cpus() -> int:
+    """
+    可用 CPU 核心數：CPU affinity 與 cgroup v2 配額 (docker --cpus、Swarm resources.limits.cpus) 取較小者
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def worker_count() -> int:
+    workers = os.getenv("WEB_CONCURRENCY")
+    if workers:
+        return max(1, int(workers))
+    return available_cpus()
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=worker_count(),
+        lifespan="on",
+        # 前方有反向代理 / Swarm ingress，使用 X-Forwarded-* 取得原始用戶端位址
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        # 關閉時等待進行中的請求完成再關閉連線池
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "20"))
+    )
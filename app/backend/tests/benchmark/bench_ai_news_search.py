@@ -0,0 +1,119 @@
+"""
+AI 新聞關鍵字搜尋基準測試：regex 全表掃描 vs search_tokens multikey 索引
+
+在指定的 MongoDB 建立合成的 AI_news_analysis collection (預設 100k 筆)，
+分別以修改前的 $or + $regex 查詢與 SearchTokens.keyword_filter 產生的查詢取第一頁，量測：
+- 每次查詢延遲 p50 / p95
+- explain 的 totalDocsExamined (實際讀取的文件數)
+資料寫入一次後可重複使用 (--reuse)。請勿指向正式資料庫，在 app/backend 目錄下執行：
+
+    python tests/benchmark/bench_ai_news_search.py --uri mongodb://localhost:27017 --docs 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import pymongo
+from pymongo import ASCENDING, DESCENDING
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from module.news import News  # noqa: E402
+from module.search_tokens import SearchTokens  # noqa: E402
+
+COMPANIES = ["台積電", "鴻海", "聯發科", "廣達", "緯創", "長榮", "陽明", "中華電", "國泰金", "富邦金",
+             "大立光", "日月光", "華碩", "宏碁", "台達電", "南亞科", "欣興", "光寶科", "英業達", "仁寶"]
+INDUSTRIES = ["半導體", "光電", "航運", "金融", "電腦週邊", "通信網路", "電子零組件", "生技醫療", "鋼鐵", "塑膠"]
+PHRASES = ["營收創新高", "毛利率下滑", "法人看好", "外資賣超", "訂單能見度", "庫存調整", "AI伺服器需求",
+           "關稅衝擊", "美債殖利率", "降息預期", "先進製程", "資本支出", "出貨成長", "匯率波動", "股利政策"]
+QUERIES = ["台積電", "AI伺服器", "關稅衝擊", "大立光", "不存在的公司"]
+
+
+def synthetic_document(rng: random.Random, i: int):
+    def sentence():
+        return f"{rng.choice(COMPANIES)}{rng.choice(PHRASES)}，{rng.choice(INDUSTRIES)}族群{rng.choice(PHRASES)}。"
+
+    document = {
+        "analysis_batch": i % 10,
+        "is_summary": i % 10 == 0,
+        "category": "headline",
+        "publishAt": 1700000000 + i * 60,
+        "summary": "".join(sentence() for _ in range(4)),
+        "important_news": "".join(sentence() for _ in range(6)),
+        "potential_stocks_and_industries": "".join(sentence() for _ in range(3)),
+        "industry_list": rng.sample(INDUSTRIES, 2),
+        "source_news": [{"title": sentence(), "_id": str(i * 10 + n)} for n in range(5)]
+    }
+    titles = [news["title"] for news in document["source_news"]]
+    document["search_tokens"] = SearchTokens.tokenize(" ".join(
+        [document["summary"], document["important_news"], document["potential_stocks_and_industries"]] + titles
+    ))
+    document["industry_tokens"] = SearchTokens.tokenize(" ".join(document["industry_list"]))
+    return document
+
+
+def populate(collection, docs: int):
+    rng = random.Random(42)
+    collection.drop()
+    batch = []
+    for i in range(docs):
+        batch.append(synthetic_document(rng, i))
+        if len(batch) == 1000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    collection.create_index([("publishAt", DESCENDING), ("_id", DESCENDING)])
+    collection.create_index([("search_tokens", ASCENDING), ("publishAt", DESCENDING), ("_id", DESCENDING)])
+
+
+def regex_query(keyword: str):
+    """修改前 get_ai_news 的關鍵字條件"""
+    return {"$or": [{field: {"$regex": keyword, "$options": "i"}} for field in SearchTokens.AI_NEWS_KEYWORD_FIELDS]}
+
+
+def token_query(keyword: str):
+    return SearchTokens.keyword_filter(keyword, "search_tokens", SearchTokens.AI_NEWS_KEYWORD_FIELDS)
+
+
+def run(collection, query, limit, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(collection.find(query, {"search_tokens": 0, "industry_tokens": 0}).sort(News.SORT).limit(limit + 1))
+        latencies.append((time.perf_counter() - start) * 1000)
+    explain = collection.find(query).sort(News.SORT).limit(limit + 1).explain()
+    examined = explain["executionStats"]["totalDocsExamined"] if "executionStats" in explain else None
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1], examined
+
+
+def main(args):
+    client = pymongo.MongoClient(args.uri)
+    collection = client[args.db]["AI_news_analysis_bench"]
+    if not args.reuse or collection.estimated_document_count() != args.docs:
+        start = time.perf_counter()
+        populate(collection, args.docs)
+        print(f"populated {args.docs} documents in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'keyword':>12} {'mode':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'examined':>10}")
+    for keyword in QUERIES:
+        for mode, build in (("regex", regex_query), ("token", token_query)):
+            p50, p95, examined = run(collection, build(keyword), args.limit, args.repeat)
+            print(f"{keyword:>12} {mode:>6} {p50:>10.2f} {p95:>10.2f} {examined if examined is not None else '-':>10}")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI 新聞關鍵字搜尋基準測試")
+    parser.add_argument("--uri", default=os.getenv("BENCH_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="stock_insight_bench")
+    parser.add_argument("--docs", type=int, default=100000, help="合成文件數")
+    parser.add_argument("--limit", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="文件數相同時沿用既有資料")
+    args = parser.parse_args()
+    main(args)
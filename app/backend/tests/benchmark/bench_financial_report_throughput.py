@@ -0,0 +1,142 @@
+"""
+/api/financial_report 吞吐量基準測試：標準庫 JSONResponse vs FastJSONResponse
+
+預設不需資料庫：以合成資料 (40 年 × 4 季 × 30 欄) 取代連線池，
+透過 ASGI 直接呼叫 router，比較兩種回應類別的每秒請求數。
+在 app/backend 目錄下執行：
+
+    python tests/benchmark/bench_financial_report_throughput.py --requests 500 --concurrency 20
+
+指定 --url 時改為對執行中的服務量測 (只量測目前部署的版本)：
+
+    python tests/benchmark/bench_financial_report_throughput.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from api import financial_report  # noqa: E402
+from module.json_response import FastJSONResponse, orjson  # noqa: E402
+from module.company_index import company_index  # noqa: E402
+
+PARAMS = {
+    "stock_symbol": "2330",
+    "country": "tw",
+    "report_type": "income_statements",
+    "report_period": "quarterly"
+}
+
+
+def build_rows(years: int, columns: int):
+    rng = random.Random(42)
+    rows = []
+    for year in range(2025 - years, 2025):
+        for quarter in range(4, 0, -1):
+            row = {
+                "income_id": len(rows) + 1,
+                "company_id": 1,
+                "report_type": "quarterly",
+                "year": year,
+                "quarter": quarter,
+                "original_currency": "TWD",
+                "stock_symbol": "2330",
+                "country_name": "Taiwan"
+            }
+            row.update((f"col_{i}", round(rng.uniform(-1e12, 1e12), 2)) for i in range(columns))
+            rows.append(row)
+    return rows
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, query, *params):
+        return self.rows
+
+    async def prepare(self, query):
+        # statement_registry 對已登錄的語句改走 prepared statement
+        return FakePreparedStatement(self, query)
+
+
+class FakePreparedStatement:
+    def __init__(self, conn, query):
+        self.conn = conn
+        self.query = query
+
+    async def fetch(self, *params):
+        return await self.conn.fetch(self.query, *params)
+
+
+def use_fake_pool(rows):
+    conn = FakeConnection(rows)
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    financial_report.postgresql_pool.get_read_connection = get_connection
+    company_index.load([{"company_id": 1, "stock_symbol": "2330", "country_name": "Taiwan", "sector_name": "半導體業"}])
+
+
+async def run_load(client: httpx.AsyncClient, total: int, concurrency: int) -> float:
+    """回傳每秒請求數"""
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            response = await client.get("/api/financial_report", params=PARAMS)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def bench_in_process(args):
+    use_fake_pool(build_rows(args.years, args.columns))
+    app = FastAPI()
+    app.include_router(financial_report.router)
+    transport = httpx.ASGITransport(app=app)
+
+    results = {}
+    for label, response_class in [("JSONResponse (json)", JSONResponse), ("FastJSONResponse", FastJSONResponse)]:
+        financial_report.FastJSONResponse = response_class
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            size = len((await client.get("/api/financial_report", params=PARAMS)).content)
+            results[label] = await run_load(client, args.requests, args.concurrency)
+        print(f"{label:>22}: {results[label]:>8.1f} req/s  ({size} bytes)")
+    financial_report.FastJSONResponse = FastJSONResponse
+
+    print(f"encoder={'orjson' if orjson else 'json (fallback)'} "
+          f"speedup={results['FastJSONResponse'] / results['JSONResponse (json)']:.1f}x")
+
+
+async def bench_live(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        rps = await run_load(client, args.requests, args.concurrency)
+    print(f"{args.url}: {rps:.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="financial_report 吞吐量基準測試")
+    parser.add_argument("--url", help="對執行中的服務量測，例如 http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--years", type=int, default=40)
+    parser.add_argument("--columns", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(bench_live(args) if args.url else bench_in_process(args))
@@ -0,0 +1,177 @@
+"""
+登入尖峰基準測試：大量 /api/user/auth 與 financial_report 混合併發請求
+
+比較三種 bcrypt 驗證方式下，financial_report 請求的延遲與登入的延遲：
+- blocking：在 async handler 中直接 bcrypt.checkpw (修改前的做法)，每次驗證期間整個事件迴圈停住
+- executor：password_hasher 在專用執行緒池驗證 (同時在途的相同帳密只計算一次)，關閉驗證成功快取
+- cached：executor 加上驗證成功快取，之後重複登入的相同帳密不需重新計算
+
+預設以假連線池在行程內執行 (不需資料庫)，bcrypt 為真實計算：
+
+    python tests/benchmark/bench_login_storm.py --logins 200 --reports 200 --rounds 12
+
+指定 --url 時改為對執行中的服務量測 (需提供有效帳號，只量測目前部署的版本)：
+
+    python tests/benchmark/bench_login_storm.py --url http://localhost:8000 --email a@b.com --password secret
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+REPORT_PARAMS = {
+    "stock_symbol": "2330",
+    "country": "tw",
+    "report_type": "income_statements",
+    "report_period": "quarterly"
+}
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+class FakeConnection:
+    def __init__(self, password_hash: str):
+        self.password_hash = password_hash
+
+    async def fetchrow(self, query, *params):
+        await asyncio.sleep(0.002)
+        return {
+            "id": 1, "username": "bench", "email": BENCH_EMAIL,
+            "password_hash": self.password_hash, "role": "user", "status": "active"
+        }
+
+    async def fetch(self, query, *params):
+        await asyncio.sleep(0.005)
+        return [{"year": 2024, "quarter": q, "revenue": 1.0} for q in range(4, 0, -1)]
+
+    async def prepare(self, query):
+        # statement_registry 對已登錄的語句改走 prepared statement
+        return FakePreparedStatement(self, query)
+
+
+class FakePreparedStatement:
+    def __init__(self, conn, query):
+        self.conn = conn
+        self.query = query
+
+    async def fetch(self, *params):
+        return await self.conn.fetch(self.query, *params)
+
+
+def build_app(rounds: int):
+    from api import user, financial_report
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    conn = FakeConnection(password_hash)
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    financial_report.postgresql_pool.get_read_connection = get_connection
+    financial_report.postgresql_pool.get_connection = get_connection
+    from module.company_index import company_index
+    company_index.load([{"company_id": 1, "stock_symbol": "2330", "country_name": "Taiwan", "sector_name": "半導體業"}])
+    app = FastAPI()
+    app.include_router(user.router)
+    app.include_router(financial_report.router)
+    return app
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[max(int(len(values) * q) - 1, 0)]
+
+
+async def run_storm(client: httpx.AsyncClient, login_count: int, report_count: int, email: str, password: str):
+    login_latencies = []
+    report_latencies = []
+    rejected = 0
+
+    async def login_request():
+        nonlocal rejected
+        start = time.perf_counter()
+        response = await client.post("/api/user/auth", json={"email": email, "password": password})
+        if response.status_code == 503:
+            rejected += 1
+            return
+        response.raise_for_status()
+        login_latencies.append((time.perf_counter() - start) * 1000)
+
+    async def report_request():
+        start = time.perf_counter()
+        (await client.get("/api/financial_report", params=REPORT_PARAMS)).raise_for_status()
+        report_latencies.append((time.perf_counter() - start) * 1000)
+
+    tasks = [login_request() for _ in range(login_count)] + [report_request() for _ in range(report_count)]
+    # 交錯排列，讓兩種請求同時在途
+    tasks[::2], tasks[1::2] = tasks[:len(tasks[::2])], tasks[len(tasks[::2]):]
+    await asyncio.gather(*tasks)
+    return {
+        "report_p50": statistics.median(report_latencies),
+        "report_p99": percentile(report_latencies, 0.99),
+        "login_p50": statistics.median(login_latencies) if login_latencies else 0.0,
+        "login_p99": percentile(login_latencies, 0.99) if login_latencies else 0.0,
+        "rejected": rejected
+    }
+
+
+def print_row(mode, result):
+    print(f"{mode:>10} {result['report_p50']:>12.1f} {result['report_p99']:>12.1f} "
+          f"{result['login_p50']:>12.1f} {result['login_p99']:>12.1f} {result['rejected']:>9}")
+
+
+async def bench_in_process(args):
+    app = build_app(args.rounds)
+    from module import user as user_module
+    from module.password_hasher import PasswordHasher
+
+    class BlockingHasher(PasswordHasher):
+        async def verify(self, password, stored_hash):
+            return bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8"))
+
+    modes = [
+        ("blocking", BlockingHasher(rounds=args.rounds)),
+        ("executor", PasswordHasher(workers=args.workers, max_queue=args.max_queue, rounds=args.rounds, cache_ttl=0)),
+        ("cached", PasswordHasher(workers=args.workers, max_queue=args.max_queue, rounds=args.rounds))
+    ]
+    original = user_module.password_hasher
+    print(f"{'mode':>10} {'report p50':>12} {'report p99':>12} {'login p50':>12} {'login p99':>12} {'rejected':>9}  (ms)")
+    for mode, hasher in modes:
+        user_module.password_hasher = hasher
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            result = await run_storm(client, args.logins, args.reports, BENCH_EMAIL, BENCH_PASSWORD)
+        hasher.close()
+        print_row(mode, result)
+    user_module.password_hasher = original
+
+
+async def bench_live(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        result = await run_storm(client, args.logins, args.reports, args.email, args.password)
+    print_row("live", result)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="登入尖峰 bcrypt 基準測試")
+    parser.add_argument("--url", help="對執行中的服務量測，例如 http://localhost:8000")
+    parser.add_argument("--email", help="--url 模式使用的帳號")
+    parser.add_argument("--password", help="--url 模式使用的密碼")
+    parser.add_argument("--logins", type=int, default=200, help="登入請求數")
+    parser.add_argument("--reports", type=int, default=200, help="financial_report 請求數")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=2, help="bcrypt 執行緒數")
+    parser.add_argument("--max-queue", type=int, default=256, help="bcrypt 排隊上限")
+    args = parser.parse_args()
+    if args.url and not (args.email and args.password):
+        parser.error("--url 模式需要 --email 與 --password")
+    asyncio.run(bench_live(args) if args.url else bench_in_process(args))
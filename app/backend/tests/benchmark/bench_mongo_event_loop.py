@@ -0,0 +1,160 @@
+"""
+事件迴圈阻塞基準測試：news 與 financial_report 混合併發請求
+
+比較兩種 MongoDB 存取方式下，financial_report (PostgreSQL) 請求的延遲：
+- blocking：在 async handler 中直接 list(cursor) (修改前的做法)，Mongo 查詢期間整個事件迴圈停住
+- executor：mongodb_pool.to_list() 在專用執行緒池取回結果，事件迴圈持續處理其他請求
+
+預設以模擬延遲的假 collection 與假連線池在行程內執行 (不需資料庫)：
+
+    python tests/benchmark/bench_mongo_event_loop.py --news 100 --reports 100 --mongo-latency-ms 30
+
+指定 --url 時改為對執行中的服務量測 (只量測目前部署的版本)：
+
+    python tests/benchmark/bench_mongo_event_loop.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pymongo
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+REPORT_PARAMS = {
+    "stock_symbol": "2330",
+    "country": "tw",
+    "report_type": "income_statements",
+    "report_period": "quarterly"
+}
+
+
+class FakeCursor:
+    """模擬 pymongo cursor：迭代時才以阻塞方式等待網路回應"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    def __iter__(self):
+        time.sleep(self.latency)
+        return iter([{"title": f"news {i}", "content": "x" * 500, "publishAt": 1700000000 + i} for i in range(21)])
+
+
+class FakeCollection:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.latency)
+
+
+class FakeConnection:
+    async def fetch(self, query, *params):
+        await asyncio.sleep(0.005)
+        return [{"year": 2024, "quarter": q, "revenue": 1.0} for q in range(4, 0, -1)]
+
+    async def prepare(self, query):
+        # statement_registry 對已登錄的語句改走 prepared statement
+        return FakePreparedStatement(self, query)
+
+
+class FakePreparedStatement:
+    def __init__(self, conn, query):
+        self.conn = conn
+        self.query = query
+
+    async def fetch(self, *params):
+        return await self.conn.fetch(self.query, *params)
+
+
+def build_app(mongo_latency: float):
+    # 行程內模式不連線 Atlas：以不會立即連線的本機 MongoClient 取代 SRV 連線，collection 再換成假物件
+    real_client = pymongo.MongoClient
+    pymongo.MongoClient = lambda *args, **kwargs: real_client("mongodb://localhost:27017", connect=False)
+    from api import news, financial_report
+    pymongo.MongoClient = real_client
+
+    news.collection = FakeCollection(mongo_latency)
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    financial_report.postgresql_pool.get_read_connection = get_connection
+    from module.company_index import company_index
+    company_index.load([{"company_id": 1, "stock_symbol": "2330", "country_name": "Taiwan", "sector_name": "半導體業"}])
+    app = FastAPI()
+    app.include_router(news.router)
+    app.include_router(financial_report.router)
+    return app
+
+
+async def run_mixed(client: httpx.AsyncClient, news_count: int, report_count: int):
+    report_latencies = []
+
+    async def news_request():
+        (await client.get("/api/news")).raise_for_status()
+
+    async def report_request():
+        start = time.perf_counter()
+        (await client.get("/api/financial_report", params=REPORT_PARAMS)).raise_for_status()
+        report_latencies.append((time.perf_counter() - start) * 1000)
+
+    tasks = [news_request() for _ in range(news_count)] + [report_request() for _ in range(report_count)]
+    # 交錯排列，讓兩種請求同時在途
+    tasks[::2], tasks[1::2] = tasks[:len(tasks[::2])], tasks[len(tasks[::2]):]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    wall_ms = (time.perf_counter() - start) * 1000
+    report_latencies.sort()
+    p95 = report_latencies[int(len(report_latencies) * 0.95) - 1]
+    return statistics.median(report_latencies), p95, wall_ms
+
+
+async def bench_in_process(args):
+    app = build_app(args.mongo_latency_ms / 1000)
+    from module.mongodb_connection_pool import mongodb_pool
+    executor_to_list = mongodb_pool.to_list
+
+    async def blocking_to_list(cursor):
+        return list(cursor)
+
+    print(f"{'mode':>10} {'report p50 (ms)':>16} {'report p95 (ms)':>16} {'wall (ms)':>10}")
+    for mode, to_list in [("blocking", blocking_to_list), ("executor", executor_to_list)]:
+        mongodb_pool.to_list = to_list
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            p50, p95, wall = await run_mixed(client, args.news, args.reports)
+        print(f"{mode:>10} {p50:>16.1f} {p95:>16.1f} {wall:>10.1f}")
+    mongodb_pool.to_list = executor_to_list
+
+
+async def bench_live(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        p50, p95, wall = await run_mixed(client, args.news, args.reports)
+    print(f"{args.url}: report p50={p50:.1f}ms p95={p95:.1f}ms wall={wall:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MongoDB 事件迴圈阻塞基準測試")
+    parser.add_argument("--url", help="對執行中的服務量測，例如 http://localhost:8000")
+    parser.add_argument("--news", type=int, default=100, help="news 請求數")
+    parser.add_argument("--reports", type=int, default=100, help="financial_report 請求數")
+    parser.add_argument("--mongo-latency-ms", type=float, default=30, help="模擬的 MongoDB 查詢延遲")
+    args = parser.parse_args()
+    asyncio.run(bench_live(args) if args.url else bench_in_process(args))
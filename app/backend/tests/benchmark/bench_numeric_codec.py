@@ -0,0 +1,91 @@
+"""
+numeric 轉換微基準測試：遞迴 decimal_to_float vs 連線層 numeric→float codec
+
+不需資料庫，以合成資料模擬單一股票完整財報：
+40 年 × 4 季 × 30 個 numeric 欄位，每格為 PostgreSQL 回傳的 numeric 文字。
+在 app/backend 目錄下執行：
+
+    python tests/benchmark/bench_numeric_codec.py --years 40 --columns 30 --repeat 50
+
+- 舊做法：numeric 解碼為 Decimal → dict(record) → 遞迴 decimal_to_float → JSON
+- 新做法：numeric 直接解碼為 float → dict(record) → JSON
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+
+def decimal_to_float(obj):
+    """移除前 AdvancedSearch / Financial_report 的遞迴轉換"""
+    if isinstance(obj, dict):
+        return {k: decimal_to_float(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [decimal_to_float(i) for i in obj]
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    else:
+        return obj
+
+
+def build_wire_rows(years: int, columns: int):
+    """產生資料庫回傳的原始文字資料 (每列為 (欄位名稱, numeric 文字) 的 tuple)"""
+    rng = random.Random(42)
+    names = [f"col_{i}" for i in range(columns)]
+    rows = []
+    for year in range(2025 - years, 2025):
+        for quarter in range(1, 5):
+            values = [f"{rng.uniform(-1e12, 1e12):.2f}" for _ in names]
+            rows.append((year, quarter, list(zip(names, values))))
+    return rows
+
+
+def old_path(wire_rows):
+    records = []
+    for year, quarter, cells in wire_rows:
+        record = {"year": year, "quarter": quarter}
+        record.update((name, Decimal(text)) for name, text in cells)
+        records.append(record)
+    formatted = [dict(r) for r in records]
+    formatted = decimal_to_float(formatted)
+    return json.dumps({"data": formatted, "status": "ok"}, ensure_ascii=False)
+
+
+def new_path(wire_rows):
+    records = []
+    for year, quarter, cells in wire_rows:
+        record = {"year": year, "quarter": quarter}
+        record.update((name, float(text)) for name, text in cells)
+        records.append(record)
+    formatted = [dict(r) for r in records]
+    return json.dumps({"data": formatted, "status": "ok"}, ensure_ascii=False)
+
+
+def timed(func, wire_rows, repeat: int) -> float:
+    """回傳平均耗時 (毫秒)"""
+    func(wire_rows)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(wire_rows)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(args):
+    wire_rows = build_wire_rows(args.years, args.columns)
+    assert json.loads(old_path(wire_rows)) == json.loads(new_path(wire_rows))
+
+    cells = len(wire_rows) * args.columns
+    old_ms = timed(old_path, wire_rows, args.repeat)
+    new_ms = timed(new_path, wire_rows, args.repeat)
+    print(f"rows={len(wire_rows)} numeric cells={cells}")
+    print(f"{'decimal_to_float (ms)':>22} {'float codec (ms)':>17} {'speedup':>8}")
+    print(f"{old_ms:>22.2f} {new_ms:>17.2f} {old_ms / new_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="numeric 轉換微基準測試")
+    parser.add_argument("--years", type=int, default=40)
+    parser.add_argument("--columns", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+prepared statement 啟動基準測試：連線建立時預先 prepare vs 第一次使用時才 prepare
+
+需連線實際的 PostgreSQL (讀取與 API 相同的 PostgreSQL_DB_* 環境變數)。
+分別以 PREPARED_STATEMENTS_ON_INIT 開/關建立連線池，量測：
+- 連線池建立時間 (min_size 條連線的 init 含 eager prepare)
+- 每條連線第一次執行排行榜第一頁查詢的延遲 (冷啟動)
+- 之後重複查詢的延遲 (穩定狀態)
+- 不經 registry 直接 conn.fetch 的對照組
+在 app/backend 目錄下執行：
+
+    python tests/benchmark/bench_prepared_statements.py --min-size 5 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import asyncpg
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from api.advanced_search import AdvancedSearch  # noqa: E402
+from module.postgresql_connection_pool import AsyncPostgreSQLConnectionPool  # noqa: E402
+from module.statement_registry import statement_registry  # noqa: E402
+
+RANKING_TYPES = ["revenue", "net_income", "operating_income", "total_assets", "free_cash_flow"]
+
+
+def build_queries(year: int, quarter: int):
+    queries = []
+    for ranking_type in RANKING_TYPES:
+        config = AdvancedSearch.SUPPORTED_RANKINGS[ranking_type]
+        db_report_type = "quarterly" if config['table'] == "Balance_Sheets" else "accumulated"
+        queries.append(AdvancedSearch.build_ranking_lookup_query(
+            config['table'], config['field'], year, db_report_type, quarter, None, 16
+        ))
+    return queries
+
+
+async def create_pool(min_size: int):
+    return await asyncpg.create_pool(
+        host=os.getenv('PostgreSQL_DB_HOST', 'localhost'),
+        database=os.getenv('PostgreSQL_DB_NAME', 'stock_insight'),
+        user=os.getenv('PostgreSQL_DB_USER'),
+        password=os.getenv('PostgreSQL_DB_PASSWORD'),
+        port=os.getenv('PostgreSQL_DB_PORT', '5432'),
+        min_size=min_size,
+        max_size=min_size,
+        init=AsyncPostgreSQLConnectionPool.init_connection
+    )
+
+
+async def run_queries(pool, queries, fetch):
+    """每條連線各執行一次所有查詢，回傳每次查詢的延遲 (ms)"""
+    latencies = []
+    connections = [await pool.acquire() for _ in range(pool.get_min_size())]
+    try:
+        for conn in connections:
+            for query, params in queries:
+                start = time.perf_counter()
+                await fetch(conn, query, *params)
+                latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        for conn in connections:
+            await pool.release(conn)
+    return latencies
+
+
+async def bench_mode(label, prepare_on_init, use_registry, queries, args):
+    statement_registry.prepare_on_init = prepare_on_init
+    start = time.perf_counter()
+    pool = await create_pool(args.min_size)
+    create_ms = (time.perf_counter() - start) * 1000
+    if use_registry:
+        fetch = statement_registry.fetch
+    else:
+        async def fetch(conn, query, *params):
+            return await conn.fetch(query, *params)
+    try:
+        cold = await run_queries(pool, queries, fetch)
+        warm = []
+        for _ in range(args.repeat):
+            warm.extend(await run_queries(pool, queries, fetch))
+    finally:
+        await pool.close()
+    print(f"{label:>24} {create_ms:>10.1f} {statistics.median(cold):>10.2f} {max(cold):>10.2f} "
+          f"{statistics.median(warm):>10.2f}")
+
+
+async def main(args):
+    queries = build_queries(args.year, args.quarter)
+    print(f"{'mode':>24} {'pool (ms)':>10} {'cold p50':>10} {'cold max':>10} {'warm p50':>10}")
+    await bench_mode("conn.fetch", False, False, queries, args)
+    await bench_mode("registry (lazy)", False, True, queries, args)
+    await bench_mode("registry (prepare init)", True, True, queries, args)
+    print(statement_registry.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="prepared statement 啟動基準測試")
+    parser.add_argument("--min-size", type=int, default=5, help="連線池連線數")
+    parser.add_argument("--repeat", type=int, default=20, help="穩定狀態重複次數")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--quarter", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,78 @@
+"""
+唯讀副本分流測試：確認讀取請求輪流分配到副本，副本延遲過大或停止時改走主庫
+
+以兩個本機 PostgreSQL 執行即可 (不需設定串流複寫，非 recovery 模式的副本視為沒有延遲)：
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=pw postgres:16
+    docker run -d -p 5433:5432 -e POSTGRES_PASSWORD=pw postgres:16
+
+在 app/backend 目錄下執行：
+
+    PostgreSQL_DB_USER=postgres PostgreSQL_DB_PASSWORD=pw PostgreSQL_DB_NAME=postgres \
+    PostgreSQL_REPLICA_DSNS=postgresql://postgres:pw@localhost:5433/postgres \
+    python tests/benchmark/bench_read_replica_routing.py --reads 1000 --concurrency 20
+
+執行期間停止副本 (docker stop) 可觀察讀取改走主庫，重新啟動後於下一次檢查恢復分流。
+"""
+import argparse
+import asyncio
+import collections
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from module.postgresql_connection_pool import postgresql_pool  # noqa: E402
+
+
+async def run_reads(total: int, concurrency: int):
+    servers = collections.Counter()
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with postgresql_pool.get_read_connection() as conn:
+                    port = await conn.fetchval("SELECT inet_server_port()")
+                servers[port] += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return servers, latencies, errors
+
+
+async def main(args):
+    await postgresql_pool.initialize_pool()
+    try:
+        for round_number in range(args.rounds):
+            servers, latencies, errors = await run_reads(args.reads, args.concurrency)
+            distribution = ", ".join(f"port {port}: {count}" for port, count in sorted(servers.items(), key=str))
+            print(f"round {round_number + 1}: {distribution} | errors {errors} | "
+                  f"p50 {statistics.median(latencies):.2f} ms")
+            for replica in postgresql_pool.stats()["replicas"]:
+                print(f"  {replica['name']}: available={replica['available']} "
+                      f"lag={replica['lag_seconds']} reads={replica['reads']}")
+            await asyncio.sleep(args.interval)
+    finally:
+        await postgresql_pool.close_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="唯讀副本分流測試")
+    parser.add_argument("--reads", type=int, default=1000, help="每輪讀取次數")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=2, help="每輪間隔秒數")
+    args = parser.parse_args()
+    asyncio.run(main(args))
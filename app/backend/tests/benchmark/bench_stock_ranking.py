@@ -0,0 +1,124 @@
+"""
+stock_ranking 基準測試：逐指標查詢 vs 單一視窗函數查詢
+
+需要可連線的 PostgreSQL (讀取與後端相同的 .env 設定)。
+在 app/backend 目錄下執行：
+
+    python tests/benchmark/bench_stock_ranking.py --stock-symbol 2330 --year 2024 \
+        --statement-type income_statement --report-type quarterly --quarter 4
+
+對 1..N 個指標分別量測兩種做法的平均延遲，觀察延遲隨指標數量的變化。
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from api.advanced_search import AdvancedSearch  # noqa: E402
+from module.postgresql_connection_pool import postgresql_pool  # noqa: E402
+
+TABLE_MAP = {
+    "cash_flow": "Cash_Flow_Statements",
+    "income_statement": "Income_Statements",
+    "balance_sheet": "Balance_Sheets"
+}
+
+
+def build_single_metric_query(table_name: str, field_name: str) -> str:
+    """舊版每個指標各自一次 ROW_NUMBER() 查詢"""
+    return f"""
+        WITH RankedData AS (
+            SELECT
+                c.company_id,
+                fr.{field_name},
+                ROW_NUMBER() OVER (ORDER BY fr.{field_name} DESC NULLS LAST) as rank,
+                COUNT(*) OVER () as total_count
+            FROM {table_name} AS fr
+            INNER JOIN Companies AS c ON fr.company_id = c.company_id
+            INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+            INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+            WHERE ct.country_name = $1
+            AND s.sector_name = $2
+            AND fr.year = $3
+            AND fr.report_type = $4
+            AND fr.quarter = $5
+            AND fr.{field_name} IS NOT NULL
+        )
+        SELECT {field_name} as value, rank, total_count
+        FROM RankedData
+        WHERE company_id = $6
+    """
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    """回傳平均耗時 (毫秒)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await coro_factory()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+async def main(args):
+    table_name = TABLE_MAP[args.statement_type]
+    fields = [v["field"] for v in AdvancedSearch.get_rankings_for_table(table_name).values()]
+
+    async with postgresql_pool.get_connection() as conn:
+        stock_info = await conn.fetchrow(
+            """
+            SELECT ct.country_name, s.sector_name, c.company_id
+            FROM Companies AS c
+            INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+            INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+            WHERE c.stock_symbol = $1
+            """,
+            args.stock_symbol
+        )
+        if not stock_info:
+            print(f"找不到股票代碼 {args.stock_symbol}")
+            return
+        params = (
+            stock_info["country_name"],
+            stock_info["sector_name"],
+            args.year,
+            args.report_type,
+            args.quarter,
+            stock_info["company_id"]
+        )
+
+        print(f"{'metrics':>8} {'per-metric (ms)':>16} {'batched (ms)':>14} {'speedup':>8}")
+        for n in range(1, len(fields) + 1):
+            subset = fields[:n]
+            single_queries = [build_single_metric_query(table_name, f) for f in subset]
+            batched_query = AdvancedSearch.build_stock_ranking_query(table_name, subset)
+
+            async def run_per_metric():
+                for q in single_queries:
+                    await conn.fetchrow(q, *params)
+
+            async def run_batched():
+                await conn.fetchrow(batched_query, *params)
+
+            # 預熱，避免第一次 prepare 的成本影響結果
+            await run_per_metric()
+            await run_batched()
+
+            per_metric_ms = await timed(run_per_metric, args.repeat)
+            batched_ms = await timed(run_batched, args.repeat)
+            print(f"{n:>8} {per_metric_ms:>16.2f} {batched_ms:>14.2f} {per_metric_ms / batched_ms:>7.1f}x")
+
+    await postgresql_pool.close_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="stock_ranking 查詢延遲基準測試")
+    parser.add_argument("--stock-symbol", default="2330")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--statement-type", choices=list(TABLE_MAP.keys()), default="income_statement")
+    parser.add_argument("--report-type", choices=["quarterly", "accumulated"], default="quarterly",
+                        help="資料庫中的 report_type (annual 請使用 accumulated + quarter 4)")
+    parser.add_argument("--quarter", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -24,14 +24,14 @@ async def test_ranking_valid_request(mocker):
         }
     ]
 
-    # mock postgresql_pool.get_connection().fetch
+    # mock postgresql_pool.get_read_connection().fetch
     async def mock_fetch(query, *params):
         return mock_data
 
     mock_conn = mocker.AsyncMock()
     mock_conn.fetch.side_effect = mock_fetch
     mocker.patch(
-        "module.postgresql_connection_pool.postgresql_pool.get_connection",
+        "module.postgresql_connection_pool.postgresql_pool.get_read_connection",
         return_value=mock_conn,
     )
 
@@ -38,61 +38,6 @@ def test_validate_quarter():
         
 
 
-def test_decimal_to_float():
-    # 1. 單一 Decimal
-    assert AdvancedSearch.decimal_to_float(Decimal("1.23")) == 1.23
-    assert isinstance(AdvancedSearch.decimal_to_float(Decimal("1.23")), float)
-
-    # 2. 字典包含 Decimal
-    data_dict = {"price": Decimal("99.99"), "name": "apple"}
-    expected_dict = {"price": 99.99, "name": "apple"}
-    result_dict = AdvancedSearch.decimal_to_float(data_dict)
-    assert result_dict == expected_dict
-    assert isinstance(result_dict["price"], float)
-
-    # 3. List 包含 Decimal
-    data_list = [Decimal("5.5"), Decimal("10.1"), "banana"]
-    expected_list = [5.5, 10.1, "banana"]
-    result_list = AdvancedSearch.decimal_to_float(data_list)
-    assert result_list == expected_list
-    assert isinstance(result_list[0], float)
-    assert isinstance(result_list[1], float)
-
-    # 4. 巢狀結構 (dict + list + Decimal)
-    data_nested = {
-        "a": [Decimal("1.1"), {"b": Decimal("2.2")}],
-        "c": {"d": [Decimal("3.3"), "pear"]},
-    }
-    expected_nested = {
-        "a": [1.1, {"b": 2.2}],
-        "c": {"d": [3.3, "pear"]},
-    }
-    result_nested = AdvancedSearch.decimal_to_float(data_nested)
-    assert result_nested == expected_nested
-    assert isinstance(result_nested["a"][0], float)
-    assert isinstance(result_nested["a"][1]["b"], float)
-    assert isinstance(result_nested["c"]["d"][0], float)
-
-    # 5. 不應該被轉換的值
-    assert AdvancedSearch.decimal_to_float("hello") == "hello"
-    assert AdvancedSearch.decimal_to_float(123) == 123
-    assert AdvancedSearch.decimal_to_float(None) is None
-    assert AdvancedSearch.decimal_to_float(True) is True
-
-    # 6. 空值
-    assert AdvancedSearch.decimal_to_float([]) == []
-    assert AdvancedSearch.decimal_to_float({}) == {}
-
-    # 7.測試大數字 Decimal
-    big_num = Decimal("12345678901234567890.123456789")
-    result = AdvancedSearch.decimal_to_float(big_num)
-    assert isinstance(result, float)
-    # 檢查數值在合理範圍內（允許小數精度誤差）
-    assert abs(result - float(big_num)) < 1e-6
-
-
-
-
 def test_validate_report_type_for_ranking():
     # 現金流量表只支援 accumulated
     assert AdvancedSearch._validate_report_type_for_ranking('Cash_Flow_Statements', 'accumulated') == True
@@ -138,4 +83,178 @@ def test_validate_limit():
     assert AdvancedSearch.validate_limit(500) is True
     assert AdvancedSearch.validate_limit(1000) is True
     assert AdvancedSearch.validate_limit(0) is False
-    assert AdvancedSearch.validate_limit(1001) is False
\ No newline at end of file
+    assert AdvancedSearch.validate_limit(1001) is False
+
+
+def test_get_rankings_for_table():
+    cash_flow = AdvancedSearch.get_rankings_for_table("Cash_Flow_Statements")
+    assert list(cash_flow.keys()) == ["operating_cash_flow", "free_cash_flow", "net_change_in_cash"]
+    assert all(v["table"] == "Cash_Flow_Statements" for v in cash_flow.values())
+    assert AdvancedSearch.get_rankings_for_table("Unknown_Report") == {}
+
+
+
+def test_build_stock_ranking_query():
+    fields = ["revenue", "net_income"]
+    query = AdvancedSearch.build_stock_ranking_query("Income_Statements", fields)
+    assert "FROM Income_Statements AS fr" in query
+    for field in fields:
+        assert f"fr.{field}" in query
+        assert f"AS {field}_rank" in query
+        assert f"COUNT({field}) OVER () AS {field}_total_count" in query
+    assert "WHERE company_id = $6" in query
+
+    # 只允許該資料表在 SUPPORTED_RANKINGS 中的欄位
+    with pytest.raises(ValueError):
+        AdvancedSearch.build_stock_ranking_query("Income_Statements", ["total_assets"])
+    with pytest.raises(ValueError):
+        AdvancedSearch.build_stock_ranking_query("Income_Statements", ["revenue; DROP TABLE users"])
+    with pytest.raises(ValueError):
+        AdvancedSearch.build_stock_ranking_query("Income_Statements", [])
+
+
+
+def test_build_ranking_lookup_query():
+    # 未指定產業：依全市場排名讀取
+    query, params = AdvancedSearch.build_ranking_lookup_query(
+        "Income_Statements", "revenue", 2024, "quarterly", 4, None, 15, 30
+    )
+    assert "FROM Sector_Financial_Rankings AS r" in query
+    assert "r.value AS revenue" in query
+    assert "ORDER BY r.global_rank" in query
+    assert "s.sector_name" not in query.split("WHERE")[1]
+    assert "LIMIT $6 OFFSET $7" in query
+    assert params == ["Income_Statements", "revenue", 2024, "quarterly", 4, 15, 30]
+
+    # 指定產業：依產業排名讀取，產業名稱為第 6 個參數
+    query, params = AdvancedSearch.build_ranking_lookup_query(
+        "Income_Statements", "revenue", 2024, "quarterly", 4, "半導體業", 15
+    )
+    assert "s.sector_name = $6" in query
+    assert "ORDER BY r.global_sector_rank" in query
+    assert "LIMIT $7 OFFSET $8" in query
+    assert params[5:] == ["半導體業", 15, 0]
+
+    # 游標分頁：以游標中的 company_id 取得排名做 seek
+    query, params = AdvancedSearch.build_ranking_lookup_query(
+        "Income_Statements", "revenue", 2024, "quarterly", 4, "半導體業", 16, 0, (Decimal("10.5"), 42, 15)
+    )
+    assert "r.global_sector_rank > (" in query
+    assert "company_id = $7" in query
+    assert "LIMIT $8 OFFSET $9" in query
+    assert params[5:] == ["半導體業", 42, 16, 0]
+
+    # 同時回傳總筆數
+    query, params = AdvancedSearch.build_ranking_lookup_query(
+        "Income_Statements", "revenue", 2024, "quarterly", 4, "半導體業", 16, 0, (Decimal("10.5"), 42, 15), True
+    )
+    assert "COUNT(*) OVER () + $8 AS total_count" in query
+    assert params[5:] == ["半導體業", 42, 15, 16, 0]
+
+
+def test_build_ranking_query():
+    # 一般分頁
+    query, params = AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, None, 15, 15
+    )
+    assert "ORDER BY fr.revenue DESC NULLS LAST, fr.company_id" in query
+    assert "LIMIT $4 OFFSET $5" in query
+    assert params == [2024, "accumulated", 4, 15, 15]
+
+    # 游標分頁：seek 條件與排名接續
+    query, params = AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, "半導體業", 16, 0, (Decimal("10.5"), 42, 15)
+    )
+    assert "(fr.revenue < $5::numeric OR (fr.revenue = $5::numeric AND fr.company_id > $6) OR fr.revenue IS NULL)" in query
+    # 游標數值取自 numeric 的文字表示，不經 float
+    assert "fr.revenue::text AS cursor_value" in query
+    assert "+ $7 as rank" in query
+    assert "LIMIT $8 OFFSET $9" in query
+    assert params == [2024, "accumulated", 4, "半導體業", Decimal("10.5"), 42, 15, 16, 0]
+
+    # 上一頁最後一筆為空值：只剩空值且 company_id 較大的資料
+    query, params = AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, None, 16, 0, (None, 42, 15)
+    )
+    assert "(fr.revenue IS NULL AND fr.company_id > $4)" in query
+    assert params == [2024, "accumulated", 4, 42, 15, 16, 0]
+
+    # 同時回傳總筆數：seek 模式下加回游標排名
+    query, params = AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, None, 15, 0, include_total_count=True
+    )
+    assert "COUNT(*) OVER () as total_count" in query
+    assert params == [2024, "accumulated", 4, 15, 0]
+    query, params = AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, None, 16, 0, (Decimal("10.5"), 42, 15), True
+    )
+    assert "COUNT(*) OVER () + $6 as total_count" in query
+    assert "total_count" not in AdvancedSearch.build_ranking_query(
+        "Income_Statements", "revenue", 2024, "accumulated", 4, None, 15
+    )[0]
+
+
+def test_ranking_cursor_round_trip():
+    cursor = AdvancedSearch.encode_ranking_cursor(Decimal("12345678901234567.89"), 42, 15)
+    assert isinstance(cursor, str)
+    assert AdvancedSearch.decode_ranking_cursor(cursor) == (Decimal("12345678901234567.89"), 42, 15)
+
+    # 查詢回傳的 cursor_value 為 numeric 文字，超過 float 精度的數值也能原樣還原
+    cursor = AdvancedSearch.encode_ranking_cursor("1234567890123456.78", 42, 15)
+    assert AdvancedSearch.decode_ranking_cursor(cursor)[0] == Decimal("1234567890123456.78")
+
+    cursor = AdvancedSearch.encode_ranking_cursor(None, 7, 30)
+    assert AdvancedSearch.decode_ranking_cursor(cursor) == (None, 7, 30)
+
+    for invalid in ["", "not-a-cursor", "e30", AdvancedSearch.encode_ranking_cursor("NaN", 1, 1)]:
+        with pytest.raises(ValueError):
+            AdvancedSearch.decode_ranking_cursor(invalid)
+
+
+class FakeRankingStatement:
+    def __init__(self, conn, query):
+        self.conn = conn
+        self.query = query
+
+    async def fetch(self, *args):
+        self.conn.queries.append(self.query)
+        return []
+
+    async def fetchval(self, *args):
+        self.conn.queries.append(self.query)
+        return self.conn.store_has_period
+
+
+class FakeRankingConnection:
+    def __init__(self, store_has_period):
+        self.store_has_period = store_has_period
+        self.queries = []
+
+    async def prepare(self, query):
+        return FakeRankingStatement(self, query)
+
+
+@pytest.mark.parametrize("store_has_period, live_queried", [(True, False), (False, True)])
+def test_empty_store_page_only_falls_back_when_period_missing(monkeypatch, store_has_period, live_queried):
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api import advanced_search
+    from module.response_cache import response_cache
+
+    conn = FakeRankingConnection(store_has_period)
+
+    @asynccontextmanager
+    async def get_read_connection():
+        yield conn
+
+    monkeypatch.setattr(advanced_search.postgresql_pool, "get_read_connection", get_read_connection)
+    response_cache.invalidate()
+    app = FastAPI()
+    app.include_router(advanced_search.router)
+    params = {"ranking_type": "revenue", "year": 2024, "report_type": "quarterly", "quarter": 4, "page": 30}
+    response = TestClient(app).get("/api/advanced_search/ranking", params=params)
+    assert response.status_code == 404
+    # 排名表已有此期間時，最後一頁之後的空結果不需再以即時排序查詢
+    assert any(f"FROM {AdvancedSearch.RANKING_STORE_TABLE} AS r" in query for query in conn.queries)
+    assert any("ROW_NUMBER() OVER" in query for query in conn.queries) is live_queried
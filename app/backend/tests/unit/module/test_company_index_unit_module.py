@@ -0,0 +1,121 @@
+# tests/unit/module/test_company_index_unit_module.py
+
+import asyncio
+from contextlib import asynccontextmanager
+import module.company_index as company_index_module
+from module.company_index import CompanyIndex
+
+
+COMPANIES = [
+    {"company_id": 1, "stock_symbol": "2330", "company_name": "台積電", "sector_name": "半導體業", "country_name": "Taiwan"},
+    {"company_id": 2, "stock_symbol": "2317", "company_name": "鴻海", "sector_name": "其他電子業", "country_name": "Taiwan"}
+]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.fetch_count = 0
+        self.fetchrow_params = []
+
+    async def fetch(self, query):
+        self.fetch_count += 1
+        return COMPANIES
+
+    async def fetchrow(self, query, *params):
+        self.fetchrow_params.append(params)
+        if params[0] == "2454":
+            return {"company_id": 3, "stock_symbol": "2454", "company_name": "聯發科", "sector_name": "半導體業", "country_name": "Taiwan"}
+        return None
+
+
+def use_fake_pool(monkeypatch):
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    monkeypatch.setattr(company_index_module.postgresql_pool, "get_read_connection", get_connection)
+    return conn
+
+
+def test_resolve_loads_once_and_serves_from_memory(monkeypatch):
+    conn = use_fake_pool(monkeypatch)
+    index = CompanyIndex(refresh_interval=0)
+
+    async def run():
+        first = await index.resolve("2330", "Taiwan")
+        second = await index.resolve("2317", "Taiwan")
+        by_symbol = await index.resolve_symbol("2330")
+        return first, second, by_symbol
+
+    first, second, by_symbol = asyncio.run(run())
+    assert first["company_id"] == 1 and first["sector_name"] == "半導體業"
+    assert second["company_id"] == 2
+    assert by_symbol is first
+    assert conn.fetch_count == 1
+    stats = index.stats()
+    assert stats["size"] == 2
+    assert stats["refresh_count"] == 1
+    assert stats["last_refresh_ms"] is not None
+    assert stats["hits"] == 3
+
+
+def test_resolve_miss_falls_back_to_single_lookup(monkeypatch):
+    conn = use_fake_pool(monkeypatch)
+    index = CompanyIndex(refresh_interval=0)
+
+    async def run():
+        new_company = await index.resolve("2454", "Taiwan")
+        cached = await index.resolve("2454", "Taiwan")
+        missing = await index.resolve("9999", "Taiwan")
+        return new_company, cached, missing
+
+    new_company, cached, missing = asyncio.run(run())
+    # 兩次重建之間新增的公司以單筆查詢補進索引
+    assert new_company["company_id"] == 3
+    assert cached is new_company
+    assert missing is None
+    assert conn.fetchrow_params == [("2454", "Taiwan"), ("9999", "Taiwan")]
+    assert index.stats()["size"] == 3
+    assert index.stats()["misses"] == 2
+
+
+def test_missing_symbols_are_cached_until_ttl_or_refresh(monkeypatch):
+    conn = use_fake_pool(monkeypatch)
+    now = [0.0]
+    index = CompanyIndex(refresh_interval=0, miss_ttl=60, clock=lambda: now[0])
+
+    async def resolve_missing():
+        return await index.resolve_symbol("9999")
+
+    assert asyncio.run(resolve_missing()) is None
+    assert asyncio.run(resolve_missing()) is None
+    # miss_ttl 內不重複查詢資料庫
+    assert conn.fetchrow_params == [("9999",)]
+    assert index.stats()["cached_misses"] == 1
+
+    now[0] = 61
+    asyncio.run(resolve_missing())
+    assert len(conn.fetchrow_params) == 2
+
+    # 重建索引時清除
+    asyncio.run(index.refresh())
+    asyncio.run(resolve_missing())
+    assert len(conn.fetchrow_params) == 3
+
+
+def test_concurrent_lookups_do_not_duplicate_entries(monkeypatch):
+    use_fake_pool(monkeypatch)
+    index = CompanyIndex(refresh_interval=0)
+
+    async def run():
+        await index._ensure_loaded()
+        # 兩個請求同時查詢索引中沒有的公司
+        await asyncio.gather(
+            index._lookup("c.stock_symbol = $1", "2454"),
+            index._lookup("c.stock_symbol = $1", "2454")
+        )
+
+    asyncio.run(run())
+    assert [company["company_id"] for company in index._by_symbol["2454"]] == [3]
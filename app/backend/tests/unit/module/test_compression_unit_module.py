@@ -0,0 +1,61 @@
+# tests/unit/module/test_compression_unit_module.py
+
+import gzip
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from module.compression import CompressionMiddleware
+
+
+def create_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return {"data": ["x" * 50] * 20}
+
+    @app.get("/small")
+    async def small():
+        return {"data": "x"}
+
+    @app.get("/image")
+    async def image():
+        return PlainTextResponse("x" * 500, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(3):
+                yield f'{{"row": {i}}}\n'.encode()
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_compresses_large_text_responses_only():
+    client = create_client()
+    headers = {"Accept-Encoding": "gzip"}
+    large = client.get("/large", headers=headers)
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert large.json() == {"data": ["x" * 50] * 20}
+    assert int(large.headers["content-length"]) < 1000
+
+    assert "content-encoding" not in client.get("/small", headers=headers).headers
+    assert "content-encoding" not in client.get("/image", headers=headers).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streaming_response_is_compressed_per_chunk():
+    client = create_client()
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines() == ['{"row": 0}', '{"row": 1}', '{"row": 2}']
+
+
+def test_choose_encoding():
+    assert CompressionMiddleware.choose_encoding("gzip;q=0, deflate") is None
+    assert CompressionMiddleware.choose_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert gzip.decompress(gzip.compress(b"ok")) == b"ok"
@@ -0,0 +1,81 @@
+# tests/unit/module/test_conditional_get_unit_module.py
+
+import re
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from module.conditional_get import ConditionalGetMiddleware
+from module.json_response import FastJSONResponse
+from module.data_version import DataVersion, FINANCIAL_DATASETS
+
+
+def create_client(versions):
+    app = FastAPI()
+    calls = []
+    app.add_middleware(
+        ConditionalGetMiddleware,
+        routes=[(re.compile(r"^/api/report$"), FINANCIAL_DATASETS)],
+        versions=versions
+    )
+
+    @app.get("/api/report")
+    async def report(symbol: str):
+        calls.append(symbol)
+        if symbol == "missing":
+            return FastJSONResponse(status_code=404, content={"message": "not found"})
+        return {"symbol": symbol}
+
+    @app.get("/api/other")
+    async def other():
+        return {"ok": True}
+
+    return TestClient(app), calls
+
+
+def test_not_modified_until_data_version_changes():
+    versions = DataVersion(clock=lambda: 1700000000)
+    client, calls = create_client(versions)
+
+    first = client.get("/api/report?symbol=2330")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/api/report?symbol=2330", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    # 304 不執行 handler
+    assert calls == ["2330"]
+
+    # 不同參數的 ETag 不同
+    assert client.get("/api/report?symbol=2317").headers["etag"] != etag
+
+    # 載入腳本遞增版本 (LISTEN 收到通知) 後 ETag 改變
+    versions.apply("Income_Statements", 1)
+    refreshed = client.get("/api/report?symbol=2330", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+
+
+def test_error_and_unlisted_routes_have_no_etag():
+    client, _ = create_client(DataVersion())
+    assert "etag" not in client.get("/api/report?symbol=missing").headers
+    assert "etag" not in client.get("/api/other").headers
+
+
+def test_sector_list_etag_follows_sectors_version():
+    versions = DataVersion(clock=lambda: 1700000000)
+    middleware = ConditionalGetMiddleware(None, versions=versions)
+    datasets = middleware.datasets_for("/api/sector/list")
+    etag = middleware.make_etag(datasets, "/api/sector/list", b"")
+    # insert_sectors 新增產業後遞增 Sectors
+    versions.apply("Sectors", 1)
+    assert middleware.make_etag(datasets, "/api/sector/list", b"") != etag
+
+
+def test_etag_changes_with_build_id():
+    versions = DataVersion(clock=lambda: 1700000000)
+    versions.apply("Income_Statements", 3)
+    datasets = ("Income_Statements",)
+    old = ConditionalGetMiddleware(None, versions=versions, build_id="v1").make_etag(datasets, "/api/report", b"")
+    new = ConditionalGetMiddleware(None, versions=versions, build_id="v2").make_etag(datasets, "/api/report", b"")
+    # 新部署改變回應格式時，舊版本的 ETag 不會得到 304
+    assert old != new
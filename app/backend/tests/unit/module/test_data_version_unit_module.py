@@ -0,0 +1,62 @@
+# tests/unit/module/test_data_version_unit_module.py
+
+import asyncio
+from contextlib import asynccontextmanager
+import module.data_version as data_version_module
+from module.data_version import DataVersion
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch(self, query):
+        return self.rows
+
+
+def use_fake_pool(monkeypatch, rows):
+    conn = FakeConnection(rows)
+
+    @asynccontextmanager
+    async def get_connection():
+        yield conn
+
+    monkeypatch.setattr(data_version_module.postgresql_pool, "get_connection", get_connection)
+    return conn
+
+
+def test_refresh_and_notifications_trigger_listeners(monkeypatch):
+    conn = use_fake_pool(monkeypatch, [{"dataset": "Income_Statements", "version": 3}])
+    versions = DataVersion(clock=lambda: 1700000000)
+    changes = []
+    listener = lambda dataset, version: changes.append((dataset, version))
+    versions.add_listener(listener)
+    # lifespan 重複執行時不會重複註冊
+    versions.add_listener(listener)
+
+    # 尚未載入時以 worker 啟動時間為前綴
+    assert versions.get("Income_Statements") == "1700000000000.0.0"
+    asyncio.run(versions.refresh())
+    # 載入後版本只由資料庫決定，各 worker 的戳記相同
+    assert versions.stamp(["Income_Statements", "Companies"]) == "Income_Statements=3;Companies=0"
+    # 第一次載入只記錄目前版本，不清除快取 (不通知 listener)
+    assert changes == []
+
+    versions._on_notify(None, 1, "data_version", "Income_Statements:4")
+    versions._on_notify(None, 1, "data_version", "Income_Statements:4")
+    # 定期讀取到的舊版本不會回退
+    asyncio.run(versions.refresh())
+    assert versions.get("Income_Statements") == "4"
+    assert changes == [("Income_Statements", 4)]
+    assert versions.stats()["notifications"] == 2
+
+    conn.rows = [{"dataset": "Income_Statements", "version": 4}, {"dataset": "Companies", "version": 1}]
+    assert asyncio.run(versions.refresh()) == 1
+    assert changes[-1] == ("Companies", 1)
+
+
+def test_local_bump_changes_stamp():
+    versions = DataVersion(clock=lambda: 1700000000)
+    before = versions.stamp(["Balance_Sheets"])
+    versions.bump()
+    assert versions.stamp(["Balance_Sheets"]) != before
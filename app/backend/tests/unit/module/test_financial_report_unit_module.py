@@ -0,0 +1,62 @@
+# tests/unit/module/test_financial_report_unit_module.py
+
+import pytest
+from fastapi import HTTPException
+from module.financial_report import Financial_report
+
+
+def test_parse_columns():
+    assert Financial_report.parse_columns("Income_Statements", "revenue, net_income,revenue,") == ["revenue", "net_income"]
+    assert Financial_report.parse_columns("Cash_Flow_Statements", "free_cash_flow") == ["free_cash_flow"]
+
+    # 其他財報表的欄位、識別欄位與 SQL 片段都不允許
+    for invalid in ["total_assets", "company_id", "revenue;DROP TABLE users", ",", ""]:
+        with pytest.raises(HTTPException) as exc_info:
+            Financial_report.parse_columns("Income_Statements", invalid)
+        assert exc_info.value.status_code == 400
+
+
+def test_build_report_query():
+    query, params = Financial_report.build_report_query("Income_Statements", 7, "quarterly")
+    assert "SELECT *" in query
+    assert "FROM Income_Statements" in query
+    assert "JOIN" not in query
+    assert "year >=" not in query
+    assert params == [7, "quarterly"]
+
+    query, params = Financial_report.build_report_query(
+        "Income_Statements", 7, "quarterly", ["revenue", "net_income"]
+    )
+    assert "SELECT year, quarter, report_type, original_currency, revenue, net_income" in query
+    assert "WHERE company_id = $1 AND report_type = $2" in query
+    assert "ORDER BY year DESC, quarter DESC" in query
+
+
+def test_build_report_query_year_range():
+    query, params = Financial_report.build_report_query(
+        "Balance_Sheets", 7, "quarterly", None, 2020, 2024
+    )
+    assert "year >= $3 AND year <= $4" in query
+    assert params == [7, "quarterly", 2020, 2024]
+
+    # 只指定結束年度
+    query, params = Financial_report.build_report_query(
+        "Balance_Sheets", 7, "quarterly", to_year=2024
+    )
+    assert "year <= $3" in query
+    assert params == [7, "quarterly", 2024]
+
+
+def test_fields_and_columns_conflict():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api import financial_report
+
+    app = FastAPI()
+    app.include_router(financial_report.router)
+    params = {
+        "stock_symbol": "2330", "country": "tw", "report_type": "income_statements",
+        "report_period": "quarterly", "fields": "revenue", "columns": "net_income"
+    }
+    response = TestClient(app).get("/api/financial_report", params=params)
+    assert response.status_code == 400
@@ -0,0 +1,51 @@
+# tests/unit/module/test_json_response_unit_module.py
+
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+import module.json_response as json_response
+from module.json_response import FastJSONResponse
+
+
+CONTENT = {
+    "data": [{"year": 2024, "revenue": 1234.5, "sector_name": "半導體業", "eps": None}],
+    "status": "ok"
+}
+
+
+def test_render_matches_stdlib_json_response():
+    assert FastJSONResponse(content=CONTENT).body == JSONResponse(content=CONTENT).body
+
+
+def test_render_fallback_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_response, "orjson", None)
+    assert FastJSONResponse(content=CONTENT).body == JSONResponse(content=CONTENT).body
+
+
+def test_non_finite_floats_render_as_null_with_and_without_orjson(monkeypatch):
+    content = {"data": [{"pe": float("nan"), "growth": float("inf"), "value": Decimal("NaN")}], "eps": -float("inf")}
+    expected = b'{"data":[{"pe":null,"growth":null,"value":null}],"eps":null}'
+    assert FastJSONResponse(content=content).body == expected
+    monkeypatch.setattr(json_response, "orjson", None)
+    assert FastJSONResponse(content=content).body == expected
+
+
+def test_render_extra_types(monkeypatch):
+    oid = ObjectId("64b7f0c2a1b2c3d4e5f60718")
+    content = {
+        "_id": oid,
+        "value": Decimal("10.50"),
+        "publishAt": datetime(2024, 5, 1, 8, 30),
+        "date": date(2024, 5, 1)
+    }
+    expected = {
+        "_id": "64b7f0c2a1b2c3d4e5f60718",
+        "value": 10.5,
+        "publishAt": "2024-05-01T08:30:00",
+        "date": "2024-05-01"
+    }
+    assert json.loads(FastJSONResponse(content=content).body) == expected
+    monkeypatch.setattr(json_response, "orjson", None)
+    assert json.loads(FastJSONResponse(content=content).body) == expected
@@ -0,0 +1,54 @@
+# tests/unit/module/test_jwt_unit_module.py
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from module import jwt as jwt_module
+from module.jwt import TokenCache, JWT_token_make, decode_jwt, get_current_user
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(jwt_module, "JWT_SECRET_KEY", "test-secret")
+    monkeypatch.setattr(jwt_module, "token_cache", TokenCache(maxsize=2))
+    return jwt_module
+
+
+def test_decode_jwt_caches_verified_tokens(secret):
+    token = JWT_token_make(1, "user", "a@b.com", "user", "active")
+    payload = decode_jwt(token)
+    assert payload["user_id"] == 1
+    payload["user_id"] = 99
+    # 第二次由快取回應，且不受呼叫端修改影響
+    assert decode_jwt(token)["user_id"] == 1
+    stats = secret.token_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["verify_time"]["count"] == 2
+
+
+def test_invalid_tokens_are_not_cached(secret):
+    assert decode_jwt("not-a-token") is None
+    assert decode_jwt("not-a-token") is None
+    assert secret.token_cache.stats()["size"] == 0
+
+
+def test_cache_entries_expire_at_token_exp():
+    now = [1000.0]
+    cache = TokenCache(maxsize=2, clock=lambda: now[0])
+    cache.set(b"a", {"exp": 1010})
+    cache.set(b"b", {"user_id": 1})
+    assert cache.get(b"a") == {"exp": 1010}
+    # 沒有 exp 的 token 不快取
+    assert cache.get(b"b") is None
+    now[0] = 1010
+    assert cache.get(b"a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_get_current_user_dependency(secret):
+    token = JWT_token_make(1, "user", "a@b.com", "user", "active")
+    assert asyncio.run(get_current_user(token))["email"] == "a@b.com"
+    for bad, detail in [(None, "Missing token"), ("bad", "Invalid token")]:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(get_current_user(bad))
+        assert exc.value.status_code == 401 and exc.value.detail == detail
@@ -0,0 +1,25 @@
+# tests/unit/module/test_metrics_unit_module.py
+
+from module.metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in [0.5, 1, 5, 50, 500]:
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == [(1, 2), (10, 3), (100, 4), (float('inf'), 5)]
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["max_ms"] == 500
+    assert snapshot["buckets"] == {"1": 2, "10": 3, "100": 4, "+Inf": 5}
+
+
+def test_histogram_quantile():
+    histogram = Histogram(buckets=(1, 10, 100))
+    assert histogram.quantile(0.5) is None
+    for value in [2] * 90 + [20] * 9 + [300]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(0.95) == 100
+    # 落在 +Inf 區間時以最大值估計
+    assert histogram.quantile(1.0) == 300
@@ -0,0 +1,36 @@
+# tests/unit/module/test_news_unit_module.py
+
+import pytest
+from bson import ObjectId
+from module.news import News
+
+
+def test_cursor_round_trip_and_next_cursor():
+    oid = ObjectId()
+    results = [
+        {"publishAt": 1700000300, "_id": ObjectId()},
+        {"publishAt": 1700000200, "_id": oid},
+        {"publishAt": 1700000100, "_id": ObjectId()}
+    ]
+    # 多取的第三筆只用來判斷是否有下一頁，游標指向本頁最後一筆
+    cursor = News.next_cursor(results, 2)
+    assert cursor == f"1700000200,{oid}"
+    assert News.decode_cursor(cursor) == (1700000200, oid)
+    assert News.next_cursor(results, 3) is None
+
+
+def test_invalid_cursor():
+    for before in ["", "1700000200", "abc,123", f"1700000200,not-an-object-id"]:
+        with pytest.raises(ValueError):
+            News.decode_cursor(before)
+
+
+def test_apply_before_keeps_existing_conditions():
+    oid = ObjectId()
+    seek = News.apply_before({}, (1700000200, oid))
+    assert seek["publishAt"] == {"$lte": 1700000200}
+    assert seek["$or"] == [{"publishAt": {"$lt": 1700000200}}, {"_id": {"$lt": oid}}]
+
+    query = {"$or": [{"title": {"$regex": "台積電"}}], "publishAt": {"$gte": 1, "$lte": 2000000000}}
+    combined = News.apply_before(query, (1700000200, oid))
+    assert combined == {"$and": [query, seek]}
@@ -0,0 +1,73 @@
+# tests/unit/module/test_password_hasher_unit_module.py
+
+import asyncio
+import bcrypt
+import pytest
+from fastapi import HTTPException
+from module.password_hasher import PasswordHasher
+
+
+def make_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def test_verify_caches_only_successful_credentials():
+    hasher = PasswordHasher(workers=1, rounds=4)
+    stored_hash = make_hash("secret", 4)
+
+    async def run():
+        assert await hasher.verify("secret", stored_hash) is True
+        assert await hasher.verify("secret", stored_hash) is True
+        assert await hasher.verify("wrong", stored_hash) is False
+        assert await hasher.verify("wrong", stored_hash) is False
+
+    asyncio.run(run())
+    hasher.close()
+    # 成功的第二次由快取回應，錯誤密碼每次都重新計算
+    assert hasher.hash_time.count == 3
+    assert hasher.stats()["verified_cache"]["hits"] == 1
+
+
+def test_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=0, rounds=4, cache_ttl=0)
+    stored_hash = make_hash("secret", 4)
+
+    async def run():
+        return await asyncio.gather(
+            hasher.verify("secret", stored_hash),
+            hasher.verify("other", stored_hash),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    hasher.close()
+    assert results[0] is True
+    assert isinstance(results[1], HTTPException) and results[1].status_code == 503
+    assert hasher.rejected == 1
+    assert hasher.pending == 0
+
+
+def test_concurrent_verifications_share_one_hash():
+    hasher = PasswordHasher(workers=1, max_queue=0, rounds=4, cache_ttl=0)
+    stored_hash = make_hash("secret", 4)
+
+    async def run():
+        return await asyncio.gather(*[hasher.verify("secret", stored_hash) for _ in range(5)])
+
+    results = asyncio.run(run())
+    hasher.close()
+    assert results == [True] * 5
+    assert hasher.hash_time.count == 1
+    assert hasher.rejected == 0
+
+
+def test_needs_upgrade_and_hash_use_configured_rounds():
+    hasher = PasswordHasher(workers=1, rounds=5)
+    assert hasher.needs_upgrade(make_hash("secret", 4)) is True
+    assert hasher.needs_upgrade(make_hash("secret", 5)) is False
+    assert hasher.needs_upgrade("not-a-bcrypt-hash") is False
+
+    new_hash = asyncio.run(hasher.hash("secret"))
+    hasher.close()
+    assert new_hash.startswith("$2b$05$")
+    assert bcrypt.checkpw(b"secret", new_hash.encode("utf-8"))
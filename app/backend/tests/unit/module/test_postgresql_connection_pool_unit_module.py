@@ -0,0 +1,194 @@
+# tests/unit/module/test_postgresql_connection_pool_unit_module.py
+
+import asyncio
+from decimal import Decimal
+from module.postgresql_connection_pool import AsyncPostgreSQLConnectionPool, ReplicaPool, TimedConnection
+from module.statement_registry import StatementRegistry
+
+
+class FakeConnection:
+    def __init__(self):
+        self.codecs = {}
+
+    async def set_type_codec(self, typename, *, encoder, decoder, schema, format):
+        self.codecs[typename] = {"encoder": encoder, "decoder": decoder, "schema": schema, "format": format}
+
+    async def prepare(self, query):
+        return query
+
+
+def test_init_connection_registers_numeric_codec():
+    conn = FakeConnection()
+    asyncio.run(AsyncPostgreSQLConnectionPool.init_connection(conn))
+    codec = conn.codecs["numeric"]
+    assert codec["schema"] == "pg_catalog"
+    assert codec["format"] == "text"
+
+    # 解碼：numeric 文字直接轉為 float
+    assert codec["decoder"]("1234.56") == 1234.56
+    assert isinstance(codec["decoder"]("-0.50"), float)
+    assert codec["decoder"]("12345678901234567890.12") == float(Decimal("12345678901234567890.12"))
+
+    # 編碼：float、Decimal 與 int 參數皆可作為 numeric 傳入
+    assert codec["encoder"](85.5) == "85.5"
+    assert codec["encoder"](Decimal("10.50")) == "10.50"
+    assert codec["encoder"](3) == "3"
+
+
+class FakePool:
+    def __init__(self):
+        self.idle = 3
+        self.released = []
+
+    async def acquire(self, timeout=None):
+        self.idle -= 1
+        return "conn"
+
+    async def release(self, conn):
+        self.idle += 1
+        self.released.append(conn)
+
+    def get_size(self):
+        return 5
+
+    def get_idle_size(self):
+        return self.idle
+
+
+def test_get_connection_records_acquire_wait_and_usage(monkeypatch):
+    pool = AsyncPostgreSQLConnectionPool()
+    fake_pool = FakePool()
+    monkeypatch.setattr(pool, "_pool", fake_pool)
+    before = pool.acquire_wait.count
+
+    async def run():
+        async with pool.get_connection() as conn:
+            return conn, pool.stats()
+
+    conn, stats = asyncio.run(run())
+    assert conn.untimed == "conn"
+    assert fake_pool.released == ["conn"]
+    assert stats["initialized"] is True
+    assert stats["size"] == 5
+    assert stats["in_use"] == 3
+    assert stats["idle"] == 2
+    assert stats["waiting"] == 0
+    assert pool.acquire_wait.count == before + 1
+
+
+def make_replica(name, lag_seconds, healthy=True):
+    replica = ReplicaPool(f"postgresql://user:secret@{name}:5432/stock_insight")
+    replica.pool = FakePool()
+    replica.healthy = healthy
+    replica.lag_seconds = lag_seconds
+    return replica
+
+
+def test_choose_replica_round_robin_and_lag_fallback(monkeypatch):
+    pool = AsyncPostgreSQLConnectionPool()
+    replica_a = make_replica("replica-a", 0)
+    replica_b = make_replica("replica-b", 0.5)
+    lagging = make_replica("replica-c", 60)
+    down = make_replica("replica-d", 0, healthy=False)
+    monkeypatch.setattr(pool, "replicas", [replica_a, lagging, replica_b, down])
+    monkeypatch.setattr(pool, "_replica_index", 0)
+
+    chosen = [pool._choose_replica() for _ in range(4)]
+    assert chosen == [replica_a, replica_b, replica_a, replica_b]
+    assert replica_a.stats()["name"] == "replica-a:5432"
+
+    # 所有副本都延遲過大或無法使用時改走主庫
+    monkeypatch.setattr(pool, "replicas", [lagging, down])
+    assert pool._choose_replica() is None
+
+
+def test_read_connection_falls_back_to_primary(monkeypatch):
+    pool = AsyncPostgreSQLConnectionPool()
+    monkeypatch.setattr(pool, "_pool", FakePool())
+    replica = make_replica("replica-a", 0)
+
+    async def refuse(timeout=None):
+        raise ConnectionRefusedError("replica down")
+
+    monkeypatch.setattr(replica.pool, "acquire", refuse)
+    monkeypatch.setattr(pool, "replicas", [replica])
+    primary_reads = pool.primary_reads
+
+    async def run():
+        async with pool.get_read_connection() as conn:
+            return conn
+
+    assert asyncio.run(run()).untimed == "conn"
+    assert pool.primary_reads == primary_reads + 1
+    assert replica.healthy is False
+    assert replica.reads == 0
+
+
+def test_reads_pinned_to_primary_after_data_version_change(monkeypatch):
+    pool = AsyncPostgreSQLConnectionPool()
+    monkeypatch.setattr(pool, "_pool", FakePool())
+    replica = make_replica("replica-a", 0)
+    monkeypatch.setattr(pool, "replicas", [replica])
+    monkeypatch.setattr(pool, "_primary_until", 0.0)
+
+    async def read():
+        async with pool.get_read_connection() as conn:
+            return conn
+
+    # 資料剛更新，副本可能尚未套用，讀取走主庫
+    pool.pin_reads_to_primary(60)
+    primary_reads = pool.primary_reads
+    asyncio.run(read())
+    assert pool.primary_reads == primary_reads + 1
+    assert replica.reads == 0
+    assert pool.stats()["primary_pinned_seconds"] > 0
+
+    # 期間過後恢復分流到副本
+    monkeypatch.setattr(pool, "_primary_until", 0.0)
+    asyncio.run(read())
+    assert replica.reads == 1
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.rows:
+            raise StopAsyncIteration
+        return self.rows.pop(0)
+
+
+class FakeQueryConnection:
+    async def fetchrow(self, query, *args):
+        return {"id": args[0]}
+
+    def cursor(self, query, *args, prefetch=None):
+        return FakeCursor([{"year": 2024}, {"year": 2023}])
+
+
+def test_timed_connection_records_ad_hoc_and_cursor_queries(monkeypatch):
+    import module.postgresql_connection_pool as pool_module
+    registry = StatementRegistry(prepare_on_init=False)
+    observed = []
+    registry.add_listener(lambda key, query, args, elapsed_ms, error: observed.append((query, args, error)))
+    monkeypatch.setattr(pool_module, "statement_registry", registry)
+    conn = TimedConnection(FakeQueryConnection())
+
+    async def run():
+        row = await conn.fetchrow("SELECT id FROM users WHERE email = $1", 7)
+        rows = [record async for record in conn.cursor("SELECT year FROM Balance_Sheets", prefetch=100)]
+        return row, rows
+
+    row, rows = asyncio.run(run())
+    assert row == {"id": 7}
+    assert len(rows) == 2
+    # 未經 statement_registry 的查詢與串流 cursor 也會記錄，cursor 迭代完成時記錄一次
+    assert observed == [
+        ("SELECT id FROM users WHERE email = $1", (7,), None),
+        ("SELECT year FROM Balance_Sheets", (), None)
+    ]
+    assert registry.query_stats()["unregistered"]["count"] == 2
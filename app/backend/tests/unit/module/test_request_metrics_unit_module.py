@@ -0,0 +1,53 @@
+# tests/unit/module/test_request_metrics_unit_module.py
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from module.json_response import FastJSONResponse
+from module.request_metrics import RequestMetrics, RequestTimingMiddleware, record_phase, OTHER_ROUTE
+
+
+def build_client():
+    metrics = RequestMetrics()
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: int):
+        record_phase("db_acquire", 2.0)
+        record_phase("db_query", 3.0)
+        record_phase("db_query", 4.0)
+        return FastJSONResponse(content={"data": {"id": item_id}})
+
+    app.add_middleware(RequestTimingMiddleware, metrics=metrics)
+    return TestClient(app), metrics
+
+
+def test_records_per_route_template_and_phases():
+    client, metrics = build_client()
+    assert client.get("/api/items/1").status_code == 200
+    assert client.get("/api/items/2").status_code == 200
+    assert client.get("/missing").status_code == 404
+
+    stats = metrics.stats()
+    route = stats["GET /api/items/{item_id}"]
+    assert route["latency"]["count"] == 2
+    assert route["statuses"] == {"200": 2}
+    assert route["phases"]["db_query"]["count"] == 2
+    # 同一請求中多次查詢累加為一筆
+    assert route["phases"]["db_query"]["sum_ms"] == 14.0
+    assert route["phases"]["serialize"]["count"] == 2
+    assert route["response_bytes"]["max"] == len(b'{"data":{"id":1}}')
+    assert stats[f"GET {OTHER_ROUTE}"]["statuses"] == {"404": 1}
+
+
+def test_record_phase_outside_request_is_ignored():
+    record_phase("db_query", 1.0)
+
+
+def test_render_prometheus():
+    client, metrics = build_client()
+    client.get("/api/items/1")
+    text = "\n".join(metrics.render_prometheus(pid=1))
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_count{pid="1",method="GET",route="/api/items/{item_id}"} 1' in text
+    assert 'http_request_phase_duration_seconds_bucket{pid="1",method="GET",route="/api/items/{item_id}",phase="db_acquire",le="0.0025"} 1' in text
+    assert 'http_requests_total{pid="1",method="GET",route="/api/items/{item_id}",status="200"} 1' in text
@@ -0,0 +1,66 @@
+# tests/unit/module/test_response_cache_unit_module.py
+
+from module.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_make_key_ignores_param_order():
+    key_a = ResponseCache.make_key("ranking", year=2024, quarter=4, sector_name=None)
+    key_b = ResponseCache.make_key("ranking", sector_name=None, quarter=4, year=2024)
+    assert key_a == key_b
+    assert key_a != ResponseCache.make_key("count", year=2024, quarter=4, sector_name=None)
+
+
+def test_get_set_and_counters():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    assert cache.get(("a",)) is None
+    cache.set(("a",), {"data": 1})
+    assert cache.get(("a",)) == {"data": 1}
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 1
+
+
+def test_ttl_expiration():
+    clock = FakeClock()
+    cache = ResponseCache(maxsize=10, ttl=60, clock=clock)
+    cache.set(("a",), 1)
+    clock.now = 59
+    assert cache.get(("a",)) == 1
+    clock.now = 60
+    assert cache.get(("a",)) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set(("a",), 1)
+    cache.set(("b",), 2)
+    # 讀取 a 後，b 成為最久未使用
+    cache.get(("a",))
+    cache.set(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.get(("c",)) == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_by_namespace():
+    cache = ResponseCache(maxsize=10, ttl=60)
+    cache.set(ResponseCache.make_key("ranking", page=1), 1)
+    cache.set(ResponseCache.make_key("ranking", page=2), 2)
+    cache.set(ResponseCache.make_key("sector_list"), 3)
+    assert cache.invalidate("ranking") == 2
+    assert cache.get(ResponseCache.make_key("sector_list")) == 3
+    assert cache.invalidate() == 1
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,54 @@
+# tests/unit/module/test_search_tokens_unit_module.py
+
+from module.search_tokens import SearchTokens
+
+
+def test_tokenize_bigrams_and_words():
+    tokens = SearchTokens.tokenize("台積電 TSMC，AI伺服器 台")
+    assert tokens == ["台積", "積電", "tsmc", "ai", "伺服", "服器", "台"]
+    assert SearchTokens.tokenize(None) == []
+
+
+def test_keyword_filter_uses_tokens_then_regex():
+    query = SearchTokens.keyword_filter("台積電(2330)", "search_tokens", ["summary", "source_news.title"])
+    tokens_condition, regex_condition = query["$and"]
+    # 英數字可能只是單字的一部分，只由 regex 比對
+    assert tokens_condition == {"search_tokens": {"$all": ["台積", "積電"]}}
+    # 關鍵字中的 regex 特殊字元以字面比對
+    assert regex_condition["$or"][0] == {"summary": {"$regex": r"台積電\(2330\)", "$options": "i"}}
+
+
+def test_single_cjk_character_falls_back_to_regex():
+    assert SearchTokens.query_tokens("電") == []
+    query = SearchTokens.keyword_filter("電", "search_tokens", ["summary"])
+    assert query == {"$or": [{"summary": {"$regex": "電", "$options": "i"}}]}
+    industry = SearchTokens.industry_filter("半導體")
+    assert industry["$and"][0] == {"industry_tokens": {"$all": ["半導", "導體"]}}
+
+
+def test_news_keyword_filter_matches_stock_fields():
+    query = SearchTokens.keyword_filter("台積電", "search_tokens", SearchTokens.NEWS_KEYWORD_FIELDS)
+    fields = [next(iter(condition)) for condition in query["$and"][1]["$or"]]
+    # 內文只寫代號的新聞可由 market.name 比對到公司名稱
+    assert "market.name" in fields and "content" in fields
+
+
+def test_alphanumeric_prefix_is_not_required_as_token():
+    # 寫入端的 token 為整個單字 (nvidia、2330)，前綴不可列入 $all
+    assert SearchTokens.query_tokens("Nvid") == []
+    query = SearchTokens.keyword_filter("233", "search_tokens", ["summary"])
+    assert query == {"$or": [{"summary": {"$regex": "233", "$options": "i"}}]}
+
+
+def test_terms_filter_matches_any_whitespace_separated_term():
+    query = SearchTokens.terms_filter("台積電  Nvid 台積電", "search_tokens", ["title"])
+    # 每個詞各自比對，不把整串關鍵字當成片語
+    assert query == {"$or": [
+        {"$and": [
+            {"search_tokens": {"$all": ["台積", "積電"]}},
+            {"$or": [{"title": {"$regex": "台積電", "$options": "i"}}]}
+        ]},
+        {"$or": [{"title": {"$regex": "Nvid", "$options": "i"}}]}
+    ]}
+    assert SearchTokens.terms_filter(" 台積電 ", "search_tokens", ["title"]) == \
+        SearchTokens.keyword_filter("台積電", "search_tokens", ["title"])
@@ -0,0 +1,90 @@
+# tests/unit/module/test_slow_query_log_unit_module.py
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import pytest
+from module.slow_query_log import SlowQueryLog
+
+
+class FakeTransaction:
+    def __init__(self, conn, readonly):
+        conn.readonly = readonly
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.readonly = None
+
+    def transaction(self, readonly=False):
+        return FakeTransaction(self, readonly)
+
+    async def execute(self, query):
+        self.executed.append(query)
+
+    async def fetchval(self, query, *args):
+        self.executed.append((query, args))
+        return json.dumps([{"Plan": {"Node Type": "Seq Scan", "Relation Name": "balance_sheets"}}])
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def get_read_connection(self):
+        yield self.conn
+
+
+def test_aggregates_shapes_and_records_slow_queries():
+    log = SlowQueryLog(threshold_ms=100, explain_rate=0, size=2, pool=FakePool())
+    key = ("ranking", "Balance_Sheets", "total_assets")
+    log.observe(key, "SELECT 1", (2024, 4), 10.0)
+    log.observe(key, "SELECT 1", (2024, 3), 150.0)
+    log.observe(None, "SELECT  *\n FROM x", (), 120.0)
+    log.observe(None, "SELECT * FROM x", (), 300.0)
+
+    top = log.top(10, "max")
+    assert [shape["count"] for shape in top] == [2, 2]
+    assert top[0]["shape"].startswith("unregistered:")
+    assert top[1]["shape"] == "ranking:Balance_Sheets:total_assets"
+    assert top[1]["avg_ms"] == 80.0
+    assert top[1]["last_slow_params"] == ["2024", "3"]
+    # ring buffer 只保留最近 2 筆，新到舊
+    assert [entry["duration_ms"] for entry in log.recent()] == [300.0, 120.0]
+    assert log.stats()["slow_queries"] == 3
+    with pytest.raises(ValueError):
+        log.top(10, "median")
+
+
+def test_explain_is_sampled_read_only_and_rate_limited():
+    pool = FakePool()
+    now = [1000.0]
+    log = SlowQueryLog(threshold_ms=100, explain_rate=0.5, explain_cooldown=60, pool=pool,
+                       sample=lambda: 0.1, clock=lambda: now[0])
+    key = ("count", "Cash_Flow_Statements")
+
+    async def run():
+        log.observe(key, "SELECT count(*) FROM cash_flow_statements WHERE year = $1", (2024,), 500.0)
+        await log._explaining
+        # 冷卻時間內同一種語句不再 EXPLAIN
+        log.observe(key, "SELECT count(*) FROM cash_flow_statements WHERE year = $1", (2024,), 500.0)
+        # 非查詢語句不 EXPLAIN
+        log.observe(("refresh",), "UPDATE x SET y = 1", (), 500.0)
+
+    asyncio.run(run())
+    entries = log.recent()
+    assert entries[2]["explain"][0]["Plan"]["Node Type"] == "Seq Scan"
+    assert entries[1]["explain"] is None and entries[0]["explain"] is None
+    assert log.explains == 1
+    assert pool.conn.readonly is True
+    assert pool.conn.executed[0].startswith("SET LOCAL statement_timeout")
+    assert pool.conn.executed[1][0].startswith("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT")
+    assert pool.conn.executed[1][1] == (2024,)
@@ -0,0 +1,93 @@
+# tests/unit/module/test_statement_registry_unit_module.py
+
+import asyncio
+from decimal import Decimal
+from api.advanced_search import AdvancedSearch
+from module.financial_report import Financial_report
+from module.statement_registry import StatementRegistry, statement_registry
+
+
+class FakePreparedStatement:
+    def __init__(self, query):
+        self.query = query
+
+    async def fetch(self, *args):
+        return [("prepared", self.query, args)]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared = []
+        self.fetched = []
+
+    async def prepare(self, query):
+        self.prepared.append(query)
+        return FakePreparedStatement(query)
+
+    async def fetch(self, query, *args):
+        self.fetched.append(query)
+        return [("plain", query, args)]
+
+
+class FakePoolProxy:
+    """模擬 asyncpg PoolConnectionProxy：同一條實際連線每次取得不同的 proxy"""
+
+    def __init__(self, con):
+        self._con = con
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+
+def test_prepare_on_init_and_reuse_per_connection():
+    registry = StatementRegistry()
+    registry.register(("a",), "SELECT 1", eager=True)
+    registry.register(("b",), "SELECT 2")
+    conn = FakeConnection()
+
+    async def run():
+        await registry.prepare_connection(conn)
+        first = await registry.fetch(FakePoolProxy(conn), "SELECT 1")
+        await registry.fetch(FakePoolProxy(conn), "SELECT 2", 7)
+        await registry.fetch(FakePoolProxy(conn), "SELECT 2", 8)
+        plain = await registry.fetch(FakePoolProxy(conn), "SELECT 3")
+        return first, plain
+
+    first, plain = asyncio.run(run())
+    assert first == [("prepared", "SELECT 1", ())]
+    assert plain == [("plain", "SELECT 3", ())]
+    # eager 語句在 init 時 prepare，其他語句在第一次使用時 prepare 一次
+    assert conn.prepared == ["SELECT 1", "SELECT 2"]
+    stats = registry.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["unregistered"] == 1
+    assert stats["prepared_on_init"] == 1
+    assert stats["connections_prepared"] == 1
+
+
+def test_prepare_on_init_disabled():
+    registry = StatementRegistry(prepare_on_init=False)
+    registry.register(("a",), "SELECT 1", eager=True)
+    conn = FakeConnection()
+    asyncio.run(registry.prepare_connection(conn))
+    assert conn.prepared == []
+
+
+def test_builder_queries_are_registered():
+    # 各 builder 以實際參數產生的語句都能在全域登錄表中找到
+    queries = [
+        AdvancedSearch.build_ranking_lookup_query(
+            "Income_Statements", "revenue", 2023, "accumulated", 4, "半導體業", 16, 0, None, False
+        )[0],
+        AdvancedSearch.build_ranking_query(
+            "Balance_Sheets", "total_assets", 2023, "quarterly", 2, None, 16, 0, (Decimal("12.5"), 3, 15), True
+        )[0],
+        AdvancedSearch.build_count_query("Cash_Flow_Statements", 2023, "accumulated", 4, None)[0],
+        Financial_report.build_report_query("Income_Statements", 7, "accumulated", None, 2015)[0]
+    ]
+    for query in queries:
+        assert statement_registry.key_for(query) is not None
+    assert statement_registry.key_for(
+        Financial_report.build_report_query("Income_Statements", 7, "quarterly", ["revenue"])[0]
+    ) is None
@@ -0,0 +1,36 @@
+# tests/unit/module/test_static_assets_unit_module.py
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from module.static_assets import StaticAssets, VersionedStaticFiles
+
+
+def test_html_references_are_versioned_and_cached(tmp_path):
+    css_dir = tmp_path / "css"
+    css_dir.mkdir()
+    (css_dir / "news.css").write_text("body { color: red; }")
+    page = tmp_path / "news.html"
+    page.write_text('<link rel="stylesheet" href="../css/news.css"><script src="https://cdn.example.com/x.js"></script>')
+
+    assets = StaticAssets({"css": css_dir})
+    app = FastAPI()
+    app.mount("/css", VersionedStaticFiles(directory=str(css_dir), assets=assets), name="css")
+
+    @app.get("/news")
+    async def news_page(request: Request):
+        return assets.html_response(request, page)
+
+    client = TestClient(app)
+    html_response = client.get("/news")
+    versioned = f"/css/news.css?v={assets.asset_hash(css_dir / 'news.css')}"
+    assert f'href="{versioned}"' in html_response.text
+    # 外部網址不改寫
+    assert 'src="https://cdn.example.com/x.js"' in html_response.text
+    assert client.get("/news", headers={"If-None-Match": html_response.headers["etag"]}).status_code == 304
+
+    assert "immutable" in client.get(versioned).headers["cache-control"]
+    assert client.get("/css/news.css?v=stale").headers["cache-control"] == "no-cache"
+
+    # 內容變動後 HTML 引用新的 hash
+    (css_dir / "news.css").write_text("body { color: blue; }")
+    assert versioned not in client.get("/news").text
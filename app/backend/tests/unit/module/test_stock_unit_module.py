@@ -0,0 +1,46 @@
+# tests/unit/module/test_stock_unit_module.py
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import stock
+
+
+class FakeStatement:
+    async def fetch(self, *args):
+        return [{"year": 2024, "quarter": 4, "revenue": 1.0}]
+
+
+class FakeConnection:
+    async def prepare(self, query):
+        return FakeStatement()
+
+
+def test_bundle_rankings_require_sector(monkeypatch):
+    company = {"company_id": 1, "stock_symbol": "9999", "country_name": "Taiwan", "sector_name": None}
+
+    async def resolve(stock_symbol, country_name):
+        return company
+
+    async def fetch_stock_rankings(*args):
+        raise AssertionError("沒有產業的公司不應查詢排名")
+
+    @asynccontextmanager
+    async def get_read_connection():
+        yield FakeConnection()
+
+    monkeypatch.setattr(stock.company_index, "resolve", resolve)
+    monkeypatch.setattr(stock.AdvancedSearch, "fetch_stock_rankings", fetch_stock_rankings)
+    monkeypatch.setattr(stock.postgresql_pool, "get_read_connection", get_read_connection)
+    app = FastAPI()
+    app.include_router(stock.router)
+
+    response = TestClient(app).get(
+        "/api/stock/9999/tw/bundle",
+        params={"statements": "income_statements", "ranking_year": 2024, "ranking_report_type": "annual"}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    # 與 stock_ranking 的 404 一致，排名位置回傳 error，財報照常回傳
+    assert "error" in data["rankings"]["income_statement"]
+    assert data["financial_reports"]["income_statements"]["quarterly"][0]["year"] == 2024
@@ -1,6 +1,7 @@
 
 let loadingIndicator = document.getElementById("loading-indicator");
 let page = 1;
+let before = null; // 游標分頁：上一頁回傳的 next_cursor，有值時以游標取下一頁
 let isLoading = false; // Create a label to indicate whether data is loading
 let keyword = "";
 let industry = "";
@@ -40,6 +41,7 @@ function initSearchParamsFromURL() {
     }
     // Default page number
     page = 1;
+    before = null;
 }
 
 // 函式：設定搜尋框的值
@@ -81,13 +83,14 @@ async function loadAllAIAnalysis(){
         isLoading = true; // Start loading data, set isLoading to true
         if (loadingIndicator) loadingIndicator.style.display = "flex"; // Display the loading indicator
         console.log(`fetch startTime:${startTime}, endTime: ${endTime}`)
-        const response = await fetch(`/api/ai_news?keyword=${keyword}&industry=${industry}&is_summary=${is_summary}&start_time=${startTime}&end_time=${endTime}&page=${page}`);
+        const pageParam = before ? `before=${encodeURIComponent(before)}` : `page=${page}`;
+        const response = await fetch(`/api/ai_news?keyword=${keyword}&industry=${industry}&is_summary=${is_summary}&start_time=${startTime}&end_time=${endTime}&${pageParam}`);
         const result = await response.json();
         // 判斷是否還有下一頁資料
-        if (result.nextPage === null || result.data.length === 0) {
+        if (result.next_cursor === null || result.data.length === 0) {
             hasMoreData = false;
         } else {
-            page = result.nextPage;
+            before = result.next_cursor;
         }
         const dataList = result.data;
 
@@ -343,6 +346,7 @@ async function performSearch(){
         endTime = Math.floor(Date.now() / 1000); // If the user clears the date input box, reset it to the current time
     }
     page = 1;
+    before = null;
     hasMoreData = true;
     keyword = input.value;
     while(container.firstChild){
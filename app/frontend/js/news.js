@@ -1,6 +1,7 @@
 
 let loadingIndicator = document.getElementById("loading-indicator");
 let page = 1;
+let before = null; // 游標分頁：上一頁回傳的 next_cursor，有值時以游標取下一頁
 let isLoading = false; // Create a label to indicate whether data is loading
 let keyword = "";
 
@@ -32,6 +33,7 @@ function initSearchParamsFromURL() {
     }
     // Default page number
     page = 1;
+    before = null;
 }
 
 // Function: Set the value of the search box
@@ -59,13 +61,14 @@ async function loadAllNews(){
         if (loadingIndicator) loadingIndicator.style.display = "flex"; // Display the loading indicator
         //Can add a printout of the search time to check
         
-        const response = await fetch(`/api/news?keyword=${keyword}&start_time=${startTime}&end_time=${endTime}&page=${page}`);
+        const pageParam = before ? `before=${encodeURIComponent(before)}` : `page=${page}`;
+        const response = await fetch(`/api/news?keyword=${keyword}&start_time=${startTime}&end_time=${endTime}&${pageParam}`);
         const result = await response.json();
         // Determine whether there is a next page data
-        if (result.nextPage === null || result.data.length === 0) {
+        if (result.next_cursor === null || result.data.length === 0) {
             hasMoreData = false;
         } else {
-            page = result.nextPage;
+            before = result.next_cursor;
         }
         const dataList = result.data;
 
@@ -182,6 +185,7 @@ async function performSearch() {
     }
 
     page = 1; // 搜尋時重置頁碼
+    before = null;
     hasMoreData = true; // 搜尋時重置是否有更多資料
     keyword = input.value; // 更新關鍵字
     
@@ -2,6 +2,11 @@ let myChart = null; // 全域唯一 Chart 實例
 let loadingIndicator = document.getElementById("loading-indicator");
 let stockSymbol = "";
 let country = "tw";
+// 個股頁面的公司資訊、財報與預設排名由 bundle API 一次取得，同一股票只請求一次
+let stockBundlePromise = null;
+let stockBundleKey = "";
+// 排名區塊預設的查詢條件 (年報、第四季)，與 bundle 一起取得
+const BUNDLE_RANKING_DEFAULT = { year: 2024, reportType: 'annual', quarter: 4 };
 
 // 定義財報欄位的中文名稱、顯示順序和固定顏色
 const REPORT_FIELD_MAP = {
@@ -206,6 +211,32 @@ function updateURLParams() {
     history.replaceState({}, '', newUrl);
 }
 
+// 取得個股 bundle (公司資訊、三大財報的季報與累計資料、預設條件的產業排名)
+function loadStockBundle() {
+    const key = `${stockSymbol}/${country}`;
+    if (!stockBundlePromise || stockBundleKey !== key) {
+        stockBundleKey = key;
+        const params = `ranking_year=${BUNDLE_RANKING_DEFAULT.year}&ranking_report_type=${BUNDLE_RANKING_DEFAULT.reportType}&ranking_quarter=${BUNDLE_RANKING_DEFAULT.quarter}`;
+        const promise = fetch(`/api/stock/${encodeURIComponent(stockSymbol)}/${encodeURIComponent(country)}/bundle?${params}`)
+            .then(async response => {
+                const responseData = await response.json();
+                if (!response.ok) {
+                    throw new Error(responseData.detail || '載入股票時發生錯誤，請稍後再試。');
+                }
+                if (!responseData.data) {
+                    throw new Error('回傳資料格式不正確');
+                }
+                return responseData.data;
+            });
+        // 失敗時不保留，下次重新請求
+        promise.catch(() => {
+            if (stockBundlePromise === promise) stockBundlePromise = null;
+        });
+        stockBundlePromise = promise;
+    }
+    return stockBundlePromise;
+}
+
 // 載入股票資訊
 async function loadStockInfo() {
     try {
@@ -214,25 +245,16 @@ async function loadStockInfo() {
         document.getElementById('stock-header').textContent = '';
         document.getElementById('stock-info').textContent = '';
         
-        const response = await fetch(`/api/stock_info?stock_symbol=${stockSymbol}&country=${country}`);
-        
-        if (!response.ok) {
-            const errorData = await response.json();
-            throw new Error(errorData.detail || '載入股票時發生錯誤，請稍後再試。');
-        }
-
-        const responseData = await response.json();
-        if (!responseData.data) {
-            throw new Error('回傳資料格式不正確');
-        }
+        const bundle = await loadStockBundle();
+        const stockInfo = bundle.stock_info;
         
         // 隱藏載入中
         if (loadingIndicator) loadingIndicator.style.display = 'none';
         
         // 顯示股票資訊
-        displayStockInfo(responseData.data);
+        displayStockInfo(stockInfo);
         // 新增：取得公司簡稱查詢新聞
-        const abbreviation = responseData.data.abbreviation;
+        const abbreviation = stockInfo.abbreviation;
         if (abbreviation) {
             window._companyNewsKeyword = abbreviation;
             fetchCompanyNews(abbreviation, 1);
@@ -374,7 +396,6 @@ function displayError(message) {
 
 // 包裝財報查詢/繪圖為 function
 async function loadFinancialReport(stockSymbol, country) {
-    const API_BASE_URL = "/api/financial_report";
     let currentFinancialData = [];
     let currentOriginalCurrency = '';
 
@@ -710,12 +731,11 @@ async function loadFinancialReport(stockSymbol, country) {
             // 年報選項：實際查詢累計資料，但只顯示第四季
             const actualReportPeriod = reportPeriod === 'annual' ? 'accumulated' : reportPeriod;
             
-            const response = await fetch(`${API_BASE_URL}?stock_symbol=${stockSymbol}&country=${country}&report_type=${reportType}&report_period=${actualReportPeriod}`);
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.detail || `HTTP 錯誤：${response.status}`);
-            }
-            const data = await response.json();
+            // 切換財報種類/期間時直接使用已取得的 bundle，不再另外請求
+            const bundle = await loadStockBundle();
+            const reports = bundle.financial_reports[reportType] || {};
+            // 複製一份再排序，避免改動 bundle 快取的資料
+            const data = { data: (reports[actualReportPeriod] || []).slice() };
 
             if (data.data && data.data.length > 0) {
                 data.data.sort((a, b) => {
@@ -1185,9 +1205,21 @@ async function loadStockRankingSection() {
                 apiPeriod = 'quarterly';
             }
             try {
-                const res = await fetch(`/api/advanced_search/stock_ranking?stock_symbol=${stockSymbol}&country=${country}&statement_type=${block.key}&report_type=${apiPeriod}&year=${year}&quarter=${apiQuarter}`);
-                if (!res.ok) throw new Error('查詢失敗');
-                const rankingData = await res.json();
+                let rankingData = null;
+                // 與 bundle 的預設排名條件相同時直接使用 bundle 的結果，使用者變更條件後才另外查詢
+                if (year === BUNDLE_RANKING_DEFAULT.year && apiPeriod === BUNDLE_RANKING_DEFAULT.reportType && apiQuarter === BUNDLE_RANKING_DEFAULT.quarter) {
+                    try {
+                        const bundled = (await loadStockBundle()).rankings[block.key];
+                        if (bundled && !bundled.error) rankingData = { data: bundled };
+                    } catch (e) {
+                        rankingData = null;
+                    }
+                }
+                if (!rankingData) {
+                    const res = await fetch(`/api/advanced_search/stock_ranking?stock_symbol=${stockSymbol}&country=${country}&statement_type=${block.key}&report_type=${apiPeriod}&year=${year}&quarter=${apiQuarter}`);
+                    if (!res.ok) throw new Error('查詢失敗');
+                    rankingData = await res.json();
+                }
                 if (!rankingData.data || !rankingData.data.rankings) throw new Error('無資料');
                 // 渲染排名
                 detailSection.textContent = '';
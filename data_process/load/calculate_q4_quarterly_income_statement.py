@@ -8,6 +8,7 @@ import logging
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP # 導入 Decimal 進行精確計算和四捨五入
 from dotenv import load_dotenv
+from refresh_sector_rankings import refresh_sector_rankings
 
 # 在最開頭載入 .env 檔案
 load_dotenv()
@@ -197,6 +198,10 @@ def calculate_q4_quarterly_income():
             conn.commit()
             print(f"成功插入或更新 {len(insert_records)} 筆第四季單季損益表數據。")
 
+            # 重建受影響分區的預先計算排名
+            affected_partitions = {(r["year"], r["quarter"], r["report_type"]) for r in insert_records}
+            refresh_sector_rankings(conn, "Income_Statements", affected_partitions)
+
     except psycopg2.Error as e:
         logging.error(f"執行資料庫操作時發生錯誤: {e}", exc_info=True)
         print(f"執行資料庫操作時發生錯誤，詳情請參考日誌。")
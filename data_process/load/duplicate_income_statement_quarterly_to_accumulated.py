@@ -1,5 +1,6 @@
 import psycopg2
 import os
+from refresh_sector_rankings import refresh_sector_rankings
 
 # 資料庫連線配置
 DB_CONFIG = {
@@ -97,6 +98,10 @@ def duplicate_quarterly_to_accumulated():
 
         print(f"成功插入 {len(new_records)} 筆新的 'accumulated' 損益表資料。")
 
+        # 重建受影響分區的預先計算排名
+        affected_partitions = {(record[2], record[3], record[1]) for record in new_records}
+        refresh_sector_rankings(conn, "Income_Statements", affected_partitions)
+
     except psycopg2.Error as e:
         print(f"資料庫操作錯誤: {e}")
         if conn:
@@ -6,6 +6,7 @@ import psycopg2
 import logging
 from datetime import date
 from dotenv import load_dotenv
+from refresh_sector_rankings import refresh_sector_rankings_with_config
 
 # 在最開頭載入 .env 檔案
 load_dotenv()
@@ -228,6 +229,9 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map, access_key, s
         
         objects = bucket.objects.filter(Prefix=s3_key_prefix)
 
+        # 記錄成功寫入的 (year, quarter, report_type)，處理完後只重建這些分區的排名
+        affected_partitions = set()
+
         found_files = False
         for obj in objects:
             found_files = True
@@ -257,7 +261,8 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map, access_key, s
                                                                          company_id_map)
 
                     if transformed_record:
-                        insert_balance_sheet_to_db(DB_CONFIG, transformed_record)
+                        if insert_balance_sheet_to_db(DB_CONFIG, transformed_record):
+                            affected_partitions.add((transformed_record['year'], transformed_record['quarter'], transformed_record['report_type']))
                     else:
                         logging.error(f"檔案 {s3_key} 的資料轉換失敗。")
                         print(f"檔案 {s3_key} 的資料轉換失敗，詳情請參考日誌。")
@@ -277,6 +282,9 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map, access_key, s
         if not found_files:
             print(f"S3 路徑 '{s3_key_prefix}' 下沒有找到任何可處理的檔案。")
 
+        # 重建受影響分區的預先計算排名
+        refresh_sector_rankings_with_config(DB_CONFIG, "Balance_Sheets", affected_partitions)
+
     except Exception as e:
         logging.error(f"列出或處理 S3 物件時發生錯誤: {e}", exc_info=True)
         print(f"列出或處理 S3 物件時發生錯誤，詳情請參考日誌。")
@@ -5,6 +5,7 @@ import boto3
 import psycopg2
 import logging
 from datetime import date
+from refresh_sector_rankings import refresh_sector_rankings_with_config
 
 # --- 日誌設定  ---
 logging.basicConfig(
@@ -166,6 +167,7 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map):
         s3_resource = boto3.resource("s3", region_name=S3_REGION_NAME)
         bucket = s3_resource.Bucket(S3_BUCKET_NAME)
 
+        affected_partitions = set()
         for obj in bucket.objects.filter(Prefix=s3_key_prefix):
             s3_key = obj.key
             if not s3_key.endswith(".json"):
@@ -188,14 +190,17 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map):
                         json_data, (stock_code, year_roc, quarter, report_kind, data_type), company_id_map
                     )
 
-                    if transformed:
-                        insert_balance_sheet_to_db(DB_CONFIG, transformed)
+                    if transformed and insert_balance_sheet_to_db(DB_CONFIG, transformed):
+                        affected_partitions.add((transformed["year"], transformed["quarter"], transformed["report_type"]))
                 except Exception as e:
                     logging.error(f"處理檔案 {filename} 出錯: {e}", exc_info=True)
                 finally:
                     if os.path.exists(local_json_path):
                         os.remove(local_json_path)
 
+        # 重建受影響分區的預先計算排名
+        refresh_sector_rankings_with_config(DB_CONFIG, "Balance_Sheets", affected_partitions)
+
     except Exception as e:
         logging.error(f"S3 處理錯誤: {e}", exc_info=True)
 
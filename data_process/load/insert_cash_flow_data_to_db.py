@@ -5,6 +5,7 @@ import psycopg2
 from dotenv import load_dotenv
 from psycopg2 import errors
 import logging # 導入 logging 模組
+from refresh_sector_rankings import refresh_sector_rankings
 
 # 配置日誌記錄
 logging.basicConfig(
@@ -1983,6 +1984,7 @@ def get_s3_client():
 def process_s3_object(s3_client, bucket_name, key, conn, cursor):
     """
     處理單個 S3 物件，提取資料並插入資料庫。
+    成功時回傳寫入的 (year, quarter, report_type)，否則回傳 None。
     """
     try:
         print(f"正在處理 S3 物件: {key}")
@@ -2054,6 +2056,7 @@ def process_s3_object(s3_client, bucket_name, key, conn, cursor):
         ))
         conn.commit()
         print(f"成功插入或跳過 {stock_code}_{year_roc}Q{quarter} 的現金流量資料。")
+        return (year_ad, quarter, report_type)
 
     except errors.UniqueViolation:
         conn.rollback() # 回滾事務以避免鎖定
@@ -2092,6 +2095,7 @@ def main():
         pages = paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=S3_KEY_PREFIX)
 
         found_objects = False
+        affected_partitions = set()
         for page in pages:
             if 'Contents' in page:
                 found_objects = True
@@ -2099,12 +2103,17 @@ def main():
                     key = obj['Key']
                     # 確保只處理 .json 檔案
                     if key.endswith('.json'):
-                        process_s3_object(s3_client, S3_BUCKET_NAME, key, conn, cursor)
+                        partition = process_s3_object(s3_client, S3_BUCKET_NAME, key, conn, cursor)
+                        if partition:
+                            affected_partitions.add(partition)
             
         if not found_objects: # 只有當沒有找到任何物件時才記錄
             logging.info(f"S3 桶 '{S3_BUCKET_NAME}' 中 '{S3_KEY_PREFIX}' 前綴下沒有找到物件。") # 將資訊寫入日誌
             print(f"S3 桶 '{S3_BUCKET_NAME}' 中 '{S3_KEY_PREFIX}' 前綴下沒有找到物件。") # 仍然在控制台顯示
 
+        # 重建受影響分區的預先計算排名
+        refresh_sector_rankings(conn, "Cash_Flow_Statements", affected_partitions)
+
     except Exception as e:
         logging.error(f"主程式執行錯誤: {e}") # 將錯誤寫入日誌
         print(f"主程式執行錯誤: {e}") # 仍然在控制台顯示
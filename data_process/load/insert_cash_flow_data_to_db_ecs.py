@@ -4,6 +4,7 @@ import boto3
 import psycopg2
 from psycopg2 import errors
 import logging
+from refresh_sector_rankings import refresh_sector_rankings
 
 logging.basicConfig(
     level=logging.INFO, 
@@ -62,6 +63,7 @@ def get_s3_client():
 def process_s3_object(s3_client, bucket_name, key, conn, cursor):
     """
     處理單個 S3 物件，提取資料並插入資料庫。
+    成功時回傳寫入的 (year, quarter, report_type)，否則回傳 None。
     """
     try:
         logging.info(f"正在處理 S3 物件: {key}")
@@ -122,6 +124,7 @@ def process_s3_object(s3_client, bucket_name, key, conn, cursor):
         ))
         conn.commit()
         logging.info(f"成功插入或跳過 {stock_code}_{year_roc}Q{quarter} 的現金流量資料。")
+        return (year_ad, quarter, report_type)
 
     except errors.UniqueViolation:
         conn.rollback()
@@ -155,17 +158,23 @@ def main():
         pages = paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=S3_KEY_PREFIX)
 
         found_objects = False
+        affected_partitions = set()
         for page in pages:
             if 'Contents' in page:
                 found_objects = True
                 for obj in page['Contents']:
                     key = obj['Key']
                     if key.endswith('.json'):
-                        process_s3_object(s3_client, S3_BUCKET_NAME, key, conn, cursor)
+                        partition = process_s3_object(s3_client, S3_BUCKET_NAME, key, conn, cursor)
+                        if partition:
+                            affected_partitions.add(partition)
             
         if not found_objects:
             logging.info(f"S3 桶 '{S3_BUCKET_NAME}' 中 '{S3_KEY_PREFIX}' 前綴下沒有找到物件。")
 
+        # 重建受影響分區的預先計算排名
+        refresh_sector_rankings(conn, "Cash_Flow_Statements", affected_partitions)
+
     except Exception as e:
         logging.error(f"主程式執行錯誤: {e}")
     finally:
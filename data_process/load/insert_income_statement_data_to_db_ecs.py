@@ -5,6 +5,7 @@ import boto3
 import psycopg2
 from datetime import date
 from io import BytesIO
+from refresh_sector_rankings import refresh_sector_rankings_with_config
 
 # --- 環境變數設定 ---
 # 在 ECS 上，環境變數會直接被注入
@@ -160,6 +161,7 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map):
         pages = paginator.paginate(Bucket=S3_BUCKET_NAME, Prefix=s3_key_prefix)
         
         found_files = False
+        affected_partitions = set()
         for page in pages:
             if "Contents" in page:
                 for obj in page["Contents"]:
@@ -182,7 +184,8 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map):
                     if json_data:
                         transformed_record = transform_income_statement_data(json_data, filename_info, company_id_map)
                         if transformed_record:
-                            insert_income_statement_to_db(DB_CONFIG, transformed_record)
+                            if insert_income_statement_to_db(DB_CONFIG, transformed_record):
+                                affected_partitions.add((transformed_record['year'], transformed_record['quarter'], transformed_record['report_type']))
                         else:
                             print(f"檔案 {s3_key} 的資料轉換失敗。")
                     else:
@@ -191,6 +194,9 @@ def process_s3_financial_statements(s3_key_prefix, company_id_map):
         if not found_files:
             print(f"S3 路徑 '{s3_key_prefix}' 下沒有找到任何可處理的檔案。")
 
+        # 重建受影響分區的預先計算排名
+        refresh_sector_rankings_with_config(DB_CONFIG, "Income_Statements", affected_partitions)
+
     except Exception as e:
         print(f"列出或處理 S3 物件時發生錯誤: {e}")
 
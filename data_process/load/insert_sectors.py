@@ -1,6 +1,7 @@
 import psycopg2
 from psycopg2 import errors
 import os
+from refresh_sector_rankings import notify_api_cache_invalidation, bump_data_version
 
 """
 將預定義的產業類別列表，插入到 PostgreSQL 資料庫的 Sectors 資料表中。
@@ -69,11 +70,17 @@ def insert_sectors(sectors):
                 conn.rollback() # 發生其他錯誤時回滾
                 print(f"插入 '{sector_name}' 時發生錯誤: {e}")
                 
+        if inserted_count:
+            # 產業清單有異動，遞增 Sectors 版本 (與新增的產業一起提交)，/api/sector/list 的 ETag 隨之改變
+            bump_data_version(cur, "Sectors")
         # 提交事務
         conn.commit()
         print("\n所有產業資料處理完畢。")
         print(f"成功插入筆數: {inserted_count}")
         print(f"跳過筆數 (已存在): {skipped_count}")
+        if inserted_count:
+            # 產業清單有異動，清除 /api/sector/list 快取
+            notify_api_cache_invalidation("sector_list")
 
     except psycopg2.Error as e:
         print(f"資料庫連線或操作失敗: {e}")
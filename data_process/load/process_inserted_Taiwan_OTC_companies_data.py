@@ -3,6 +3,7 @@ import psycopg2
 from psycopg2 import errors
 from datetime import datetime # 引入 datetime 模組
 import os
+from refresh_sector_rankings import bump_data_version
 
 # 資料庫連線參數
 DB_PARAMS = {
@@ -251,6 +252,9 @@ def insert_companies_to_db(df):
                 conn.commit()
                 conn.autocommit = False 
 
+        if inserted_count:
+            # 公司清單有異動，通知 API 重建公司索引並清除快取
+            bump_data_version(cur, "Companies")
         conn.commit()
         print("\n所有公司資料處理完畢。")
         print(f"成功插入筆數: {inserted_count}")
@@ -2,6 +2,7 @@ import pandas as pd
 import psycopg2
 from psycopg2 import errors
 import os
+from refresh_sector_rankings import bump_data_version
 
 # --- 資料庫連線參數 ---
 DB_PARAMS = {
@@ -234,6 +235,9 @@ def insert_companies_to_db(df):
                 conn.commit() # 提交前面的成功操作，開始新的事務
                 conn.autocommit = False # 確保不是自動提交
 
+        if inserted_count:
+            # 公司清單有異動，通知 API 重建公司索引並清除快取
+            bump_data_version(cur, "Companies")
         conn.commit() # 提交所有成功的操作
         print("\n所有公司資料處理完畢。")
         print(f"成功插入筆數: {inserted_count}")
@@ -0,0 +1,245 @@
+import os
+import argparse
+import urllib.request
+import urllib.error
+import psycopg2
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    # ECS 上環境變數會直接被注入，不一定安裝 python-dotenv
+    pass
+
+# --- 資料庫連線配置 ---
+DB_CONFIG = {
+    'host': os.getenv('PostgreSQL_DB_HOST', 'localhost'),
+    'database': os.getenv('PostgreSQL_DB_NAME'),
+    'user': os.getenv('PostgreSQL_DB_USER'),
+    'password': os.getenv('PostgreSQL_DB_PASSWORD'),
+    'port': os.getenv('PostgreSQL_DB_PORT')
+}
+
+# --- API 快取清除 ---
+# 例如 https://stockinsight-ai.com，未設定時略過 (本地開發)
+API_BASE_URL = os.getenv('STOCK_INSIGHT_API_URL')
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+
+# --- 排行榜欄位 ---
+# 須與 app/backend/api/advanced_search.py 的 AdvancedSearch.SUPPORTED_RANKINGS 保持一致
+RANKING_FIELDS = {
+    "Cash_Flow_Statements": [
+        "operating_cash_flow",
+        "free_cash_flow",
+        "net_change_in_cash"
+    ],
+    "Income_Statements": [
+        "revenue",
+        "gross_profit",
+        "operating_expenses",
+        "operating_income",
+        "net_income",
+        "gross_profit_pct",
+        "sales_expenses_pct",
+        "administrative_expenses_pct",
+        "research_and_development_expenses_pct",
+        "operating_expenses_pct",
+        "operating_income_pct",
+        "net_income_pct",
+        "cost_of_revenue_pct",
+        "basic_eps",
+        "diluted_eps"
+    ],
+    "Balance_Sheets": [
+        "cash_and_equivalents",
+        "short_term_investments",
+        "accounts_receivable_and_notes",
+        "inventory",
+        "current_assets",
+        "fixed_assets_total",
+        "total_assets",
+        "cash_and_equivalents_pct",
+        "short_term_investments_pct",
+        "accounts_receivable_and_notes_pct",
+        "inventory_pct",
+        "current_assets_pct",
+        "fixed_assets_total_pct",
+        "other_non_current_assets_pct"
+    ]
+}
+
+
+def build_refresh_sql(table_name):
+    """
+    產生重建單一分區 (year, quarter, report_type) 排名的 INSERT 語句。
+    以 LATERAL VALUES 將每家公司的各指標展開成列，再計算三種排名：
+    - sector_rank / sector_total_count：依 (指標, 國家, 產業) 分區，與 stock_ranking 即時計算 (同國家、同產業) 的結果一致
+    - global_sector_rank / global_rank：依 (指標, 產業) 與 (指標) 分區，不分國家，
+      與 /api/advanced_search/ranking 即時計算 (不分國家) 的結果一致
+    同值時以 company_id 排序，與 API 即時排序及游標分頁的順序一致。
+    """
+    if table_name not in RANKING_FIELDS:
+        raise ValueError(f"不支援的財報表：{table_name}")
+
+    values_list = ",\n                ".join(
+        f"('{field}', fr.{field}::DECIMAL(24,4))" for field in RANKING_FIELDS[table_name]
+    )
+    return f"""
+        INSERT INTO Sector_Financial_Rankings (
+            table_name, field_name, year, quarter, report_type, sector_id, company_id,
+            value, sector_rank, sector_total_count, global_sector_rank, global_rank
+        )
+        SELECT
+            '{table_name}',
+            f.field_name,
+            fr.year,
+            fr.quarter,
+            fr.report_type,
+            c.sector_id,
+            fr.company_id,
+            f.value,
+            ROW_NUMBER() OVER (PARTITION BY f.field_name, c.country_id, c.sector_id ORDER BY f.value DESC NULLS LAST, fr.company_id),
+            COUNT(f.value) OVER (PARTITION BY f.field_name, c.country_id, c.sector_id),
+            ROW_NUMBER() OVER (PARTITION BY f.field_name, c.sector_id ORDER BY f.value DESC NULLS LAST, fr.company_id),
+            ROW_NUMBER() OVER (PARTITION BY f.field_name ORDER BY f.value DESC NULLS LAST, fr.company_id)
+        FROM {table_name} AS fr
+        INNER JOIN Companies AS c ON fr.company_id = c.company_id
+        INNER JOIN Sectors AS s ON c.sector_id = s.sector_id
+        INNER JOIN Countrys AS ct ON c.country_id = ct.country_id
+        CROSS JOIN LATERAL (
+            VALUES
+                {values_list}
+        ) AS f(field_name, value)
+        WHERE fr.year = %s AND fr.quarter = %s AND fr.report_type = %s;
+    """
+
+
+def refresh_sector_rankings(conn, table_name, partitions):
+    """
+    重建指定財報表中受影響分區的排名。
+
+    Args:
+        conn: psycopg2 連線
+        table_name (str): 財報表名稱
+        partitions (iterable): (year, quarter, report_type) 的集合
+    Returns:
+        int: 寫入的排名筆數
+    """
+    partitions = sorted({p for p in partitions if p[1] is not None})
+    if not partitions:
+        return 0
+
+    insert_sql = build_refresh_sql(table_name)
+    delete_sql = """
+        DELETE FROM Sector_Financial_Rankings
+        WHERE table_name = %s AND year = %s AND quarter = %s AND report_type = %s;
+    """
+    total_rows = 0
+    cur = conn.cursor()
+    try:
+        # 每個分區先刪除再重建，並在同一個交易中提交，API 不會讀到半套資料
+        for year, quarter, report_type in partitions:
+            cur.execute(delete_sql, (table_name, year, quarter, report_type))
+            cur.execute(insert_sql, (year, quarter, report_type))
+            total_rows += cur.rowcount
+            print(f"已重建 {table_name} {year}Q{quarter} ({report_type}) 排名，共 {cur.rowcount} 筆。")
+        # 與排名在同一個交易中遞增資料版本，API 收到通知時排名已可讀取
+        bump_data_version(cur, table_name)
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    notify_api_cache_invalidation()
+    return total_rows
+
+
+def bump_data_version(cur, dataset):
+    """
+    遞增 Data_Versions 中資料集的版本並 NOTIFY API (見 database_schema.sql 的 bump_data_version)。
+    在呼叫端的交易中執行，提交後 API 才會收到通知。
+
+    Args:
+        cur: psycopg2 cursor
+        dataset (str): 財報表名稱、Companies 或 Sectors
+    Returns:
+        int: 新的版本號
+    """
+    cur.execute("SELECT bump_data_version(%s);", (dataset,))
+    version = cur.fetchone()[0]
+    print(f"{dataset} 資料版本已更新為 {version}。")
+    return version
+
+
+def notify_api_cache_invalidation(namespace=None):
+    """
+    通知 API 清除回應快取，讓新載入的財報立即生效。
+    API 正常情況下已透過 LISTEN data_version 收到通知，此呼叫為 LISTEN 中斷時的備援。
+    失敗時只記錄，不影響載入流程 (快取仍會在 TTL 後過期)。
+    """
+    if not API_BASE_URL or not INTERNAL_API_TOKEN:
+        return False
+    url = f"{API_BASE_URL.rstrip('/')}/internal/cache/invalidate"
+    if namespace:
+        url += f"?namespace={namespace}"
+    request = urllib.request.Request(
+        url, method="POST", headers={"x-internal-token": INTERNAL_API_TOKEN}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            print(f"已通知 API 清除快取 (HTTP {response.status})。")
+            return True
+    except (urllib.error.URLError, OSError) as e:
+        print(f"通知 API 清除快取失敗: {e}")
+        return False
+
+
+def refresh_sector_rankings_with_config(db_config, table_name, partitions):
+    """
+    供一筆一連線的載入腳本使用：自行建立連線並重建排名。
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(**db_config)
+        return refresh_sector_rankings(conn, table_name, partitions)
+    except psycopg2.Error as e:
+        print(f"重建 {table_name} 排名時發生錯誤: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_all_partitions(conn, table_name, year=None):
+    """
+    取得財報表中所有 (year, quarter, report_type) 分區，供完整重建使用。
+    """
+    if table_name not in RANKING_FIELDS:
+        raise ValueError(f"不支援的財報表：{table_name}")
+    query = f"SELECT DISTINCT year, quarter, report_type FROM {table_name} WHERE quarter IS NOT NULL"
+    params = []
+    if year is not None:
+        query += " AND year = %s"
+        params.append(year)
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
+
+
+# --- 執行範例 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重建 Sector_Financial_Rankings 預先計算排名")
+    parser.add_argument("--table", choices=list(RANKING_FIELDS.keys()), help="只重建指定財報表 (預設全部)")
+    parser.add_argument("--year", type=int, help="只重建指定年度 (預設全部)")
+    args = parser.parse_args()
+
+    tables = [args.table] if args.table else list(RANKING_FIELDS.keys())
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        for table in tables:
+            partitions = get_all_partitions(conn, table, args.year)
+            rows = refresh_sector_rankings(conn, table, partitions)
+            print(f"{table} 共重建 {len(partitions)} 個分區，{rows} 筆排名。")
+    finally:
+        conn.close()
@@ -151,11 +151,105 @@ CREATE TABLE Cash_Flow_Statements (
     free_cash_flow DECIMAL(20,2), -- 自由現金流量
     net_change_in_cash DECIMAL(20,2), -- 現金及約當現金淨變動 (淨現金流)
     
-    CONSTRAINT uq_cash_flow_company_year_quarter_type UNIQUE (company_id, year, quarter, report_type) 
+    CONSTRAINT uq_cash_flow_company_year_quarter_type UNIQUE (company_id, year, quarter, report_type)
 );
 
 
 
+-- Sector_Financial_Rankings table 預先計算的財報指標排名
+-- 由 data_process/load/refresh_sector_rankings.py 依 (財報表, 年度, 季度, 報告類型) 分區重建
+-- 排名 API 直接依排名查詢，不需在請求時排序
+CREATE TABLE Sector_Financial_Rankings (
+    table_name VARCHAR(50) NOT NULL, -- 財報表名稱 (Balance_Sheets, Income_Statements, Cash_Flow_Statements)
+    field_name VARCHAR(100) NOT NULL, -- 排行榜欄位
+    year INTEGER NOT NULL, -- 年度
+    quarter INTEGER NOT NULL CHECK (quarter IN (1, 2, 3, 4)), -- 季度
+    report_type VARCHAR(20) NOT NULL CHECK (report_type IN ('quarterly', 'accumulated')), -- 報告類型
+    sector_id INTEGER NOT NULL REFERENCES Sectors(sector_id), -- 產業ID
+    company_id INTEGER NOT NULL REFERENCES Companies(company_id), -- 公司ID
+    value DECIMAL(24,4), -- 指標數值
+    sector_rank INTEGER NOT NULL, -- 同國家產業內排名 (由大到小，空值排最後)
+    sector_total_count INTEGER NOT NULL, -- 同國家產業內該指標有值的公司數
+    global_sector_rank INTEGER NOT NULL, -- 產業內排名，不分國家 (由大到小，空值排最後)
+    global_rank INTEGER NOT NULL, -- 全市場排名，不分國家 (由大到小，空值排最後)
+    last_updated TIMESTAMP WITH TIME ZONE DEFAULT NOW(), -- 最後更新時間
+    PRIMARY KEY (table_name, field_name, year, quarter, report_type, company_id)
+);
+
+-- 索引：產業排行榜分頁 (/api/advanced_search/ranking 指定產業)
+CREATE INDEX idx_sector_rankings_global_sector_rank ON Sector_Financial_Rankings (table_name, field_name, year, quarter, report_type, sector_id, global_sector_rank);
+-- 索引：全市場排行榜分頁 (/api/advanced_search/ranking 未指定產業)
+CREATE INDEX idx_sector_rankings_global_rank ON Sector_Financial_Rankings (table_name, field_name, year, quarter, report_type, global_rank);
+-- 索引：單一股票所有指標排名 (/api/advanced_search/stock_ranking)
+CREATE INDEX idx_sector_rankings_company ON Sector_Financial_Rankings (company_id, table_name, year, quarter, report_type);
+
+
+-- Data_Versions table 資料版本戳記
+-- data_process/load 的載入腳本每次寫入後以 bump_data_version() 遞增 (每個財報表、Companies、Sectors 各一列)
+-- API 以 LISTEN data_version 即時得知變動，用於 ETag 與清除回應快取 (app/backend/module/data_version.py)
+CREATE TABLE Data_Versions (
+    dataset VARCHAR(50) PRIMARY KEY, -- 資料集名稱 (Balance_Sheets, Income_Statements, Cash_Flow_Statements, Companies)
+    version BIGINT NOT NULL DEFAULT 0, -- 版本號，每次載入完成後遞增
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() -- 最後更新時間
+);
+
+-- 遞增資料集版本並通知 API，NOTIFY 在交易提交時才送出，API 不會在資料提交前收到通知
+-- payload 格式: "<dataset>:<version>"
+CREATE OR REPLACE FUNCTION bump_data_version(p_dataset VARCHAR) RETURNS BIGINT AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    INSERT INTO Data_Versions (dataset, version, updated_at)
+    VALUES (p_dataset, 1, NOW())
+    ON CONFLICT (dataset) DO UPDATE
+        SET version = Data_Versions.version + 1, updated_at = NOW()
+    RETURNING version INTO new_version;
+    PERFORM pg_notify('data_version', p_dataset || ':' || new_version);
+    RETURN new_version;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- 排行榜 keyset 分頁索引 (/api/advanced_search/ranking 即時排序與游標分頁)
+-- 依 (year, report_type, quarter) 篩選後，直接依 (指標 DESC NULLS LAST, company_id) 順序讀取，
+-- 游標 seek 條件可直接定位，深頁查詢成本與第一頁相同
+CREATE INDEX idx_cash_flow_statements_operating_cash_flow_rank ON Cash_Flow_Statements (year, report_type, quarter, operating_cash_flow DESC NULLS LAST, company_id);
+CREATE INDEX idx_cash_flow_statements_free_cash_flow_rank ON Cash_Flow_Statements (year, report_type, quarter, free_cash_flow DESC NULLS LAST, company_id);
+CREATE INDEX idx_cash_flow_statements_net_change_in_cash_rank ON Cash_Flow_Statements (year, report_type, quarter, net_change_in_cash DESC NULLS LAST, company_id);
+
+CREATE INDEX idx_income_statements_revenue_rank ON Income_Statements (year, report_type, quarter, revenue DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_gross_profit_rank ON Income_Statements (year, report_type, quarter, gross_profit DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_operating_expenses_rank ON Income_Statements (year, report_type, quarter, operating_expenses DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_operating_income_rank ON Income_Statements (year, report_type, quarter, operating_income DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_net_income_rank ON Income_Statements (year, report_type, quarter, net_income DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_gross_profit_pct_rank ON Income_Statements (year, report_type, quarter, gross_profit_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_sales_expenses_pct_rank ON Income_Statements (year, report_type, quarter, sales_expenses_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_administrative_expenses_pct_rank ON Income_Statements (year, report_type, quarter, administrative_expenses_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_research_and_development_expenses_pct_rank ON Income_Statements (year, report_type, quarter, research_and_development_expenses_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_operating_expenses_pct_rank ON Income_Statements (year, report_type, quarter, operating_expenses_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_operating_income_pct_rank ON Income_Statements (year, report_type, quarter, operating_income_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_net_income_pct_rank ON Income_Statements (year, report_type, quarter, net_income_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_cost_of_revenue_pct_rank ON Income_Statements (year, report_type, quarter, cost_of_revenue_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_basic_eps_rank ON Income_Statements (year, report_type, quarter, basic_eps DESC NULLS LAST, company_id);
+CREATE INDEX idx_income_statements_diluted_eps_rank ON Income_Statements (year, report_type, quarter, diluted_eps DESC NULLS LAST, company_id);
+
+CREATE INDEX idx_balance_sheets_cash_and_equivalents_rank ON Balance_Sheets (year, report_type, quarter, cash_and_equivalents DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_short_term_investments_rank ON Balance_Sheets (year, report_type, quarter, short_term_investments DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_accounts_receivable_and_notes_rank ON Balance_Sheets (year, report_type, quarter, accounts_receivable_and_notes DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_inventory_rank ON Balance_Sheets (year, report_type, quarter, inventory DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_current_assets_rank ON Balance_Sheets (year, report_type, quarter, current_assets DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_fixed_assets_total_rank ON Balance_Sheets (year, report_type, quarter, fixed_assets_total DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_total_assets_rank ON Balance_Sheets (year, report_type, quarter, total_assets DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_cash_and_equivalents_pct_rank ON Balance_Sheets (year, report_type, quarter, cash_and_equivalents_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_short_term_investments_pct_rank ON Balance_Sheets (year, report_type, quarter, short_term_investments_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_accounts_receivable_and_notes_pct_rank ON Balance_Sheets (year, report_type, quarter, accounts_receivable_and_notes_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_inventory_pct_rank ON Balance_Sheets (year, report_type, quarter, inventory_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_current_assets_pct_rank ON Balance_Sheets (year, report_type, quarter, current_assets_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_fixed_assets_total_pct_rank ON Balance_Sheets (year, report_type, quarter, fixed_assets_total_pct DESC NULLS LAST, company_id);
+CREATE INDEX idx_balance_sheets_other_non_current_assets_pct_rank ON Balance_Sheets (year, report_type, quarter, other_non_current_assets_pct DESC NULLS LAST, company_id);
+
+
+
 CREATE TYPE user_role_type AS ENUM ('admin', 'user');
 CREATE TYPE user_status_type AS ENUM ('pending', 'active', 'rejected');
 
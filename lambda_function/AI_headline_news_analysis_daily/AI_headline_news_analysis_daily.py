@@ -4,6 +4,7 @@ import io
 import re
 from datetime import datetime
 from lambda_layer.db_data_utils.insert_data import insert_data_mongodb
+from lambda_layer.text_utils.search_tokens import ai_news_search_fields
 import time
 from lambda_layer.log_utils.logger import log_error,log_success
 import os
@@ -271,6 +272,8 @@ def analyze_news(news_text: str) -> str:
                     "source_news":source_news,
                     "article_title":article_title
                     }
+                # 預先切詞供 /api/ai_news 關鍵字搜尋走索引
+                ai_summary.update(ai_news_search_fields(ai_summary))
                 # Store each AI analysis summary in the database
                 
                 insert_data_mongodb(
@@ -289,6 +292,9 @@ def analyze_news(news_text: str) -> str:
         try:
             if "_id" in ai_summary:
                 del ai_summary["_id"] #fix the auto add "_id" after insert_data_mongodb()                 
+            # 搜尋 token 只用於資料庫索引，不放進最終分析的 prompt
+            ai_summary.pop("search_tokens", None)
+            ai_summary.pop("industry_tokens", None)
             # Add a summary of each batch to the summary
             total_summary.append(ai_summary)
             time.sleep(2)
@@ -426,6 +432,8 @@ def analyze_news(news_text: str) -> str:
                 "source_news":source_news,
                 "article_title":article_title
                 }
+            # 預先切詞供 /api/ai_news 關鍵字搜尋走索引
+            db_final_ai_summary.update(ai_news_search_fields(db_final_ai_summary))
             # Store each AI analysis summary in the database
             insert_data_mongodb(
                 db_final_ai_summary, 
@@ -0,0 +1,44 @@
+import re
+
+# 與後端 app/backend/module/search_tokens.py 的切詞規則相同，兩邊需保持一致
+# 中文連續字串切成相鄰兩字 (bigram)，英數字以整個單字 (小寫) 為一個 token
+CJK_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+TOKEN_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9A-Za-z]+")
+
+
+class SearchTokens:
+    @staticmethod
+    def tokenize(*texts) -> list:
+        """
+        將多段文字切成去重後的 token 列表，非字串的值會被略過
+        """
+        tokens = []
+        seen = set()
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            for run in TOKEN_PATTERN.findall(text):
+                if CJK_PATTERN.fullmatch(run):
+                    grams = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+                else:
+                    grams = [run.lower()]
+                for gram in grams:
+                    if gram not in seen:
+                        seen.add(gram)
+                        tokens.append(gram)
+        return tokens
+
+    @staticmethod
+    def news_search_tokens(news: dict) -> list:
+        """
+        新聞的搜尋 token：title / summary / content / keyword，加上相關個股的代號與名稱
+        (內文只寫代號時，以公司名稱搜尋也能找到)
+        """
+        stock_texts = []
+        for stock in (news.get("stock") or []) + (news.get("market") or []):
+            if isinstance(stock, dict):
+                stock_texts.extend([stock.get("code"), stock.get("name")])
+            else:
+                stock_texts.append(stock)
+        keywords = news.get("keyword") or []
+        return SearchTokens.tokenize(news.get("title"), news.get("summary"), news.get("content"), *keywords, *stock_texts)
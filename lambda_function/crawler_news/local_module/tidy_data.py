@@ -1,4 +1,5 @@
 from .extract_html import Extract
+from .search_tokens import SearchTokens
 
 class Tidy :
     @staticmethod
@@ -34,6 +35,8 @@ class Tidy :
                 "market": market,
                 "content": content
             }
+            # 預先切詞供 /api/news 關鍵字搜尋走 multikey 索引
+            news_dict["search_tokens"] = SearchTokens.news_search_tokens(news_dict)
 
             db_parsed.append(news_dict)
         return db_parsed
@@ -0,0 +1,47 @@
+import re
+
+# 與後端 app/backend/module/search_tokens.py 的切詞規則相同，兩邊需保持一致
+# 中文連續字串切成相鄰兩字 (bigram)，英數字以整個單字 (小寫) 為一個 token
+CJK_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+TOKEN_PATTERN = re.compile("[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[0-9A-Za-z]+")
+
+
+def tokenize(*texts):
+    """
+    將多段文字切成去重後的 token 列表，非字串的值會被略過
+    """
+    tokens = []
+    seen = set()
+    for text in texts:
+        if not isinstance(text, str):
+            continue
+        for run in TOKEN_PATTERN.findall(text):
+            if CJK_PATTERN.fullmatch(run):
+                grams = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+            else:
+                grams = [run.lower()]
+            for gram in grams:
+                if gram not in seen:
+                    seen.add(gram)
+                    tokens.append(gram)
+    return tokens
+
+
+def ai_news_search_fields(ai_summary: dict):
+    """
+    產生 AI_news_analysis 的搜尋欄位，寫入前合併到文件中：
+    - search_tokens: summary / important_news / potential_stocks_and_industries / source_news.title
+    - industry_tokens: industry_list
+    """
+    source_news = ai_summary.get("source_news") or []
+    titles = [news.get("title") for news in source_news if isinstance(news, dict)]
+    industry_list = ai_summary.get("industry_list") or []
+    return {
+        "search_tokens": tokenize(
+            ai_summary.get("summary"),
+            ai_summary.get("important_news"),
+            ai_summary.get("potential_stocks_and_industries"),
+            *titles
+        ),
+        "industry_tokens": tokenize(*industry_list) if isinstance(industry_list, list) else []
+    }